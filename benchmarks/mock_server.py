@@ -0,0 +1,262 @@
+# benchmarks/mock_server.py
+
+"""
+A local stand-in for the Alation endpoints APT uses, for benchmarks and offline debugging.
+
+Implements document listing (limit/skip paging with X-Next-Page, `deleted` and `ts_updated__gte`
+filters), bulk creation and bulk update (201/200, or 202 plus a pollable job), folders, custom templates, custom
+fields, user/group search, token checks and token refresh. Every request can be delayed by a fixed
+latency, and access tokens can be made to expire after a number of requests to exercise 401 refresh.
+"""
+
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class MockAlationServer:
+    """
+    Serves synthetic data on 127.0.0.1 from a background thread. Use as a context manager, or call
+    start() and stop(). `url` is the base URL to put in the config.
+
+    Options:
+        latency: seconds added to every request.
+        async_uploads: answer bulk creation and update with 202 and a job id instead of 201/200.
+        job_polls: how many polls a job reports "running" before it succeeds.
+        token_ttl_requests: requests an access token is valid for before it returns 401 (None: forever).
+    """
+
+    def __init__(self, documents=(), templates=(), custom_fields=(), folders_by_hub=None, users=(), groups=(),
+                 latency: float = 0.0, async_uploads: bool = True, job_polls: int = 1,
+                 token_ttl_requests: int = None):
+        self.documents = list(documents)
+        self.templates = list(templates)
+        self.custom_fields = list(custom_fields)
+        self.folders_by_hub = dict(folders_by_hub or {})
+        self.users = list(users)
+        self.groups = list(groups)
+        self.latency = latency
+        self.async_uploads = async_uploads
+        self.job_polls = job_polls
+        self.token_ttl_requests = token_ttl_requests
+
+        self.access_token = "mock-access-token-0"
+        self.token_uses = 0
+        self.jobs = {}
+        self.request_counts = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(max((doc["id"] for doc in self.documents), default=0) + 1)
+        self._job_ids = itertools.count(1)
+        self._filtered = {}
+        self._httpd = None
+
+    # --- Lifecycle ---
+
+    def start(self) -> "MockAlationServer":
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self))
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def config(self, **overrides) -> dict:
+        """A config dict pointing at this server with valid credentials."""
+        return {"alation_url": self.url, "access_token": self.access_token, "refresh_token": "mock-refresh-token",
+                "user_id": 1, **overrides}
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.request_counts = {}
+
+    # --- Request handling ---
+
+    def _authorized(self, token: str) -> bool:
+        with self._lock:
+            if token != self.access_token:
+                return False
+            self.token_uses += 1
+            return self.token_ttl_requests is None or self.token_uses <= self.token_ttl_requests
+
+    def _refresh_token(self) -> str:
+        with self._lock:
+            number = int(self.access_token.rsplit("-", 1)[1]) + 1
+            self.access_token = f"mock-access-token-{number}"
+            self.token_uses = 0
+            return self.access_token
+
+    def _matching_documents(self, deleted: str, updated_since: str) -> list:
+        key = (deleted, updated_since)
+        with self._lock:
+            if key not in self._filtered:
+                want_deleted = deleted == "true"
+                self._filtered[key] = [
+                    doc for doc in self.documents if doc.get("deleted", False) == want_deleted
+                    and (updated_since is None
+                         or max(doc.get("ts_updated") or "", doc.get("ts_deleted") or "") >= updated_since)]
+            return self._filtered[key]
+
+    def list_documents(self, query: dict) -> tuple[list, str]:
+        limit = min(int(query.get("limit", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        skip = int(query.get("skip", 0))
+        documents = self._matching_documents(query.get("deleted", "false"), query.get("ts_updated__gte"))
+        next_page = None
+        if skip + limit < len(documents):
+            next_page = "/integration/v2/document/?" + urlencode({**query, "limit": limit, "skip": skip + limit})
+        return documents[skip:skip + limit], next_page
+
+    def create_documents(self, payloads: list) -> tuple[int, object]:
+        created = []
+        with self._lock:
+            for payload in payloads:
+                doc = {**payload, "id": next(self._ids), "deleted": False, "ts_deleted": None,
+                       "ts_updated": time.strftime("%Y-%m-%dT%H:%M:%S.000000Z", time.gmtime()),
+                       "folder_ids": [payload.get("parent_folder_id")] if payload.get("parent_folder_id") else []}
+                self.documents.append(doc)
+                created.append({"id": doc["id"], "title": doc.get("title")})
+            self._filtered = {}
+            if not self.async_uploads:
+                return 201, created
+            job_id = next(self._job_ids)
+            self.jobs[job_id] = {"polls": 0, "result": {"created_documents": created}}
+        return 202, {"job_id": job_id}
+
+    def update_documents(self, payloads: list) -> tuple[int, object]:
+        """Applies partial updates: the given top-level keys are replaced, custom fields by field_id."""
+        updated = []
+        with self._lock:
+            by_id = {doc["id"]: doc for doc in self.documents}
+            for payload in payloads:
+                doc = by_id.get(payload.get("id"))
+                if doc is None:
+                    return 400, {"detail": f"Document {payload.get('id')} does not exist."}
+                for key, value in payload.items():
+                    if key not in ("id", "custom_fields"):
+                        doc[key] = value
+                fields = {entry["field_id"]: entry for entry in doc.get("custom_fields") or []}
+                fields.update((entry["field_id"], entry) for entry in payload.get("custom_fields") or [])
+                doc["custom_fields"] = list(fields.values())
+                doc["ts_updated"] = time.strftime("%Y-%m-%dT%H:%M:%S.000000Z", time.gmtime())
+                updated.append({"id": doc["id"], "title": doc.get("title")})
+            self._filtered = {}
+            if not self.async_uploads:
+                return 200, updated
+            job_id = next(self._job_ids)
+            self.jobs[job_id] = {"polls": 0, "result": {"updated_documents": updated}}
+        return 202, {"job_id": job_id}
+
+    def job_status(self, job_id: int) -> tuple[int, dict]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return 404, {"detail": "Not found."}
+            job["polls"] += 1
+            if job["polls"] <= self.job_polls:
+                return 200, {"id": job_id, "status": "running", "msg": "Job is running."}
+            return 200, {"id": job_id, "status": "successful", "msg": "Job finished.", "result": job["result"]}
+
+    def count(self, endpoint: str) -> None:
+        with self._lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+
+
+def _make_handler(server: MockAlationServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like a real deployment
+        disable_nagle_algorithm = True  # headers and body are separate writes; avoid delayed-ACK stalls
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body, headers: dict = None):
+            data = json.dumps(body, separators=(",", ":")).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length)) if length else None
+
+        def _route(self, method: str):
+            if server.latency:
+                time.sleep(server.latency)
+            parsed = urlparse(self.path)
+            path = parsed.path
+            query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+            server.count(f"{method} {path}")
+            body = self._read_json() if method in ("POST", "PUT") else None
+
+            if method == "POST" and path == "/integration/v1/createAPIAccessToken/":
+                if not body or body.get("refresh_token") != "mock-refresh-token":
+                    return self._send(401, {"detail": "Invalid refresh token."})
+                expires_at = time.strftime("%Y-%m-%dT%H:%M:%S.000000Z", time.gmtime(time.time() + 86400))
+                return self._send(201, {"api_access_token": server._refresh_token(), "user_id": body["user_id"],
+                                        "token_status": "ACTIVE", "token_expires_at": expires_at})
+
+            if not server._authorized(self.headers.get("TOKEN")):
+                return self._send(401, {"detail": "Invalid token."})
+
+            if method == "GET" and path == "/integration/v2/document/":
+                page, next_page = server.list_documents(query)
+                return self._send(200, page, {"X-Next-Page": next_page} if next_page else None)
+            if method == "POST" and path == "/integration/v2/document/":
+                return self._send(*server.create_documents(body or []))
+            if method == "PUT" and path == "/integration/v2/document/":
+                return self._send(*server.update_documents(body or []))
+            if method == "GET" and path == "/integration/v1/job/":
+                return self._send(*server.job_status(int(query.get("id", 0))))
+            if method == "GET" and path == "/integration/v2/folder/":
+                return self._send(200, server.folders_by_hub.get(int(query.get("document_hub_id", 0)), []))
+            if method == "GET" and path == "/integration/v1/custom_template/":
+                return self._send(200, server.templates)
+            if method == "GET" and path == "/integration/v2/custom_field/":
+                skip, limit = int(query.get("skip", 0)), int(query.get("limit", DEFAULT_PAGE_SIZE))
+                return self._send(200, server.custom_fields[skip:skip + limit])
+            if method == "GET" and path == "/integration/v1/user/search":
+                wanted = query.get("q", "").casefold()
+                return self._send(200, [user for user in server.users
+                                        if wanted in (user["email"].casefold(), user["username"].casefold(),
+                                                      user["display_name"].casefold())])
+            if method == "GET" and path == "/integration/v1/user/":
+                return self._send(200, server.users[:1])
+            if method == "GET" and path == "/integration/v1/group/":
+                wanted = query.get("display_name", "").casefold()
+                return self._send(200, [group for group in server.groups
+                                        if group["display_name"].casefold() == wanted])
+            return self._send(404, {"detail": "Not found."})
+
+        def do_GET(self):
+            self._route("GET")
+
+        def do_POST(self):
+            self._route("POST")
+
+        def do_PUT(self):
+            self._route("PUT")
+
+    return Handler
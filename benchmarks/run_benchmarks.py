@@ -0,0 +1,223 @@
+# benchmarks/run_benchmarks.py
+
+"""
+Throughput and latency benchmarks for APT's API layer, run against the local mock server.
+
+    python -m benchmarks.run_benchmarks --documents 100000 --latency 0.005 --output bench.json
+
+Runs in a temporary working directory, so the caches, logs and config it writes never touch the
+real ones. Results are written as JSON with a fixed key order and rounding, so two runs can be
+diffed for regression tracking.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import synthetic_data
+from benchmarks.mock_server import MockAlationServer
+from core.constants import DEFAULT_MAX_WORKERS
+from utils import alation_lookup, api_client, payload_builder, single_flight, upload_manager
+
+BENCHMARKS = ("full_fetch", "delta_sync", "cache_load", "object_set_resolution", "payload_build", "bulk_upload")
+RESULT_SCHEMA_VERSION = 1
+
+
+def _quiet(message):
+    pass
+
+
+class BenchmarkContext:
+    """Shared fixtures: the mock server, its config, and an upload sheet for the template under test."""
+
+    def __init__(self, args, server: MockAlationServer, log_callback):
+        self.args = args
+        self.server = server
+        self.log_callback = log_callback
+        self.config = server.config(max_workers=args.max_workers)
+        self.template = server.templates[0]
+        self.sheet = synthetic_data.generate_upload_sheet(args.upload_rows, self.template, server.users,
+                                                          server.groups)
+        self.hub_id, folders = next(iter(server.folders_by_hub.items()))
+        self.folder_id = folders[0]["id"]
+
+    def build_payloads(self) -> list:
+        return payload_builder.build_document_payloads(self.config, self.sheet, self.hub_id, self.folder_id,
+                                                       self.template, log_callback=self.log_callback)
+
+
+# Each benchmark returns a callable that performs one timed run and returns the number of items processed.
+def bench_full_fetch(ctx: BenchmarkContext):
+    def run():
+        single_flight.forget("documents")
+        return len(api_client.get_all_documents(ctx.config, ctx.log_callback, force_api_fetch=True))
+    return run
+
+
+def bench_delta_sync(ctx: BenchmarkContext):
+    single_flight.forget("documents")
+    api_client.get_all_documents(ctx.config, ctx.log_callback, force_api_fetch=True)
+
+    def run():
+        single_flight.forget("documents")
+        return len(api_client.get_all_documents(ctx.config, ctx.log_callback, force_api_fetch=True,
+                                                incremental=True))
+    return run
+
+
+def bench_cache_load(ctx: BenchmarkContext):
+    single_flight.forget("documents")
+    api_client.get_all_documents(ctx.config, ctx.log_callback, force_api_fetch=True)
+
+    def run():
+        single_flight.forget("documents")
+        return len(api_client.get_all_documents(ctx.config, ctx.log_callback))
+    return run
+
+
+def bench_object_set_resolution(ctx: BenchmarkContext):
+    pairs = []
+    for col_header, field in payload_builder.get_field_name_to_details_map(ctx.template).items():
+        if field["field_type"] == "OBJECT_SET":
+            hint = payload_builder.get_otype_hint(field)
+            for value in ctx.sheet[col_header].dropna().astype(str):
+                pairs.extend((name, hint) for name in
+                             payload_builder.split_object_set_cell(value, field.get("allow_multiple", False)))
+
+    def run():
+        alation_lookup.clear_object_cache()
+        resolved = alation_lookup.resolve_object_names(ctx.config, pairs, log_callback=ctx.log_callback)
+        return len(resolved)
+    return run
+
+
+def bench_payload_build(ctx: BenchmarkContext):
+    ctx.build_payloads()  # Warm the OBJECT_SET cache, so only payload building is timed
+
+    def run():
+        return len(ctx.build_payloads())
+    return run
+
+
+def bench_bulk_upload(ctx: BenchmarkContext):
+    payloads = ctx.build_payloads()
+
+    def run():
+        summary = upload_manager._perform_bulk_upload(ctx.config, payloads, log_callback=ctx.log_callback,
+                                                      context_name="Benchmark upload")
+        if summary["failed"] or summary["pending"]:
+            raise RuntimeError(f"Benchmark upload did not complete: {summary['failed']} failed, "
+                               f"{summary['pending']} pending.")
+        return summary["uploaded"]
+    return run
+
+
+def _time_benchmark(name: str, ctx: BenchmarkContext, repeat: int) -> dict:
+    run = globals()[f"bench_{name}"](ctx)
+    durations, items, requests = [], 0, 0
+    for _ in range(repeat):
+        ctx.server.reset_counts()
+        started = time.perf_counter()
+        items = run()
+        durations.append(time.perf_counter() - started)
+        requests = sum(ctx.server.request_counts.values())
+    median = statistics.median(durations)
+    return {
+        "name": name,
+        "items": items,
+        "requests": requests,
+        "repeat": repeat,
+        "min_s": round(min(durations), 4),
+        "median_s": round(median, 4),
+        "max_s": round(max(durations), 4),
+        "items_per_s": round(items / median, 1) if median else None,
+    }
+
+
+def run_benchmarks(args) -> dict:
+    log_callback = print if args.verbose else _quiet
+    templates = synthetic_data.generate_templates(args.templates)
+    folders_by_hub = synthetic_data.generate_hubs_and_folders(args.hubs, args.folders_per_hub)
+    server = MockAlationServer(
+        documents=synthetic_data.generate_documents(args.documents, folders_by_hub, templates, seed=args.seed),
+        templates=templates,
+        custom_fields=synthetic_data.generate_custom_fields(templates),
+        folders_by_hub=folders_by_hub,
+        users=synthetic_data.generate_users(args.users),
+        groups=synthetic_data.generate_groups(args.groups),
+        latency=args.latency,
+        job_polls=args.job_polls,
+        token_ttl_requests=args.token_ttl,
+    )
+
+    results = []
+    with server:
+        ctx = BenchmarkContext(args, server, log_callback)
+        for name in args.only or BENCHMARKS:
+            print(f"Running {name}...", file=sys.stderr, flush=True)
+            results.append(_time_benchmark(name, ctx, args.repeat))
+
+    return {
+        "schema": RESULT_SCHEMA_VERSION,
+        "parameters": {key: getattr(args, key) for key in
+                       ("documents", "upload_rows", "latency", "max_workers", "repeat", "seed", "token_ttl")},
+        "environment": {"python": platform.python_version(), "implementation": platform.python_implementation(),
+                        "platform": platform.platform(), "cpu_count": os.cpu_count()},
+        "results": results,
+    }
+
+
+def _print_table(report: dict) -> None:
+    print(f"{'benchmark':<24}{'items':>10}{'requests':>10}{'median s':>12}{'min s':>10}{'items/s':>14}")
+    for result in report["results"]:
+        print(f"{result['name']:<24}{result['items']:>10}{result['requests']:>10}{result['median_s']:>12.4f}"
+              f"{result['min_s']:>10.4f}{result['items_per_s'] or 0:>14.1f}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark APT against a local mock Alation server.")
+    parser.add_argument("--documents", type=int, default=20000, help="Synthetic documents on the server")
+    parser.add_argument("--upload-rows", type=int, default=5000, help="Rows in the synthetic upload sheet")
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds added to every request")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--templates", type=int, default=5)
+    parser.add_argument("--hubs", type=int, default=5)
+    parser.add_argument("--folders-per-hub", type=int, default=20)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--job-polls", type=int, default=0, help="Polls before a mock upload job succeeds")
+    parser.add_argument("--token-ttl", type=int, help="Requests per access token, to exercise 401 refresh")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS)
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--verbose", action="store_true", help="Show the application's log messages")
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = build_parser().parse_args(argv)
+    output = Path(args.output).resolve() if args.output else None
+    with tempfile.TemporaryDirectory(prefix="apt-bench-") as workdir:
+        previous_cwd = os.getcwd()
+        os.chdir(workdir)  # Keep cache/, logs/ and config.json writes out of the real tree
+        try:
+            report = run_benchmarks(args)
+        finally:
+            os.chdir(previous_cwd)
+
+    _print_table(report)
+    if output:
+        output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Report written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# benchmarks/synthetic_data.py
+
+"""Deterministic synthetic Alation data for the benchmark suite. Everything is seeded, so runs compare."""
+
+import random
+
+import pandas as pd
+
+STATUS_OPTIONS = ["Draft", "In Review", "Approved", "Deprecated"]
+
+
+def generate_templates(count: int = 5) -> list:
+    """Templates with a RICH_TEXT, a PICKER, a DATE and two OBJECT_SET (user, group) fields each."""
+    templates = []
+    for number in range(1, count + 1):
+        base = number * 100
+        templates.append({
+            "id": number,
+            "title": f"Template {number}",
+            "fields": [
+                {"id": base + 1, "field_type": "RICH_TEXT", "name_singular": "Notes", "name_plural": "Notes"},
+                {"id": base + 2, "field_type": "PICKER", "name_singular": "Status", "name_plural": "Statuses",
+                 "options": [{"title": option} for option in STATUS_OPTIONS]},
+                {"id": base + 3, "field_type": "DATE", "name_singular": "Review Date", "name_plural": "Review Dates"},
+                {"id": base + 4, "field_type": "OBJECT_SET", "name_singular": "Steward", "name_plural": "Stewards",
+                 "allow_multiple": True, "allowed_otypes": ["user"]},
+                {"id": base + 5, "field_type": "OBJECT_SET", "name_singular": "Owning Group",
+                 "name_plural": "Owning Groups", "allow_multiple": False, "allowed_otypes": ["groupprofile"]},
+            ],
+        })
+    return templates
+
+
+def generate_custom_fields(templates: list) -> list:
+    return [{"id": field["id"], "field_type": field["field_type"], "name_singular": field["name_singular"],
+             "name_plural": field["name_plural"]} for template in templates for field in template["fields"]]
+
+
+def generate_users(count: int = 500) -> list:
+    return [{"id": number, "email": f"user{number}@example.com", "username": f"user{number}",
+             "display_name": f"User {number}"} for number in range(1, count + 1)]
+
+
+def generate_groups(count: int = 50) -> list:
+    return [{"id": number, "display_name": f"Group {number}", "name": f"group{number}"}
+            for number in range(1, count + 1)]
+
+
+def generate_hubs_and_folders(hubs: int = 5, folders_per_hub: int = 20) -> dict:
+    """Returns {hub_id: [folder, ...]}. Folder ids are unique across hubs."""
+    return {hub_id: [{"id": hub_id * 10000 + number, "title": f"Folder {hub_id}-{number}",
+                      "document_hub_id": hub_id} for number in range(1, folders_per_hub + 1)]
+            for hub_id in range(1, hubs + 1)}
+
+
+def generate_documents(count: int, folders_by_hub: dict, templates: list, seed: int = 42,
+                       deleted_ratio: float = 0.01) -> list:
+    """Generates `count` documents spread over the hubs, folders and templates, a few of them deleted."""
+    rng = random.Random(seed)
+    folders = [folder for hub_folders in folders_by_hub.values() for folder in hub_folders]
+    documents = []
+    for doc_id in range(1, count + 1):
+        folder = folders[doc_id % len(folders)]
+        template = templates[doc_id % len(templates)]
+        deleted = rng.random() < deleted_ratio
+        day = 1 + doc_id % 28
+        documents.append({
+            "id": doc_id,
+            "title": f"Document {doc_id}",
+            "description": f"<p>Synthetic document {doc_id}</p>",
+            "document_hub_id": folder["document_hub_id"],
+            "parent_folder_id": folder["id"],
+            "folder_ids": [folder["id"]],
+            "template_id": template["id"],
+            "parent_document_id": None,
+            "child_documents_count": 0,
+            "nav_link_folder_ids": [],
+            "custom_fields": [{"field_id": template["fields"][1]["id"],
+                               "value": STATUS_OPTIONS[doc_id % len(STATUS_OPTIONS)]}],
+            "ts_updated": f"2025-01-{day:02d}T12:00:00.000000Z",
+            "ts_deleted": f"2025-02-{day:02d}T12:00:00.000000Z" if deleted else None,
+            "deleted": deleted,
+        })
+    return documents
+
+
+def generate_upload_sheet(rows: int, template: dict, users: list, groups: list, seed: int = 7,
+                          distinct_stewards: int = 200) -> pd.DataFrame:
+    """
+    Builds an upload DataFrame for `template`, with columns matching its field headers.
+    Stewards are drawn from `distinct_stewards` users, so OBJECT_SET names repeat heavily as in real sheets.
+    """
+    rng = random.Random(seed)
+    stewards = [user["email"] for user in users[:distinct_stewards]]
+    return pd.DataFrame({
+        "Title": [f"Uploaded {number}" for number in range(rows)],
+        "Description": [f"Row {number}" for number in range(rows)],
+        "Notes": [f"<p>Note {number}</p>" for number in range(rows)],
+        "Status": [rng.choice(STATUS_OPTIONS) for _ in range(rows)],
+        "Review Date": ["2025-06-01"] * rows,
+        "Steward": [", ".join(rng.sample(stewards, 2)) for _ in range(rows)],
+        "Owning Group": [rng.choice(groups)["display_name"] for _ in range(rows)],
+    })
@@ -0,0 +1,313 @@
+# cli.py
+
+"""
+Headless command-line entry point, for cron jobs and CI runners without a display.
+
+Logs go to stderr; each command prints one JSON object with its results to stdout.
+Exit status: 0 success, 1 some documents or files failed, 2 usage error, 3 authentication failed.
+
+Examples:
+    python main.py upload --hub-id 1 --folder-id 2 --template-id 3 sheet1.xlsx sheet2.csv --jobs 4
+    python main.py validate --template-id 3 sheet1.xlsx --report problems.csv
+    python main.py update --hub-id 1 --folder-id 2 --template-id 3 edited_export.xlsx
+    python main.py create-empty --hub-id 1 --folder-id 2 --title "New Document" --count 10
+    python main.py export-documents --output documents.json --hub-id 1
+    python main.py export --output hub1.xlsx --hub-id 1 --template-id 3
+    python main.py mirror --hub-id 1 --output-dir mirrors/
+    python main.py generate-template --hub-id 1 --folder-id 2 --template-id 3 --output template.xlsx
+    python main.py upload-history --limit 10
+"""
+
+import argparse
+import json
+import sys
+
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from config import config_handler
+from config.config_handler import load_config
+from utils import (alation_lookup, api_client, document_exporter, excel_writer, metrics, payload_builder,
+                   processing_utils, template_validator, upload_log, upload_manager)
+from utils import token_checker
+from utils.token_checker import check_token
+
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_USAGE = 2
+EXIT_AUTH = 3
+
+
+def _log_to_stderr(prefix: str = ""):
+    def log(message):
+        print(f"{prefix}{message}", file=sys.stderr, flush=True)
+    return log
+
+
+def _find_template(config: dict, template_id: int, log_callback) -> dict:
+    for template in api_client.get_all_templates(config, log_callback):
+        if template.get('id') == template_id:
+            return template
+    return None
+
+
+def _upload_outcome(file_path: str, summary: dict) -> dict:
+    if summary is None:
+        return {"file": file_path, "status": "error"}
+    ok = not summary["failed"] and not summary["pending"]
+    return {"file": file_path, "status": "ok" if ok else "failed",
+            **{key: summary[key] for key in ("prepared", "uploaded", "failed", "pending", "job_ids")},
+            **({"skipped": summary["skipped"]} if "skipped" in summary else {}),
+            "results": summary["results"]}
+
+
+def cmd_upload(config: dict, args) -> tuple[dict, int]:
+    log = _log_to_stderr()
+    template = _find_template(config, args.template_id, log)
+    if template is None:
+        log(f"❌ Template ID {args.template_id} not found.")
+        return {"error": f"Template ID {args.template_id} not found."}, EXIT_USAGE
+
+    def upload_file(file_path):
+        return _upload_outcome(file_path, upload_manager.upload_documents_from_file(
+            config, file_path, args.hub_id, args.folder_id, template,
+            log_callback=_log_to_stderr(f"[{Path(file_path).name}] "), chunk_rows=args.chunk_rows,
+            resume=not args.no_resume, skip_existing=not args.allow_existing_titles,
+            validate=not args.skip_validation))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(args.jobs, len(args.files)))) as executor:
+        files = list(executor.map(upload_file, args.files))
+    exit_code = EXIT_OK if all(f["status"] == "ok" for f in files) else EXIT_FAILURES
+    return {"files": files}, exit_code
+
+
+def cmd_update(config: dict, args) -> tuple[dict, int]:
+    log = _log_to_stderr()
+    template = _find_template(config, args.template_id, log)
+    if template is None:
+        log(f"❌ Template ID {args.template_id} not found.")
+        return {"error": f"Template ID {args.template_id} not found."}, EXIT_USAGE
+
+    files = []
+    for file_path in args.files:
+        summary = upload_manager.update_documents_from_file(
+            config, file_path, args.hub_id, args.folder_id, template,
+            log_callback=_log_to_stderr(f"[{Path(file_path).name}] "), chunk_rows=args.chunk_rows,
+            validate=not args.skip_validation)
+        outcome = _upload_outcome(file_path, summary)
+        if summary is not None:
+            outcome.update({key: summary[key] for key in ("matched", "unchanged", "changed_fields", "unmatched")})
+        files.append(outcome)
+    exit_code = EXIT_OK if all(f["status"] == "ok" and not f.get("unmatched") for f in files) else EXIT_FAILURES
+    return {"files": files}, exit_code
+
+
+def cmd_validate(config: dict, args) -> tuple[dict, int]:
+    log = _log_to_stderr()
+    template = _find_template(config, args.template_id, log)
+    if template is None:
+        log(f"❌ Template ID {args.template_id} not found.")
+        return {"error": f"Template ID {args.template_id} not found."}, EXIT_USAGE
+
+    files, reports = [], []
+    for file_path in args.files:
+        file_log = _log_to_stderr(f"[{Path(file_path).name}] ")
+        report = template_validator.validate_sheet_file(
+            file_path, template, None if args.skip_object_lookup else config, file_log, args.chunk_rows)
+        template_validator.log_report(report, file_log)
+        files.append({"file": file_path, "status": "ok" if report.empty else "invalid", "problems": len(report),
+                      "rows": int(report["row"].nunique()), "errors": report.head(100).to_dict("records")})
+        reports.append(report.assign(file=file_path))
+    result = {"files": files}
+    if args.report:
+        pd.concat(reports, ignore_index=True)[["file", *template_validator.REPORT_COLUMNS]].to_csv(
+            args.report, index=False)
+        result["report"] = args.report
+    return result, EXIT_OK if all(f["status"] == "ok" for f in files) else EXIT_FAILURES
+
+
+def cmd_create_empty(config: dict, args) -> tuple[dict, int]:
+    payloads = [{"title": f"{args.title} {number}", "document_hub_id": args.hub_id,
+                 "parent_folder_id": args.folder_id, "template_id": args.template_id, "description": ""}
+                for number in range(1, args.count + 1)]
+    summary = upload_manager.create_empty_documents(config, payloads, log_callback=_log_to_stderr())
+    outcome = _upload_outcome("", summary)
+    del outcome["file"]
+    return outcome, EXIT_OK if outcome["status"] == "ok" else EXIT_FAILURES
+
+
+def cmd_export_documents(config: dict, args) -> tuple[dict, int]:
+    log = _log_to_stderr()
+    count = 0
+    with open(args.output, "w", encoding="utf-8") as f:
+        for page in api_client.iter_document_pages(config, log, force_api_fetch=args.force,
+                                                   incremental=args.incremental):
+            for doc in page:
+                if args.hub_id is None or doc.get('document_hub_id') == args.hub_id:
+                    f.write(json.dumps(doc) + "\n")
+                    count += 1
+    log(f"✅ Wrote {count} documents to {args.output}")
+    return {"output": args.output, "documents": count}, EXIT_OK
+
+
+def cmd_export(config: dict, args) -> tuple[dict, int]:
+    if Path(args.output).suffix.lower() not in document_exporter.EXPORT_SUFFIXES:
+        return {"error": f"--output must end in one of: {', '.join(document_exporter.EXPORT_SUFFIXES)}"}, EXIT_USAGE
+    return document_exporter.export_documents(
+        config, args.output, hub_id=args.hub_id, folder_id=args.folder_id, template_id=args.template_id,
+        log_callback=_log_to_stderr(), force_api_fetch=args.force), EXIT_OK
+
+
+def cmd_mirror(config: dict, args) -> tuple[dict, int]:
+    log = _log_to_stderr()
+    hub_title = args.hub_title
+    if hub_title is None:
+        hub = next((h for h in alation_lookup.get_document_hubs(config, log) if h.get('id') == args.hub_id), None)
+        if hub is None:
+            return {"error": f"Document Hub ID {args.hub_id} not found."}, EXIT_USAGE
+        hub_title = hub.get('title', '')
+    summary = processing_utils.mirror_hub(config, args.hub_id, hub_title, args.output_dir, log_callback=log,
+                                          formats=tuple(args.formats))
+    return summary, EXIT_OK if not summary["failed"] else EXIT_FAILURES
+
+
+def cmd_generate_template(config: dict, args) -> tuple[dict, int]:
+    log = _log_to_stderr()
+    template = _find_template(config, args.template_id, log)
+    if template is None:
+        log(f"❌ Template ID {args.template_id} not found.")
+        return {"error": f"Template ID {args.template_id} not found."}, EXIT_USAGE
+    headers = payload_builder.get_template_columns(template)
+    excel_writer.write_template_workbook(headers, args.hub_id, args.folder_id, args.template_id, args.output, log)
+    return {"output": args.output, "headers": headers}, EXIT_OK
+
+
+def cmd_upload_history(config: dict, args) -> tuple[dict, int]:
+    if args.run_id:
+        return {"run_id": args.run_id,
+                "failed_documents": upload_log.failed_documents(args.run_id, upload_log.UPLOAD_LOG_DIR)}, EXIT_OK
+    return {"runs": upload_log.summarize_runs(limit=args.limit)}, EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="apt", description="APT - Alation Power Tools (headless mode)")
+    parser.add_argument("--config", default="config.json", help="Path to config.json (default: %(default)s)")
+    parser.add_argument("--max-workers", type=int, help="Concurrent API requests per operation")
+    parser.add_argument("--metrics-output", help="Write API metrics here at the end (.json, or .prom for Prometheus)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    upload = subparsers.add_parser("upload", help="Upload documents from one or more .xlsx/.csv files")
+    upload.add_argument("files", nargs="+")
+    upload.add_argument("--hub-id", type=int, required=True)
+    upload.add_argument("--folder-id", type=int, required=True)
+    upload.add_argument("--template-id", type=int, required=True)
+    upload.add_argument("--jobs", type=int, default=2, help="Files processed in parallel (default: %(default)s)")
+    upload.add_argument("--chunk-rows", type=int, default=upload_manager.sheet_reader.SHEET_CHUNK_ROWS)
+    upload.add_argument("--no-resume", action="store_true",
+                        help="Resend every row, ignoring what earlier runs of the same file already uploaded")
+    upload.add_argument("--allow-existing-titles", action="store_true",
+                        help="Create documents even if the folder already has one with the same title")
+    upload.add_argument("--skip-validation", action="store_true",
+                        help="Upload without checking the whole sheet against the template first")
+    upload.set_defaults(handler=cmd_upload)
+
+    update = subparsers.add_parser("update", help="Apply edited sheets to existing documents, sending only changes")
+    update.add_argument("files", nargs="+")
+    update.add_argument("--hub-id", type=int, required=True)
+    update.add_argument("--folder-id", type=int, required=True,
+                        help="Rows without an ID are matched by title among this folder's documents")
+    update.add_argument("--template-id", type=int, required=True)
+    update.add_argument("--chunk-rows", type=int, default=upload_manager.sheet_reader.SHEET_CHUNK_ROWS)
+    update.add_argument("--skip-validation", action="store_true")
+    update.set_defaults(handler=cmd_update)
+
+    validate = subparsers.add_parser("validate", help="Check .xlsx/.csv files against a template without uploading")
+    validate.add_argument("files", nargs="+")
+    validate.add_argument("--template-id", type=int, required=True)
+    validate.add_argument("--report", help="Write every problem found to this CSV file")
+    validate.add_argument("--skip-object-lookup", action="store_true",
+                          help="Do not look up OBJECT_SET names in Alation")
+    validate.add_argument("--chunk-rows", type=int, default=upload_manager.sheet_reader.SHEET_CHUNK_ROWS)
+    validate.set_defaults(handler=cmd_validate)
+
+    create_empty = subparsers.add_parser("create-empty", help="Create numbered blank documents")
+    create_empty.add_argument("--hub-id", type=int, required=True)
+    create_empty.add_argument("--folder-id", type=int, required=True)
+    create_empty.add_argument("--template-id", type=int)
+    create_empty.add_argument("--title", default="New Document", help="Base title (default: %(default)s)")
+    create_empty.add_argument("--count", type=int, default=1)
+    create_empty.set_defaults(handler=cmd_create_empty)
+
+    export = subparsers.add_parser("export-documents", help="Write all documents as JSON lines")
+    export.add_argument("--output", required=True)
+    export.add_argument("--hub-id", type=int)
+    export.add_argument("--force", action="store_true", help="Ignore the local document cache")
+    export.add_argument("--incremental", action="store_true", help="Refresh the cache with a delta sync")
+    export.set_defaults(handler=cmd_export_documents)
+
+    export_sheet = subparsers.add_parser("export", help="Export documents to .xlsx or .parquet, one file per template")
+    export_sheet.add_argument("--output", required=True)
+    export_sheet.add_argument("--hub-id", type=int)
+    export_sheet.add_argument("--folder-id", type=int)
+    export_sheet.add_argument("--template-id", type=int)
+    export_sheet.add_argument("--force", action="store_true", help="Re-crawl every document instead of a delta sync")
+    export_sheet.set_defaults(handler=cmd_export)
+
+    mirror = subparsers.add_parser("mirror", help="Mirror a hub's folders and documents to disk, rewriting only changes")
+    mirror.add_argument("--hub-id", type=int, required=True)
+    mirror.add_argument("--output-dir", required=True, help="The hub gets a directory named after it in here")
+    mirror.add_argument("--hub-title", help="Name the hub directory after this instead of the hub's title")
+    mirror.add_argument("--formats", nargs="+", choices=processing_utils.MIRROR_FORMATS,
+                        default=list(processing_utils.MIRROR_FORMATS))
+    mirror.set_defaults(handler=cmd_mirror)
+
+    generate = subparsers.add_parser("generate-template", help="Write an upload workbook for a template")
+    generate.add_argument("--hub-id", type=int, required=True)
+    generate.add_argument("--folder-id", type=int, required=True)
+    generate.add_argument("--template-id", type=int, required=True)
+    generate.add_argument("--output", required=True)
+    generate.set_defaults(handler=cmd_generate_template)
+
+    history = subparsers.add_parser("upload-history", help="Summarize past uploads from the upload log")
+    history.add_argument("--limit", type=int, default=20)
+    history.add_argument("--run-id", help="List the documents of this run that did not succeed")
+    history.set_defaults(handler=cmd_upload_history, offline=True)
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = build_parser().parse_args(argv)
+    stdout = sys.stdout
+    # Library code logs with print(); keep stdout for the JSON result only.
+    with redirect_stdout(sys.stderr):
+        config = load_config(Path(args.config))
+        # Refreshed tokens go back to the file they were read from, not the default config.json.
+        token_checker.token_manager.config_path = Path(args.config)
+        if args.max_workers:
+            config['max_workers'] = args.max_workers
+        is_token_valid, status_message = (True, "") if getattr(args, "offline", False) else check_token(config)
+        print(status_message)
+        if not is_token_valid:
+            result, exit_code = {"error": status_message}, EXIT_AUTH
+        else:
+            try:
+                result, exit_code = args.handler(config, args)
+            except Exception as e:
+                print(f"❌ {args.command} failed: {e}")
+                result, exit_code = {"error": str(e)}, EXIT_FAILURES
+        metrics_output = args.metrics_output or config.get("metrics_output")
+        if metrics_output:
+            print(f"API metrics written to {metrics.registry.dump(metrics_output)}")
+
+        # Refreshed tokens are saved in the background; make sure they are on disk before exiting.
+        config_handler.flush_pending_saves()
+
+    json.dump({"command": args.command, "exit_code": exit_code, **result}, stdout, indent=2, default=str)
+    stdout.write("\n")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
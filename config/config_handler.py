@@ -1,6 +1,10 @@
 # config/config_handler.py
 
+import atexit
 import json
+import os
+import tempfile
+import threading
 from pathlib import Path
 import dearpygui.dearpygui as dpg # DPG needed for get_value in save_config_from_gui
 
@@ -12,8 +16,63 @@ def load_config(config_path: Path) -> dict:
         return {}
 
 def save_config(config_path: Path, config_data: dict) -> None:
-    with open(config_path, "w") as f:
-        json.dump(config_data, f, indent=4)
+    """Writes the config atomically: a temporary file in the same directory replaces it in one step."""
+    config_path = Path(config_path)
+    fd, tmp_path = tempfile.mkstemp(dir=config_path.parent or ".", prefix=f".{config_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(config_data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, config_path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+_pending_saves = {}
+_pending_saves_lock = threading.Lock()
+_background_write_lock = threading.Lock()
+
+
+def _write_pending_config(config_path: Path) -> None:
+    # Writers run one at a time and each takes the newest snapshot, so an older one never lands last.
+    with _background_write_lock:
+        with _pending_saves_lock:
+            config_data = _pending_saves.pop(config_path, None)
+        if config_data is not None:
+            try:
+                save_config(config_path, config_data)
+            except OSError as e:
+                print(f"❌ Could not save config to {config_path}: {e}")
+
+
+def save_config_in_background(config_path: Path, config_data: dict) -> None:
+    """
+    Saves a snapshot of the config on a background thread, so callers never wait on disk I/O.
+    Saves requested while one is pending are coalesced: only the latest snapshot is written.
+    The writer is not a daemon thread, and flush_pending_saves also runs at exit, so a refreshed
+    token (and a rotated refresh token) is never lost by the process ending first.
+    """
+    config_path = Path(config_path)
+    with _pending_saves_lock:
+        already_pending = config_path in _pending_saves
+        _pending_saves[config_path] = dict(config_data)
+    if not already_pending:
+        threading.Thread(target=_write_pending_config, args=(config_path,)).start()
+
+
+def flush_pending_saves() -> None:
+    """Writes every pending background save now, waiting for one already being written."""
+    with _pending_saves_lock:
+        config_paths = list(_pending_saves)
+    for config_path in config_paths:
+        _write_pending_config(config_path)
+    with _background_write_lock:
+        pass  # Wait for a write that took its snapshot before this call
+
+
+atexit.register(flush_pending_saves)
 
 def save_config_from_gui(config_path: Path) -> None:
     config_data = {
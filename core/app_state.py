@@ -2,6 +2,7 @@
 
 import logging
 import threading
+from core.document_index import DocumentIndex
 from utils import alation_lookup, api_client
 
 logger = logging.getLogger(__name__)
@@ -15,28 +16,69 @@ class AppState:
         self.config = {}
         self.is_token_valid = False
 
-        # Central data stores
-        self.all_documents = []
-        self.all_templates = []
+        # Central data store, indexed by id, hub, folder and template
+        self.document_index = DocumentIndex()
 
+        # Event set once templates and the first page of documents are available
+        self.documents_available = threading.Event()
         # Event to signal when the initial data load is complete
         self.data_loaded = threading.Event()
+        self._load_thread = None
+        self._load_lock = threading.Lock()
 
     def start_background_load(self):
-        """Starts fetching all data from Alation in a background thread."""
+        """
+        Starts fetching all data from Alation in a background thread. If a load is already running
+        the call joins it instead: two loads would clear and refill the shared index over each other.
+        """
         if not self.is_token_valid:
             self.log_callback("Token not valid, skipping data load.")
             return
 
-        self.log_callback("--- Starting background data load... ---")
-        self.data_loaded.clear()  # Reset the event
-        thread = threading.Thread(target=self._load_data, daemon=True)
-        thread.start()
+        with self._load_lock:
+            if self._load_thread is not None and self._load_thread.is_alive() and not self.data_loaded.is_set():
+                self.log_callback("ℹ️ A data load is already in progress; waiting for it instead.")
+                return
+            self.log_callback("--- Starting background data load... ---")
+            self.documents_available.clear()
+            self.data_loaded.clear()  # Reset the event
+            self._load_thread = threading.Thread(target=self._load_data, daemon=True)
+            self._load_thread.start()
 
     def _load_data(self):
-        """(Worker Thread) Fetches all data and signals when complete."""
-        self.all_documents = alation_lookup.get_all_documents(self.config, self.log_callback, force_fetch=True)
-        self.all_templates = api_client.get_all_templates(self.config, self.log_callback, force_api_fetch=True)
+        """
+        (Worker Thread) Fetches all data, publishing documents page by page, and signals when complete.
+        This is the only writer of the shared document index. Windows read it as pages arrive
+        (after `documents_available`) and know it is complete once `data_loaded` is set.
+        """
+        try:
+            self.document_index.set_templates(
+                api_client.get_all_templates(self.config, self.log_callback, force_api_fetch=True))
 
-        self.log_callback("--- Background data load complete. ---")
-        self.data_loaded.set()  # Signal that data is ready
\ No newline at end of file
+            self.document_index.clear_documents()
+            for page in api_client.iter_document_pages(self.config, self.log_callback, force_api_fetch=True,
+                                                       incremental=True):
+                self.document_index.add_documents(page)
+                self.documents_available.set()
+                self.log_callback(f"Loaded {len(self.document_index)} documents so far...")
+            self.log_callback("--- Background data load complete. ---")
+        except Exception as e:
+            self.log_callback(f"❌ Background data load failed: {e}")
+        finally:
+            # Set even after a failure, so windows waiting on the load are not stuck.
+            self.documents_available.set()
+            self.data_loaded.set()  # Signal that data is ready
+
+        # Warm the folder cache so picking a hub in any window is instant; readiness does not wait for it.
+        try:
+            alation_lookup.prefetch_folders(self.config, self.document_index.hub_ids(), self.log_callback)
+        except Exception as e:
+            self.log_callback(f"⚠️ Could not prefetch folders: {e}")
+
+    @property
+    def all_documents(self) -> list:
+        return self.document_index.all_documents()
+
+    @property
+    def all_templates(self) -> list:
+        return self.document_index.templates()
\ No newline at end of file
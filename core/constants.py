@@ -1,3 +1,6 @@
 # core/constants.py
 
-APP_TITLE = "Document Hub Uploader"
\ No newline at end of file
+APP_TITLE = "Document Hub Uploader"
+
+# Default number of concurrent API workers. Overridden by "max_workers" in config.json.
+DEFAULT_MAX_WORKERS = 4
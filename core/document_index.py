@@ -0,0 +1,144 @@
+# core/document_index.py
+
+import threading
+from collections import Counter
+
+
+class DocumentIndex:
+    """
+    In-memory indexes over the loaded documents, maintained as pages arrive.
+
+    Keeps id→document, hub→documents, folder→documents (by membership in `folder_ids`),
+    template→documents and hub→template usage counts, so the selectors can answer "what is in
+    this hub" in time proportional to the answer rather than to the whole corpus. Re-adding a
+    document with a known id replaces the old copy in every index.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.clear_documents()
+            self._templates_by_id = {}
+
+    def clear_documents(self) -> None:
+        with self._lock:
+            self._by_id = {}
+            self._by_hub = {}
+            self._by_folder = {}
+            self._by_template = {}
+            self._hub_template_counts = {}
+            self._hubs = {}
+
+    # --- Maintenance ---
+
+    def set_templates(self, templates: list) -> None:
+        with self._lock:
+            self._templates_by_id = {t.get('id'): t for t in templates or []}
+
+    def add_documents(self, documents: list) -> None:
+        """Indexes a page of documents, replacing any already indexed under the same id."""
+        with self._lock:
+            for doc in documents:
+                doc_id = doc.get('id')
+                if doc_id in self._by_id:
+                    self._unindex(self._by_id[doc_id])
+                self._index(doc)
+
+    def remove_documents(self, document_ids) -> None:
+        with self._lock:
+            for doc_id in document_ids:
+                doc = self._by_id.get(doc_id)
+                if doc is not None:
+                    self._unindex(doc)
+
+    def _index(self, doc: dict) -> None:
+        doc_id = doc.get('id')
+        hub_id = doc.get('document_hub_id')
+        template_id = doc.get('template_id')
+        self._by_id[doc_id] = doc
+        if hub_id is not None:
+            self._by_hub.setdefault(hub_id, {})[doc_id] = doc
+            if template_id:
+                self._hub_template_counts.setdefault(hub_id, Counter())[template_id] += 1
+        for folder_id in doc.get('folder_ids') or ():
+            self._by_folder.setdefault(folder_id, {})[doc_id] = doc
+        if template_id is not None:
+            self._by_template.setdefault(template_id, {})[doc_id] = doc
+        if doc.get('parent_folder_id') is None and template_id is None:
+            self._hubs[doc_id] = doc
+
+    def _unindex(self, doc: dict) -> None:
+        doc_id = doc.get('id')
+        hub_id = doc.get('document_hub_id')
+        template_id = doc.get('template_id')
+        del self._by_id[doc_id]
+        if hub_id is not None:
+            self._discard(self._by_hub, hub_id, doc_id)
+            counts = self._hub_template_counts.get(hub_id)
+            if template_id and counts is not None:
+                counts[template_id] -= 1
+                if counts[template_id] <= 0:
+                    del counts[template_id]
+        for folder_id in doc.get('folder_ids') or ():
+            self._discard(self._by_folder, folder_id, doc_id)
+        if template_id is not None:
+            self._discard(self._by_template, template_id, doc_id)
+        self._hubs.pop(doc_id, None)
+
+    @staticmethod
+    def _discard(index: dict, key, doc_id) -> None:
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(doc_id, None)
+            if not bucket:
+                del index[key]
+
+    # --- Queries ---
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, document_id: int) -> dict:
+        return self._by_id.get(document_id)
+
+    def all_documents(self) -> list:
+        with self._lock:
+            return list(self._by_id.values())
+
+    def templates(self) -> list:
+        with self._lock:
+            return list(self._templates_by_id.values())
+
+    def hub_ids(self) -> list:
+        with self._lock:
+            return sorted(self._by_hub)
+
+    def hubs(self) -> list:
+        """Returns the hub documents themselves (no parent folder and no template)."""
+        with self._lock:
+            return list(self._hubs.values())
+
+    def documents_in_hub(self, hub_id: int) -> list:
+        with self._lock:
+            return list(self._by_hub.get(hub_id, {}).values())
+
+    def documents_in_folder(self, folder_id: int) -> list:
+        with self._lock:
+            return list(self._by_folder.get(folder_id, {}).values())
+
+    def documents_with_template(self, template_id: int) -> list:
+        with self._lock:
+            return list(self._by_template.get(template_id, {}).values())
+
+    def template_ids_for_hub(self, hub_id: int) -> set:
+        with self._lock:
+            return set(self._hub_template_counts.get(hub_id, ()))
+
+    def templates_for_hub(self, hub_id: int) -> list:
+        """Returns the templates used by at least one document in the hub."""
+        with self._lock:
+            return [self._templates_by_id[template_id] for template_id in self._hub_template_counts.get(hub_id, ())
+                    if template_id in self._templates_by_id]
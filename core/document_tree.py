@@ -0,0 +1,134 @@
+# core/document_tree.py
+
+import threading
+
+HUB, FOLDER, DOCUMENT = "hub", "folder", "document"
+
+
+class TreeNode:
+    """One hub, folder or document in a DocumentTree. `key` is (kind, id); ids are only unique per kind."""
+
+    __slots__ = ("kind", "id", "title", "parent_key", "child_count", "template_id")
+
+    def __init__(self, kind: str, node_id: int, title: str, parent_key: tuple = None, child_count: int = 0,
+                 template_id: int = None):
+        self.kind = kind
+        self.id = node_id
+        self.title = title
+        self.parent_key = parent_key
+        self.child_count = child_count
+        self.template_id = template_id
+
+    @property
+    def key(self) -> tuple:
+        return self.kind, self.id
+
+    @property
+    def label(self) -> str:
+        return f"{self.title or 'Untitled'} (ID: {self.id})"
+
+
+class DocumentTree:
+    """
+    The folder and document hierarchy of one Document Hub.
+
+    Built in a single pass over the hub's folders and document outlines (see
+    DocumentStore.iter_outline): folders nest by parent_folder_id, documents sit under their
+    parent document if they have one, otherwise under their parent folder (or the first of their
+    folder_ids that is in the hub), otherwise at the hub root. Nothing is sorted up front; a node's
+    children are ordered the first time they are asked for.
+
+    Child documents can be left out of the build: a document whose child_documents_count is
+    non-zero but whose children were not given has them fetched with `load_children(document_id)`
+    when children() is first called for it, which is what expanding it in a tree view does.
+    """
+
+    def __init__(self, hub_id: int, hub_title: str, folders: list, documents=(), load_children=None):
+        self._lock = threading.RLock()
+        self._load_children = load_children
+        self._nodes = {}
+        self._children = {}
+        self._sorted = set()
+        self.root = TreeNode(HUB, hub_id, hub_title)
+        self._nodes[self.root.key] = self.root
+
+        folder_ids = {folder['id'] for folder in folders}
+        for folder in folders:
+            parent_id = folder.get('parent_folder_id')
+            parent_key = (FOLDER, parent_id) if parent_id in folder_ids and parent_id != folder['id'] else self.root.key
+            self._add(TreeNode(FOLDER, folder['id'], folder.get('title'), parent_key))
+        for doc in documents:
+            if doc['id'] != hub_id:
+                self._add(self._document_node(doc, folder_ids))
+
+        # Documents whose parent document was not part of the build go to the hub root rather than vanish.
+        for parent_key in [key for key in self._children if key not in self._nodes]:
+            for child_key in self._children.pop(parent_key):
+                self._nodes[child_key].parent_key = self.root.key
+                self._children.setdefault(self.root.key, []).append(child_key)
+
+    def _document_node(self, doc: dict, folder_ids: set) -> TreeNode:
+        if doc.get('parent_document_id') is not None:
+            parent_key = (DOCUMENT, doc['parent_document_id'])
+        else:
+            folder_id = doc.get('parent_folder_id')
+            if folder_id not in folder_ids:
+                folder_id = next((fid for fid in doc.get('folder_ids') or () if fid in folder_ids), None)
+            parent_key = (FOLDER, folder_id) if folder_id is not None else self.root.key
+        return TreeNode(DOCUMENT, doc['id'], doc.get('title'), parent_key, doc.get('child_documents_count') or 0,
+                        doc.get('template_id'))
+
+    def _add(self, node: TreeNode) -> None:
+        self._nodes[node.key] = node
+        self._children.setdefault(node.parent_key, []).append(node.key)
+
+    @classmethod
+    def from_store(cls, store, hub_id: int, hub_title: str, folders: list) -> "DocumentTree":
+        """Builds the tree from the document cache with top-level documents only; child documents load on expand."""
+        return cls(hub_id, hub_title, folders, store.iter_outline(hub_id=hub_id, top_level_only=True),
+                   load_children=lambda document_id: store.iter_outline(parent_document_id=document_id))
+
+    # --- Queries ---
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def get(self, key: tuple) -> TreeNode:
+        return self._nodes.get(key)
+
+    def has_children(self, key: tuple) -> bool:
+        """True if the node has children, loaded or not, without loading them."""
+        node = self._nodes.get(key)
+        return bool(self._children.get(key)) or (node is not None and node.child_count > 0)
+
+    def children(self, key: tuple) -> list:
+        """The node's children, folders first, then by title; loads a document's child documents if needed."""
+        with self._lock:
+            if key not in self._sorted:
+                node = self._nodes[key]
+                if node.kind == DOCUMENT and node.child_count and key not in self._children and self._load_children:
+                    for doc in self._load_children(node.id):
+                        if (DOCUMENT, doc['id']) not in self._nodes:
+                            self._add(TreeNode(DOCUMENT, doc['id'], doc.get('title'), key,
+                                               doc.get('child_documents_count') or 0, doc.get('template_id')))
+                self._children.get(key, []).sort(
+                    key=lambda child: (self._nodes[child].kind != FOLDER, (self._nodes[child].title or "").casefold(),
+                                       self._nodes[child].id))
+                self._sorted.add(key)
+            return [self._nodes[child] for child in self._children.get(key, ())]
+
+    def path(self, key: tuple) -> list:
+        """The nodes from the hub root down to `key`."""
+        nodes, seen = [], set()
+        while key is not None and key not in seen and key in self._nodes:
+            seen.add(key)
+            nodes.append(self._nodes[key])
+            key = self._nodes[key].parent_key
+        return nodes[::-1]
+
+    def iter_folders(self, key: tuple = None, depth: int = 0):
+        """(Generator) Yields (depth, folder node) for every folder in tree order, without loading any documents."""
+        for child in self.children(key or self.root.key):
+            if child.kind == FOLDER:
+                yield depth, child
+                yield from self.iter_folders(child.key, depth + 1)
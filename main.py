@@ -1,14 +1,22 @@
 import platform
+import sys
 from pathlib import Path
 from config.config_handler import load_config
+from utils import metrics
 from utils.token_checker import check_token
-import gui
 
 
 def main():
     """
     Initializes the application, checks the token, and starts the GUI.
+    With command-line arguments, runs headless instead (see cli.py).
     """
+    if len(sys.argv) > 1:
+        import cli
+        sys.exit(cli.main(sys.argv[1:]))
+
+    import gui  # Tk is only needed for the GUI
+
     print(f"Running Python version: {platform.python_version()} ({platform.python_implementation()})")
 
     config_path = Path("config.json")
@@ -23,6 +31,10 @@ def main():
     # Start the GUI and pass the initial state
     gui.start_gui(config, is_token_valid, status_message)
 
+    # Optionally keep the session's API metrics (.json, or .prom for Prometheus text)
+    if config.get("metrics_output"):
+        print(f"API metrics written to {metrics.registry.dump(config['metrics_output'])}")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,110 @@
+# ui/components/log_console.py
+
+import queue
+import tkinter as tk
+from collections import deque
+from tkinter import ttk, scrolledtext
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+MAX_LINES = 5000
+DRAIN_INTERVAL_MS = 100
+MAX_MESSAGES_PER_DRAIN = 5000
+
+
+def message_level(message: str) -> str:
+    """Infers a level from the app's message conventions ("DEBUG:" prefixes, ❌ / ⚠️ markers)."""
+    if message.startswith("DEBUG"):
+        return "DEBUG"
+    if "❌" in message:
+        return "ERROR"
+    if "⚠️" in message:
+        return "WARNING"
+    return "INFO"
+
+
+class LogConsole(ttk.Frame):
+    """
+    A log console that any thread can write to.
+
+    `log()` only puts the message on a queue; the Tk main loop drains the queue every
+    DRAIN_INTERVAL_MS and inserts the whole batch at once. The console keeps the last MAX_LINES
+    messages in a ring buffer, and a level filter controls which of them are shown.
+    """
+
+    def __init__(self, parent, on_message: callable = None, max_lines: int = MAX_LINES):
+        super().__init__(parent)
+        self.on_message = on_message
+        self.max_lines = max_lines
+        self._queue = queue.SimpleQueue()
+        self._lines = deque(maxlen=max_lines)
+        self.level_var = tk.StringVar(value="INFO")
+
+        self._create_widgets()
+        self.after(DRAIN_INTERVAL_MS, self._drain)
+
+    def _create_widgets(self):
+        self.rowconfigure(1, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        toolbar = ttk.Frame(self)
+        toolbar.grid(row=0, column=0, sticky="ew", pady=(0, 5))
+        ttk.Label(toolbar, text="Show:").pack(side=tk.LEFT)
+        level_selector = ttk.Combobox(toolbar, textvariable=self.level_var, values=LEVELS, state="readonly", width=10)
+        level_selector.pack(side=tk.LEFT, padx=5)
+        level_selector.bind("<<ComboboxSelected>>", lambda event: self._render_all())
+        ttk.Button(toolbar, text="Clear", command=self.clear).pack(side=tk.RIGHT)
+
+        self.text = scrolledtext.ScrolledText(self, state='disabled', wrap=tk.WORD, height=10)
+        self.text.grid(row=1, column=0, sticky="nsew")
+
+    def log(self, message) -> None:
+        """Queues a message. Safe to call from any thread."""
+        message = str(message)
+        self._queue.put((message_level(message), message))
+
+    def clear(self) -> None:
+        self._lines.clear()
+        self._render_all()
+
+    def _visible(self, level: str) -> bool:
+        return LEVELS.index(level) >= LEVELS.index(self.level_var.get())
+
+    def _drain(self):
+        """(Main Thread) Moves queued messages into the ring buffer and the text widget in one batch."""
+        batch = []
+        try:
+            while len(batch) < MAX_MESSAGES_PER_DRAIN:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        if batch:
+            self._lines.extend(batch)
+            visible = [message for level, message in batch[-self.max_lines:] if self._visible(level)]
+            if visible:
+                self._append(visible)
+            if self.on_message:
+                self.on_message(batch[-1][1])
+
+        self.after(DRAIN_INTERVAL_MS if len(batch) < MAX_MESSAGES_PER_DRAIN else 1, self._drain)
+
+    def _append(self, messages: list) -> None:
+        at_bottom = self.text.yview()[1] >= 0.999
+        self.text.configure(state='normal')
+        self.text.insert(tk.END, "\n".join(messages) + "\n")
+        # Messages can span several lines, so trim by the widget's own line count.
+        excess = int(self.text.index("end-1c").split(".")[0]) - 1 - self.max_lines
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+        self.text.configure(state='disabled')
+        if at_bottom:
+            self.text.see(tk.END)
+
+    def _render_all(self) -> None:
+        """(Main Thread) Redraws the buffered messages that pass the current level filter."""
+        messages = [message for level, message in self._lines if self._visible(level)]
+        self.text.configure(state='normal')
+        self.text.delete("1.0", tk.END)
+        self.text.configure(state='disabled')
+        if messages:
+            self._append(messages)
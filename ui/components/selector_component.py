@@ -2,9 +2,12 @@
 
 import tkinter as tk
 from tkinter import ttk
-import threading
 from core.app_state import AppState
-from utils import alation_lookup, api_client
+from core.document_tree import DocumentTree
+from utils import alation_lookup, single_flight
+
+# How often the hub list is refreshed from the shared index while AppState is still loading.
+HUB_POLL_INTERVAL_MS = 250
 
 
 class SelectorComponent(ttk.Frame):
@@ -15,8 +18,8 @@ class SelectorComponent(ttk.Frame):
         self.app_state = app_state
         self.action_button = action_button
 
-        self.all_documents = []
-        self.all_templates = []
+        self.document_index = app_state.document_index
+        self.hub_ids = set()
         self.folders_in_hub = []
 
         self._create_widgets()
@@ -26,7 +29,7 @@ class SelectorComponent(ttk.Frame):
     def _create_widgets(self):
         self.columnconfigure(1, weight=1)
 
-        self.refresh_button = ttk.Button(self, text="Refresh Alation Data", command=self.start_threaded_load)
+        self.refresh_button = ttk.Button(self, text="Refresh Alation Data", command=self._refresh)
         self.refresh_button.grid(row=0, column=0, padx=5, pady=5, sticky="w")
 
         ttk.Label(self, text="Document Hub ID:").grid(row=1, column=0, padx=5, pady=5, sticky=tk.W)
@@ -46,8 +49,16 @@ class SelectorComponent(ttk.Frame):
         self.progress_bar.grid(row=4, column=0, columnspan=2, sticky="ew", pady=(10, 0))
         self.progress_bar.grid_remove()
 
+    def _refresh(self):
+        """Reloads everything through AppState, including folders still cached and fetches that just finished."""
+        alation_lookup.invalidate_folder_cache()
+        single_flight.forget("documents")
+        single_flight.forget("templates")
+        self.app_state.start_background_load()
+        self.start_threaded_load()
+
     def start_threaded_load(self):
-        """Disables controls and starts fetching data in a background thread."""
+        """Disables controls and follows AppState's data load, making hubs selectable as their documents arrive."""
         self.hub_selector.set('');
         self.folder_selector.set('');
         self.template_selector.set('')
@@ -57,30 +68,50 @@ class SelectorComponent(ttk.Frame):
 
         self.progress_bar.grid()
         self.progress_bar.start(10)
+        self.hub_ids = set()
+        self._poll_load()
+
+    def _poll_load(self):
+        """
+        (Main Thread) Refreshes the hub list from AppState's index every HUB_POLL_INTERVAL_MS until
+        the load finishes. AppState owns the shared index; the selector only reads it.
+        """
+        if not self.winfo_exists():
+            return
+        if not self.app_state.is_token_valid:
+            self.app_state.log_callback("❌ Selections: Token not valid, no data to load.")
+            self._finish_loading_documents()
+            return
+
+        finished = self.app_state.data_loaded.is_set()  # Read first, so the last refresh sees every page
+        if self.app_state.documents_available.is_set():
+            self._show_loaded_hubs()
+        if finished:
+            self._finish_loading_documents()
+        else:
+            self.after(HUB_POLL_INTERVAL_MS, self._poll_load)
+
+    @property
+    def all_templates(self) -> list:
+        return self.document_index.templates()
+
+    def _show_loaded_hubs(self):
+        """(Main Thread) Makes the hubs loaded so far selectable."""
+        hub_ids = set(self.document_index.hub_ids())
+        if hub_ids != self.hub_ids:
+            self.hub_ids = hub_ids
+            self.hub_selector['values'] = sorted(hub_ids)
+            self.app_state.log_callback(
+                f"Selections: {len(self.document_index)} documents loaded, {len(hub_ids)} Document Hub IDs so far...")
+        self.hub_selector['state'] = 'readonly'
 
-        thread = threading.Thread(target=self._load_data_in_background, daemon=True)
-        thread.start()
-
-    def _load_data_in_background(self):
-        """(Worker Thread) Fetches all necessary data from Alation APIs."""
-        self.app_state.log_callback("--- Selections: Refreshing base data... ---")
-        docs = alation_lookup.get_all_documents(self.app_state.config, self.app_state.log_callback, force_fetch=True)
-        templates = api_client.get_all_templates(self.app_state.config, self.app_state.log_callback,
-                                                 force_api_fetch=True)
-        self.after(0, self._update_ui_with_loaded_data, docs, templates)
-
-    def _update_ui_with_loaded_data(self, docs, templates):
-        """(Main Thread) Updates the UI after data has been fetched."""
+    def _finish_loading_documents(self):
+        """(Main Thread) Updates the UI once AppState's load has finished."""
         self.progress_bar.stop()
         self.progress_bar.grid_remove()
-        self.all_documents = docs
-        self.all_templates = templates
-
-        if self.all_documents:
-            hub_ids = sorted(list(
-                set(doc['document_hub_id'] for doc in self.all_documents if doc.get('document_hub_id') is not None)))
-            self.hub_selector['values'] = hub_ids
-            self.app_state.log_callback(f"✅ Selections: Found {len(hub_ids)} unique Document Hub IDs.")
+
+        if len(self.document_index):
+            self.app_state.log_callback(f"✅ Selections: Found {len(self.hub_ids)} unique Document Hub IDs.")
         else:
             self.app_state.log_callback("❌ Selections: No documents found.")
 
@@ -88,40 +119,40 @@ class SelectorComponent(ttk.Frame):
                        self.action_button]:
             if widget: widget['state'] = 'readonly' if isinstance(widget, ttk.Combobox) else 'normal'
 
-        # In ui/components/selector_component.py, replace this method:
-
-        def _on_hub_selected(self, event=None):
-            """Callback when a hub is selected. Populates folders and templates."""
-            try:
-                selected_hub_id = int(self.hub_selector.get())
-            except (ValueError, TypeError):
-                return
+    def _on_hub_selected(self, event=None):
+        """Callback when a hub is selected. Populates folders and templates."""
+        try:
+            selected_hub_id = int(self.hub_selector.get())
+        except (ValueError, TypeError):
+            return
 
-            self.app_state.log_callback(f"--- Selections: Populating for Hub ID: {selected_hub_id} ---")
+        self.app_state.log_callback(f"--- Selections: Populating for Hub ID: {selected_hub_id} ---")
 
-            # 1. Populate Folders (This part is working correctly)
-            self.folders_in_hub = alation_lookup.get_folders_for_hub(self.app_state.config, selected_hub_id,
-                                                                     self.app_state.log_callback)
-            folder_display_list = [f"{f.get('title')} (ID: {f.get('id')})" for f in self.folders_in_hub]
-            self.folder_selector['values'] = folder_display_list
-            if folder_display_list:
-                self.folder_selector.set(folder_display_list[0])
+        # 1. Populate Folders (This part is working correctly)
+        self.folders_in_hub = alation_lookup.get_folders_for_hub(self.app_state.config, selected_hub_id,
+                                                                 self.app_state.log_callback)
+        # Indented in hierarchy order, so nested folders read as a tree
+        folder_tree = DocumentTree(selected_hub_id, "", self.folders_in_hub)
+        folder_display_list = [f"{'    ' * depth}{folder.label}" for depth, folder in folder_tree.iter_folders()]
+        self.folder_selector['values'] = folder_display_list
+        if folder_display_list:
+            self.folder_selector.set(folder_display_list[0])
+        self.folder_selector['state'] = 'readonly'
 
-            # 2. CORRECTED LOGIC: Filter templates based on document usage within the selected hub
-            docs_in_hub = [doc for doc in self.all_documents if str(doc.get('document_hub_id')) == str(selected_hub_id)]
-            template_ids_in_hub = {doc.get('template_id') for doc in docs_in_hub if doc.get('template_id')}
-            compatible_templates = [t for t in self.all_templates if t.get('id') in template_ids_in_hub]
+        # 2. Templates used by documents within the selected hub, straight from the hub index
+        compatible_templates = self.document_index.templates_for_hub(selected_hub_id)
 
-            template_display_names = sorted([f"{t.get('title')} (ID: {t.get('id')})" for t in compatible_templates])
+        template_display_names = sorted([f"{t.get('title')} (ID: {t.get('id')})" for t in compatible_templates])
 
-            self.template_selector['values'] = template_display_names
-            if template_display_names:
-                self.template_selector.set(template_display_names[0])
-            else:
-                self.template_selector.set('')
+        self.template_selector['values'] = template_display_names
+        if template_display_names:
+            self.template_selector.set(template_display_names[0])
+        else:
+            self.template_selector.set('')
+        self.template_selector['state'] = 'readonly'
 
-            self.app_state.log_callback(
-                f"✅ Selections: Found {len(folder_display_list)} folders and {len(template_display_names)} compatible templates.")
+        self.app_state.log_callback(
+            f"✅ Selections: Found {len(folder_display_list)} folders and {len(template_display_names)} compatible templates.")
 
     def _get_id_from_selection(self, selection_string: str) -> int:
         if not selection_string or "(ID:" not in selection_string: return None
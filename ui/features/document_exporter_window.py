@@ -0,0 +1,80 @@
+# ui/features/document_exporter_window.py
+
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from core.app_state import AppState
+from ui.components.selector_component import SelectorComponent
+from utils import document_exporter
+
+
+class DocumentExporterWindow(tk.Toplevel):
+    def __init__(self, parent, app_state: AppState):
+        super().__init__(parent)
+        self.title("Export Documents")
+        self.geometry("700x420")
+        self.transient(parent)
+        self.grab_set()
+
+        self.app_state = app_state
+        self.whole_hub_var = tk.BooleanVar(value=False)
+        self._create_widgets()
+
+    def _create_widgets(self):
+        main_frame = ttk.Frame(self, padding=10)
+        main_frame.pack(expand=True, fill="both")
+
+        self.export_button = ttk.Button(main_frame, text="Export...", command=self._export, state="disabled")
+
+        selectors_lf = ttk.LabelFrame(main_frame, text="Selections", padding=10)
+        selectors_lf.pack(fill="x", expand=False, pady=5)
+        self.selectors = SelectorComponent(selectors_lf, self.app_state, action_button=self.export_button)
+        self.selectors.pack(expand=True, fill="both")
+
+        options_lf = ttk.LabelFrame(main_frame, text="Options", padding=10)
+        options_lf.pack(fill="x", expand=False, pady=5)
+        ttk.Checkbutton(options_lf, text="Whole hub (every folder; one file per template)",
+                        variable=self.whole_hub_var).pack(anchor=tk.W)
+
+        self.export_button.pack(pady=10)
+
+    def _export(self):
+        selections = self.selectors.get_selections()
+        whole_hub = self.whole_hub_var.get()
+        if not selections.get("hub_id") or not whole_hub and not all(
+                [selections.get("folder_id"), selections.get("template_id")]):
+            messagebox.showwarning("Missing Information", "Please select a hub, and a folder and template unless "
+                                                          "exporting the whole hub.", parent=self)
+            return
+
+        output_path = filedialog.asksaveasfilename(parent=self, defaultextension=".xlsx",
+                                                   filetypes=(("Excel files", "*.xlsx"), ("Parquet", "*.parquet")))
+        if not output_path:
+            return
+
+        self.export_button['state'] = 'disabled'
+        filters = {"hub_id": selections["hub_id"]}
+        if not whole_hub:
+            filters.update(folder_id=selections["folder_id"], template_id=selections["template_id"])
+        threading.Thread(target=self._export_in_background, args=(output_path, filters), daemon=True).start()
+
+    def _export_in_background(self, output_path: str, filters: dict):
+        """(Worker Thread) Runs the export and reports back on the main thread."""
+        try:
+            result = document_exporter.export_documents(self.app_state.config, output_path,
+                                                        log_callback=self.app_state.log_callback, **filters)
+            self.after(0, self._on_export_finished, result, None)
+        except Exception as e:
+            self.app_state.log_callback(f"❌ Export failed: {e}")
+            self.after(0, self._on_export_finished, None, e)
+
+    def _on_export_finished(self, result: dict, error: Exception):
+        """(Main Thread)"""
+        if not self.winfo_exists():
+            return
+        self.export_button['state'] = 'normal'
+        if error is not None:
+            messagebox.showerror("Error", f"Export failed: {error}", parent=self)
+            return
+        files = "\n".join(entry["path"] for entry in result["files"]) or "(no matching documents)"
+        messagebox.showinfo("Export Complete", f"Exported {result['documents']} documents to:\n{files}", parent=self)
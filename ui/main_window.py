@@ -1,9 +1,10 @@
 # ui/main_window.py
 
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
+from tkinter import ttk, messagebox
 from core.app_state import AppState
-from ui import config_window, misc_tools_window
+from ui import config_window, metrics_window, misc_tools_window
+from ui.components.log_console import LogConsole
 
 
 # Feature window imports are now moved into the methods below
@@ -37,6 +38,7 @@ class MainApplication(ttk.Frame):
         tools_menu = tk.Menu(self.menu_bar, tearoff=0)
         self.menu_bar.add_cascade(label="Tools", menu=tools_menu)
         tools_menu.add_command(label="Misc Tools", command=self.open_misc_tools_window)
+        tools_menu.add_command(label="API Metrics", command=self.open_metrics_window)
 
     def _create_widgets(self):
         """Creates the main menu buttons and the log console."""
@@ -51,12 +53,14 @@ class MainApplication(ttk.Frame):
         ttk.Button(main_menu_frame, text="Upload Documents", command=self.open_document_uploader).pack(pady=10,
                                                                                                        ipadx=10,
                                                                                                        ipady=5)
+        ttk.Button(main_menu_frame, text="Export Documents", command=self.open_document_exporter).pack(
+            pady=10, ipadx=10, ipady=5)
 
         log_frame = ttk.LabelFrame(self, text="Log Console", padding="5")
         log_frame.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
         log_frame.rowconfigure(0, weight=1)
         log_frame.columnconfigure(0, weight=1)
-        self.log_console = scrolledtext.ScrolledText(log_frame, state='disabled', wrap=tk.WORD, height=10)
+        self.log_console = LogConsole(log_frame, on_message=lambda message: self.status_bar.config(text=message))
         self.log_console.grid(row=0, column=0, sticky="nsew")
 
         self.status_bar = ttk.Label(self, text="Ready", relief=tk.SUNKEN, anchor=tk.W, padding="2")
@@ -68,7 +72,7 @@ class MainApplication(ttk.Frame):
             messagebox.showerror("Error", "Token is not valid. Please configure first.")
             return
 
-        if not self.app_state.data_loaded.is_set():
+        if not self.app_state.documents_available.is_set():
             messagebox.showinfo("Data Loading",
                                 "Initial data is still being fetched from Alation in the background. Please wait a moment and try again.",
                                 parent=self)
@@ -89,6 +93,11 @@ class MainApplication(ttk.Frame):
         from ui.features.document_uploader_window import DocumentUploaderWindow
         self._open_feature_window(DocumentUploaderWindow)
 
+    def open_document_exporter(self):
+        """Opens the Document Exporter feature window."""
+        from ui.features.document_exporter_window import DocumentExporterWindow
+        self._open_feature_window(DocumentExporterWindow)
+
     def open_config_window(self):
         win = config_window.ConfigWindow(self, self.app_state)
         win.grab_set()
@@ -97,10 +106,9 @@ class MainApplication(ttk.Frame):
         win = misc_tools_window.MiscToolsWindow(self, self.app_state)
         win.grab_set()
 
+    def open_metrics_window(self):
+        metrics_window.MetricsWindow(self, self.app_state)
+
     def log_to_console(self, message):
-        """Appends a message to the log console and status bar."""
-        self.status_bar.config(text=message)
-        self.log_console.configure(state='normal')
-        self.log_console.insert(tk.END, str(message) + '\n')
-        self.log_console.configure(state='disabled')
-        self.log_console.see(tk.END)
\ No newline at end of file
+        """Queues a message for the log console and status bar. Safe to call from worker threads."""
+        self.log_console.log(message)
\ No newline at end of file
@@ -0,0 +1,73 @@
+# ui/metrics_window.py
+
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from utils import metrics
+
+REFRESH_INTERVAL_MS = 2000
+
+
+class MetricsWindow(tk.Toplevel):
+    """A Toplevel window showing per-endpoint API metrics, refreshed live, with export to JSON or Prometheus."""
+
+    COLUMNS = (("method", "Method", 60), ("endpoint", "Endpoint", 230), ("requests", "Calls", 60),
+               ("errors", "Errors", 60), ("retries", "Retries", 60), ("p50", "p50 ms", 70),
+               ("p95", "p95 ms", 70), ("max", "Max ms", 70), ("bytes", "KB", 80))
+
+    def __init__(self, parent, app_state):
+        super().__init__(parent)
+        self.title("API Metrics")
+        self.geometry("820x360")
+        self.transient(parent)
+
+        self.app_state = app_state
+        self._create_widgets()
+        self._refresh()
+
+    def _create_widgets(self):
+        main_frame = ttk.Frame(self, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        main_frame.rowconfigure(0, weight=1)
+        main_frame.columnconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(main_frame, columns=[name for name, _, _ in self.COLUMNS], show="headings")
+        for name, heading, width in self.COLUMNS:
+            self.tree.heading(name, text=heading)
+            self.tree.column(name, width=width, anchor=tk.W if name == "endpoint" else tk.E)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=1, column=0, columnspan=2, sticky="e", pady=(10, 0))
+        ttk.Button(button_frame, text="Reset", command=self._reset).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Export...", command=self._export).pack(side=tk.LEFT, padx=5)
+
+    def _refresh(self):
+        """Redraws the table from the registry, then schedules the next refresh while the window is open."""
+        if not self.winfo_exists():
+            return
+        self.tree.delete(*self.tree.get_children())
+        for entry in metrics.registry.snapshot()["endpoints"]:
+            latency = entry["latency_seconds"]
+            self.tree.insert("", tk.END, values=(
+                entry["method"], entry["endpoint"], entry["requests"], entry["errors"], entry["retries"],
+                f"{latency['p50'] * 1000:.0f}", f"{latency['p95'] * 1000:.0f}", f"{latency['max'] * 1000:.0f}",
+                f"{entry['response_bytes'] / 1024:.0f}"))
+        self.after(REFRESH_INTERVAL_MS, self._refresh)
+
+    def _reset(self):
+        metrics.registry.reset()
+        self.tree.delete(*self.tree.get_children())
+
+    def _export(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".json",
+                                            filetypes=(("JSON", "*.json"), ("Prometheus text", "*.prom")))
+        if not path:
+            return
+        try:
+            metrics.registry.dump(path)
+            self.app_state.log_callback(f"✅ API metrics written to {path}")
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not write metrics: {e}", parent=self)
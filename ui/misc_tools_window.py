@@ -1,15 +1,20 @@
 # ui/misc_tools_window.py
 
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import logging
 
 # NOTE: AppState import is removed from here to prevent circular dependency
-from utils import alation_lookup
+from core.document_tree import DocumentTree, FOLDER
+from utils import alation_lookup, api_client
 from utils.processing_utils import process_hub_and_folders
 
 logger = logging.getLogger(__name__)
 
+# Children inserted into the hub tree per expand; the rest wait behind a "more" item.
+TREE_BATCH_SIZE = 500
+
 class MiscToolsWindow(tk.Toplevel):
     """
     A Toplevel window for miscellaneous tools, such as creating empty documents
@@ -25,7 +30,7 @@ class MiscToolsWindow(tk.Toplevel):
         """
         super().__init__(parent)
         self.title("Miscellaneous Tools")
-        self.geometry("600x450")
+        self.geometry("600x750")
 
         # --- Defer import to break the circular dependency ---
         from core.app_state import AppState
@@ -41,6 +46,9 @@ class MiscToolsWindow(tk.Toplevel):
         self.folders = []
         self.selected_hub_id = tk.IntVar(value=0)
         self.selected_folder_id = tk.IntVar(value=0)
+        self.hub_tree = None
+        self._tree_items = {}
+        self._more_items = {}
 
         # --- Main Frame ---
         self.main_frame = ttk.Frame(self, padding="10")
@@ -84,10 +92,34 @@ class MiscToolsWindow(tk.Toplevel):
         self.process_button.grid(row=4, column=0, columnspan=3, padx=5, pady=10)
         self.process_button['state'] = 'disabled'
 
+        mirror_frame = ttk.LabelFrame(self.main_frame, text="Mirror Hub to Disk", padding="10")
+        mirror_frame.pack(fill=tk.X, expand=True, pady=5)
+        ttk.Label(mirror_frame, text="Writes the selected hub's folders and documents (Markdown and JSON). "
+                                     "Later runs only rewrite what changed.", wraplength=540).pack(anchor=tk.W)
+        self.mirror_button = ttk.Button(mirror_frame, text="Mirror Hub...", command=self.mirror_hub)
+        self.mirror_button.pack(pady=5)
+        self.mirror_button['state'] = 'disabled'
+
+        browse_frame = ttk.LabelFrame(self.main_frame, text="Browse Hub", padding="10")
+        browse_frame.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.hub_tree_view = ttk.Treeview(browse_frame, columns=("id",), height=12)
+        self.hub_tree_view.heading("#0", text="Title")
+        self.hub_tree_view.heading("id", text="ID")
+        self.hub_tree_view.column("id", width=90, stretch=False)
+        tree_scrollbar = ttk.Scrollbar(browse_frame, orient=tk.VERTICAL, command=self.hub_tree_view.yview)
+        self.hub_tree_view.configure(yscrollcommand=tree_scrollbar.set)
+        self.hub_tree_view.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        tree_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.hub_tree_view.bind("<<TreeviewOpen>>", self._on_tree_open)
+        self.hub_tree_view.bind("<<TreeviewSelect>>", self._on_tree_select)
+
     def load_hubs(self):
         """Loads Document Hubs into the hub selector combobox."""
         self.log_callback("Misc Tools: Fetching Document Hubs...")
-        self.hubs = alation_lookup.get_document_hubs(self.config, log_callback=self.log_callback)
+        # Reuse the application's document index once its background load has finished.
+        document_index = self.app_state.document_index if self.app_state.data_loaded.is_set() else None
+        self.hubs = alation_lookup.get_document_hubs(self.config, log_callback=self.log_callback,
+                                                     document_index=document_index)
         if self.hubs:
             hub_names = [f"{hub.get('title', 'Untitled')} (ID: {hub.get('id')})" for hub in self.hubs]
             self.hub_selector['values'] = hub_names
@@ -109,17 +141,72 @@ class MiscToolsWindow(tk.Toplevel):
         self.folder_selector['values'] = []
         self.folder_selector.set('')
         self.process_button['state'] = 'disabled'
+        self.mirror_button['state'] = 'normal'
 
         self.log_callback(f"Misc Tools: Fetching folders for Hub ID {hub_id}...")
         self.folders = alation_lookup.get_folders_for_hub(self.config, hub_id, log_callback=self.log_callback)
 
-        folder_names = [f"{folder.get('title', 'Untitled')} (ID: {folder.get('id')})" for folder in self.folders]
         hub_title = selection.split(' (ID:')[0]
+        self._show_hub_tree(hub_id, hub_title)
+        folder_names = [f"{'    ' * depth}{folder.label}" for depth, folder in self.hub_tree.iter_folders()]
         folder_names.insert(0, f"{hub_title} (Hub Root)")
 
         self.folder_selector['values'] = folder_names
         self.log_callback(f"✅ Misc Tools: Found {len(self.folders)} folders.")
 
+    def _show_hub_tree(self, hub_id: int, hub_title: str):
+        """Builds the hub's tree from the document cache and shows its top level; deeper levels load on expand."""
+        self.hub_tree_view.delete(*self.hub_tree_view.get_children())
+        self._tree_items, self._more_items = {}, {}
+        self.hub_tree = DocumentTree.from_store(api_client.document_store, hub_id, hub_title, self.folders)
+        self._insert_tree_children("", self.hub_tree.root.key)
+
+    def _insert_tree_children(self, parent_iid: str, key: tuple, offset: int = 0):
+        """Inserts the next batch of a node's children, each with a placeholder child if it can be expanded."""
+        children = self.hub_tree.children(key)
+        for node in children[offset:offset + TREE_BATCH_SIZE]:
+            iid = f"{node.kind}:{node.id}"
+            icon = "📁" if node.kind == FOLDER else "📄"
+            self.hub_tree_view.insert(parent_iid, tk.END, iid=iid, text=f"{icon} {node.title or 'Untitled'}",
+                                      values=(node.id,))
+            self._tree_items[iid] = node.key
+            if self.hub_tree.has_children(node.key):
+                self.hub_tree_view.insert(iid, tk.END, iid=f"{iid}:placeholder", text="Loading...")
+
+        remaining = len(children) - offset - TREE_BATCH_SIZE
+        if remaining > 0:
+            more_iid = f"{parent_iid or 'root'}:more"
+            self.hub_tree_view.insert(parent_iid, tk.END, iid=more_iid, text=f"… {remaining} more (select to show)")
+            self._more_items[more_iid] = (parent_iid, key, offset + TREE_BATCH_SIZE)
+
+    def _on_tree_open(self, event=None):
+        """Replaces an expanded node's placeholder with its children, loading them on first expand."""
+        iid = self.hub_tree_view.focus()
+        placeholder = f"{iid}:placeholder"
+        if self.hub_tree_view.exists(placeholder):
+            self.hub_tree_view.delete(placeholder)
+            self._insert_tree_children(iid, self._tree_items[iid])
+
+    def _on_tree_select(self, event=None):
+        """Shows the next batch when a "more" item is picked; picking a folder selects it as the target folder."""
+        selection = self.hub_tree_view.selection()
+        if not selection:
+            return
+        iid = selection[0]
+        if iid in self._more_items:
+            parent_iid, key, offset = self._more_items.pop(iid)
+            self.hub_tree_view.delete(iid)
+            self._insert_tree_children(parent_iid, key, offset)
+            return
+
+        key = self._tree_items.get(iid)
+        if key and key[0] == FOLDER:
+            folder_name = next((name for name in self.folder_selector['values'] if name.endswith(f"(ID: {key[1]})")),
+                               None)
+            if folder_name:
+                self.folder_selector.set(folder_name)
+                self.folder_selected_callback()
+
     def folder_selected_callback(self, event=None):
         """Handles the selection of a new folder."""
         selection = self.folder_selector.get()
@@ -161,4 +248,40 @@ class MiscToolsWindow(tk.Toplevel):
             logger.error(f"Error during document generation setup: {e}", exc_info=True)
             messagebox.showerror("Error", f"An error occurred: {e}")
         finally:
-            self.process_button['state'] = 'normal'
\ No newline at end of file
+            self.process_button['state'] = 'normal'
+
+    def mirror_hub(self):
+        """Asks for a target directory and mirrors the selected hub into it on a background thread."""
+        hub_id = self.selected_hub_id.get()
+        hub = next((h for h in self.hubs if h.get('id') == hub_id), None)
+        if not hub:
+            messagebox.showwarning("Missing Information", "Please select a hub.", parent=self)
+            return
+        base_dir = filedialog.askdirectory(parent=self, title="Mirror hub into...")
+        if not base_dir:
+            return
+
+        self.mirror_button['state'] = 'disabled'
+        threading.Thread(target=self._mirror_in_background, args=(hub_id, hub.get('title', ''), base_dir),
+                         daemon=True).start()
+
+    def _mirror_in_background(self, hub_id: int, hub_title: str, base_dir: str):
+        """(Worker Thread) Runs the mirror and reports back on the main thread."""
+        try:
+            summary = process_hub_and_folders(self.config, hub_id, hub_title, base_dir, log_callback=self.log_callback)
+            self.after(0, self._on_mirror_finished, summary, None)
+        except Exception as e:
+            self.after(0, self._on_mirror_finished, None, e)
+
+    def _on_mirror_finished(self, summary: dict, error: Exception):
+        """(Main Thread)"""
+        if not self.winfo_exists():
+            return
+        self.mirror_button['state'] = 'normal'
+        if error is not None:
+            messagebox.showerror("Error", f"Mirroring failed: {error}", parent=self)
+            return
+        messagebox.showinfo("Mirror Complete",
+                            f"Mirrored {summary['documents']} documents to:\n{summary['path']}\n\n"
+                            f"{summary['written']} written, {summary['unchanged']} unchanged, "
+                            f"{summary['deleted_files']} stale files removed.", parent=self)
@@ -1,11 +1,32 @@
 # utils/alation_lookup.py
 
 import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from core.constants import DEFAULT_MAX_WORKERS
 from utils.token_checker import _make_api_request_with_retry, refresh_access_token
 from utils import api_client
 
 logger = logging.getLogger(__name__)
 
+# Bounded LRU cache of OBJECT_SET name lookups, shared by every upload in the session.
+OBJECT_LOOKUP_CACHE_SIZE = 10000
+_object_cache = OrderedDict()
+_object_cache_lock = threading.Lock()
+_CACHE_MISS = object()
+_LOOKUP_FAILED = object()  # Returned by the finders when the search request itself failed
+# A literal OBJECT_SET reference such as "table:123" or "user:45".
+OBJECT_REFERENCE_PATTERN = re.compile(r"^([a-z_]+):(\d+)$")
+
+# Folder listings per Document Hub, reused for FOLDER_CACHE_TTL_SECONDS.
+FOLDER_CACHE_TTL_SECONDS = 600
+_folder_cache = {}
+_folder_cache_lock = threading.Lock()
+
 
 def get_all_documents(config: dict, log_callback=print, force_fetch: bool = False) -> list:
     """Convenience function to fetch all documents via the api_client."""
@@ -13,13 +34,20 @@ def get_all_documents(config: dict, log_callback=print, force_fetch: bool = Fals
     return api_client.get_all_documents(config, log_callback=log_callback, force_api_fetch=force_fetch)
 
 
-def get_document_hubs(config: dict, log_callback=print) -> list:
+def get_document_hubs(config: dict, log_callback=print, document_index=None) -> list:
     """
     Fetches all documents and filters them to find Document Hubs.
     Hubs are identified as documents with no parent folder AND no assigned template.
+    If a loaded DocumentIndex is given, its hub index is used instead of fetching.
     """
+    if document_index is not None and len(document_index):
+        hubs = document_index.hubs()
+        log_callback(f"✅ Found {len(hubs)} Document Hubs.")
+        return hubs
+
     log_callback("Fetching all documents to identify hubs...")
-    all_documents = api_client.get_all_documents(config, log_callback=log_callback, force_api_fetch=True)
+    all_documents = api_client.get_all_documents(config, log_callback=log_callback, force_api_fetch=True,
+                                                 incremental=True)
 
     if not all_documents:
         log_callback("❌ No documents returned from the API.")
@@ -35,18 +63,201 @@ def get_document_hubs(config: dict, log_callback=print) -> list:
     return hubs
 
 
-def get_folders_for_hub(config: dict, hub_id: int, log_callback=print) -> list:
-    """Fetches all folders for a specific Document Hub."""
-    log_callback(f"🔍 Fetching folders for Document Hub ID: {hub_id}...")
+def _fetch_folders(config: dict, hub_id: int, log_callback=print) -> list:
+    """Fetches the folders of one Document Hub from the API. Returns None if the request failed."""
     url = f"{config['alation_url'].rstrip('/')}/integration/v2/folder/?document_hub_id={hub_id}"
-
     response = _make_api_request_with_retry("GET", url, config, token_refresher=refresh_access_token,
                                             log_callback=log_callback)
-
     if response and response.status_code == 200:
         folders = response.json()
-        log_callback(f"✅ Found {len(folders)} folders for Document Hub ID {hub_id}.")
+        with _folder_cache_lock:
+            _folder_cache[(config.get('alation_url'), hub_id)] = (time.monotonic(), folders)
         return folders
+    return None
+
+
+def _cached_folders(config: dict, hub_id: int) -> list:
+    """Returns the cached folders of a hub if they are younger than FOLDER_CACHE_TTL_SECONDS, else None."""
+    with _folder_cache_lock:
+        entry = _folder_cache.get((config.get('alation_url'), hub_id))
+    if entry and time.monotonic() - entry[0] < FOLDER_CACHE_TTL_SECONDS:
+        return entry[1]
+    return None
+
+
+def get_folders_for_hub(config: dict, hub_id: int, log_callback=print, force_fetch: bool = False) -> list:
+    """Fetches all folders for a specific Document Hub, served from the folder cache while it is fresh."""
+    if not force_fetch:
+        folders = _cached_folders(config, hub_id)
+        if folders is not None:
+            log_callback(f"✅ Found {len(folders)} folders for Document Hub ID {hub_id} (cached).")
+            return list(folders)
+
+    log_callback(f"🔍 Fetching folders for Document Hub ID: {hub_id}...")
+    folders = _fetch_folders(config, hub_id, log_callback)
+    if folders is not None:
+        log_callback(f"✅ Found {len(folders)} folders for Document Hub ID {hub_id}.")
+        return list(folders)
 
     log_callback(f"❌ Error fetching folders for Hub ID {hub_id}.")
-    return []
\ No newline at end of file
+    return []
+
+
+def prefetch_folders(config: dict, hub_ids, log_callback=print, max_workers: int = None) -> int:
+    """
+    Fetches the folders of every given hub that is not already cached, concurrently, so that
+    later hub selections are served from the cache. Returns the number of hubs fetched.
+    """
+    if max_workers is None:
+        max_workers = config.get('max_workers', DEFAULT_MAX_WORKERS)
+    missing = [hub_id for hub_id in dict.fromkeys(hub_ids) if _cached_folders(config, hub_id) is None]
+    if not missing:
+        return 0
+
+    log_callback(f"🔍 Prefetching folders for {len(missing)} Document Hubs...")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda hub_id: _fetch_folders(config, hub_id, log_callback), missing))
+    failed = sum(1 for folders in results if folders is None)
+    if failed:
+        log_callback(f"⚠️ Could not prefetch folders for {failed} of {len(missing)} Document Hubs.")
+    else:
+        log_callback(f"✅ Prefetched folders for {len(missing)} Document Hubs.")
+    return len(missing) - failed
+
+
+def invalidate_folder_cache(hub_id: int = None) -> None:
+    """Drops the cached folders of one hub, or of every hub if no hub_id is given."""
+    with _folder_cache_lock:
+        if hub_id is None:
+            _folder_cache.clear()
+        else:
+            for key in [key for key in _folder_cache if key[1] == hub_id]:
+                del _folder_cache[key]
+
+
+def _object_cache_key(config: dict, name: str, otype_hint: str) -> tuple:
+    return config.get('alation_url', '').rstrip('/'), name, otype_hint
+
+
+def _cache_get(key: tuple):
+    with _object_cache_lock:
+        if key in _object_cache:
+            _object_cache.move_to_end(key)
+            return _object_cache[key]
+    return _CACHE_MISS
+
+
+def _cache_put(key: tuple, value) -> None:
+    with _object_cache_lock:
+        _object_cache[key] = value
+        _object_cache.move_to_end(key)
+        while len(_object_cache) > OBJECT_LOOKUP_CACHE_SIZE:
+            _object_cache.popitem(last=False)
+
+
+def clear_object_cache() -> None:
+    """Forgets every resolved (and unresolved) OBJECT_SET name."""
+    with _object_cache_lock:
+        _object_cache.clear()
+
+
+def _find_user(config: dict, name: str, log_callback=print) -> dict:
+    """
+    Finds a user whose email, username or display name exactly matches the name.
+    Returns None if there is none, or _LOOKUP_FAILED if the search request failed.
+    """
+    url = f"{config['alation_url'].rstrip('/')}/integration/v1/user/search"
+    response = _make_api_request_with_retry("GET", url, config, token_refresher=refresh_access_token,
+                                            params={'q': name, 'limit': 100}, log_callback=log_callback)
+    if not (response and response.status_code == 200):
+        return _LOOKUP_FAILED
+
+    wanted = name.casefold()
+    for user in response.json():
+        candidates = (user.get('email'), user.get('username'), user.get('display_name'))
+        if any(candidate and candidate.casefold() == wanted for candidate in candidates):
+            return {"otype": "user", "oid": user['id']}
+    return None
+
+
+def _find_group(config: dict, name: str, log_callback=print) -> dict:
+    """
+    Finds a group whose display name or email exactly matches the name.
+    Returns None if there is none, or _LOOKUP_FAILED if the search request failed.
+    """
+    url = f"{config['alation_url'].rstrip('/')}/integration/v1/group/"
+    response = _make_api_request_with_retry("GET", url, config, token_refresher=refresh_access_token,
+                                            params={'display_name': name}, log_callback=log_callback)
+    if not (response and response.status_code == 200):
+        return _LOOKUP_FAILED
+
+    wanted = name.casefold()
+    for group in response.json():
+        candidates = (group.get('display_name'), group.get('name'), group.get('email'))
+        if any(candidate and candidate.casefold() == wanted for candidate in candidates):
+            return {"otype": "groupprofile", "oid": group['id']}
+    return None
+
+
+def lookup_alation_object(config: dict, name: str, otype_hint: str = None, log_callback=print) -> dict:
+    """
+    Resolves a name from a sheet cell to an OBJECT_SET value ({"otype": ..., "oid": ...}).
+
+    A literal "otype:oid" reference (e.g. "table:123") is used as-is. Otherwise the name is looked
+    up as a user and/or group, depending on `otype_hint` ('user', 'group' or None for both).
+    Results, including misses, are kept in a bounded cache shared by every upload in the session;
+    a name whose search request failed is not cached, so a transient error is not taken as a miss.
+    """
+    name = name.strip()
+    reference = OBJECT_REFERENCE_PATTERN.match(name)
+    if reference:
+        return {"otype": reference.group(1), "oid": int(reference.group(2))}
+
+    key = _object_cache_key(config, name, otype_hint)
+    cached = _cache_get(key)
+    if cached is not _CACHE_MISS:
+        return cached
+
+    found, failed = None, False
+    for otype, finder in (('user', _find_user), ('group', _find_group)):
+        if otype_hint in (None, otype):
+            result = finder(config, name, log_callback)
+            if result is _LOOKUP_FAILED:
+                failed = True
+            elif result is not None:
+                found = result
+                break
+
+    # A miss is only remembered when every search answered; a failed request is retried next time.
+    if found is not None or not failed:
+        _cache_put(key, found)
+    else:
+        log_callback(f"⚠️ Could not look up '{name}' in Alation; it will be retried.")
+    return found
+
+
+def resolve_object_names(config: dict, names_and_hints, log_callback=print, max_workers: int = None) -> dict:
+    """
+    Resolves many (name, otype_hint) pairs, each distinct pair exactly once, with up to `max_workers`
+    lookups in flight. Returns {(name, otype_hint): object or None}.
+    """
+    pairs = list(dict.fromkeys(names_and_hints))
+    if max_workers is None:
+        max_workers = config.get('max_workers', DEFAULT_MAX_WORKERS)
+
+    resolved, uncached = {}, []
+    for pair in pairs:
+        cached = _cache_get(_object_cache_key(config, *pair))
+        if cached is _CACHE_MISS:
+            uncached.append(pair)
+        else:
+            resolved[pair] = cached
+
+    if uncached:
+        log_callback(f"🔍 Resolving {len(uncached)} distinct object name(s) "
+                     f"({len(resolved)} already cached)...")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            resolved.update(zip(uncached, executor.map(
+                lambda pair: lookup_alation_object(config, pair[0], pair[1], log_callback), uncached)))
+
+    return {pair: resolved[pair] for pair in pairs}
@@ -1,14 +1,24 @@
 import json
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
 from pathlib import Path
-from urllib.parse import urljoin
+from urllib.parse import parse_qs, urljoin, urlparse
 
+from core.constants import DEFAULT_MAX_WORKERS
+
+from utils import single_flight
+from utils.document_store import DocumentStore
 # Import the authentication and request logic from its new, single location
 from utils.token_checker import _make_api_request_with_retry, refresh_access_token
 
-DOCUMENTS_CACHE_PATH = Path("cache/cached_documents.json")
+DOCUMENTS_CACHE_PATH = Path("cache/cached_documents.sqlite3")
 TEMPLATES_CACHE_PATH = Path("cache/cached_templates.json")
 CACHE_EXPIRY_SECONDS = 3600  # 1 hour
+DOCUMENTS_PAGE_SIZE = 1000
+# Query parameter used to ask the document endpoint for documents updated since the watermark.
+DELTA_SYNC_FILTER = "ts_updated__gte"
 
 def _load_from_cache(cache_path: Path, log_callback=print) -> tuple[list, bool]:
     """Loads data from a JSON cache file if it's not expired."""
@@ -28,39 +38,305 @@ def _save_to_cache(cache_path: Path, data: list, log_callback=print) -> None:
         json.dump(data, f, indent=2)
     log_callback(f"✅ Data saved to cache: {cache_path}")
 
-def get_all_documents(config: dict, log_callback=print, force_api_fetch: bool = False) -> list:
-    """Fetches all documents from the Alation API, with pagination and caching."""
-    if not force_api_fetch:
-        cached_data, from_cache = _load_from_cache(DOCUMENTS_CACHE_PATH, log_callback)
-        if from_cache:
-            return cached_data
+# The document cache. Also holds the sync watermark ("sync_watermark": the newest ts_updated seen by
+# the last complete sync) so that the data and its watermark are always written together.
+document_store = DocumentStore(DOCUMENTS_CACHE_PATH)
+# Held by whichever thread is syncing or crawling into document_store.
+_store_refresh_lock = threading.Lock()
 
-    base_url = config['alation_url'].rstrip('/')
-    current_url = f"{base_url}/integration/v2/document/?deleted=false&limit=1000"
-    all_documents = []
-    page_num = 1
+def _document_cache_is_fresh() -> bool:
+    age = document_store.age_seconds()
+    return age is not None and age < CACHE_EXPIRY_SECONDS
+
+def invalidate_document_cache(log_callback=print) -> None:
+    """
+    Marks the document cache as expired so the next load refreshes it. The cached set and its sync
+    watermark are kept as the base for the next incremental sync.
+    """
+    single_flight.forget("documents")
+    if document_store.exists():
+        document_store.expire()
+        log_callback("Document cache marked as expired.")
+
+def _fetch_document_page(config: dict, url: str, params: dict = None, log_callback=print) -> tuple[list, str]:
+    """Fetches a single page of documents. Returns (documents, next_page_path), or (None, None) on failure."""
+    response = _make_api_request_with_retry("GET", url, config, token_refresher=refresh_access_token, params=params,
+                                            log_callback=log_callback, timeout=60)
+    if response and response.status_code == 200:
+        return response.json(), response.headers.get('X-Next-Page')
+    return None, None
+
+
+def _supports_offset_paging(next_page_path: str) -> bool:
+    """The server supports skip/limit paging if its X-Next-Page cursor is expressed as an offset."""
+    return bool(next_page_path) and 'skip' in parse_qs(urlparse(next_page_path).query)
+
+
+def _iter_pages_serially(config: dict, base_url: str, next_page_path: str, log_callback=print):
+    """
+    (Generator) Walks the X-Next-Page cursor one page at a time, starting from the given next page.
+    Returns True if the last page was reached, False if a request failed part way.
+    """
+    current_url = urljoin(base_url, next_page_path) if next_page_path else None
+    page_num = 2
 
-    log_callback("Fetching all documents from API...")
     while current_url:
         log_callback(f"📄 Fetching page {page_num}...")
-        response = _make_api_request_with_retry("GET", current_url, config, token_refresher=refresh_access_token, log_callback=log_callback, timeout=60)
-
-        if response and response.status_code == 200:
-            data = response.json()
-            all_documents.extend(data)
-            next_page_path = response.headers.get('X-Next-Page')
-            current_url = urljoin(base_url, next_page_path) if next_page_path else None
-            page_num += 1
-        else:
+        data, next_page_path = _fetch_document_page(config, current_url, log_callback=log_callback)
+        if data is None:
             log_callback(f"❌ Failed to fetch documents. Stopping.")
-            break
+            return False
+        yield data
+        current_url = urljoin(base_url, next_page_path) if next_page_path else None
+        page_num += 1
+
+    return True
+
+
+def _iter_pages_concurrently(config: dict, url: str, params: dict, max_workers: int, log_callback=print):
+    """
+    (Generator) Fetches every page after the first by issuing skip/limit requests concurrently.
+    A page shorter than DOCUMENTS_PAGE_SIZE marks the end of the corpus. Pages are yielded in
+    order as soon as every earlier page has arrived.
+    Returns True if the last page was reached, False if a request failed part way.
+    """
+    pages = {}
+    last_page = None  # Index of the final page, once known
+    next_page = 1  # Page 0 has already been fetched by the caller
+    next_to_yield = 1
+    completed = True
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+        while True:
+            while len(in_flight) < max_workers and (last_page is None or next_page <= last_page):
+                page_params = {**params, 'limit': DOCUMENTS_PAGE_SIZE, 'skip': next_page * DOCUMENTS_PAGE_SIZE}
+                future = executor.submit(_fetch_document_page, config, url, page_params, log_callback)
+                in_flight[future] = next_page
+                next_page += 1
+
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                page_index = in_flight.pop(future)
+                data, _ = future.result()
+                if data is None:
+                    log_callback(f"❌ Failed to fetch page {page_index + 1}. Stopping at the last complete page.")
+                    last_page = page_index - 1 if last_page is None else min(last_page, page_index - 1)
+                    completed = False
+                    continue
+                log_callback(f"📄 Fetched page {page_index + 1} ({len(data)} documents).")
+                pages[page_index] = data
+                if len(data) < DOCUMENTS_PAGE_SIZE:
+                    last_page = page_index if last_page is None else min(last_page, page_index)
+
+            while next_to_yield in pages and (last_page is None or next_to_yield <= last_page):
+                yield pages.pop(next_to_yield)
+                next_to_yield += 1
+
+    return completed
+
+
+def _iter_api_pages(config: dict, params: dict, max_workers: int, log_callback=print):
+    """
+    (Generator) Yields every page of documents matching `params`.
+    When the server pages by offset, the pages after the first are fetched concurrently with up to
+    `max_workers` requests in flight; otherwise the X-Next-Page cursor is walked serially.
+    Returns True if the last page was reached, False if a request failed part way.
+    """
+    base_url = config['alation_url'].rstrip('/')
+    url = f"{base_url}/integration/v2/document/"
+
+    log_callback(f"📄 Fetching page 1...")
+    first_page, next_page_path = _fetch_document_page(
+        config, url, params={**params, 'limit': DOCUMENTS_PAGE_SIZE, 'skip': 0}, log_callback=log_callback)
+    if first_page is None:
+        log_callback(f"❌ Failed to fetch documents. Stopping.")
+        return False
+
+    yield first_page
+    if not next_page_path:
+        return True
+
+    if max_workers > 1 and _supports_offset_paging(next_page_path):
+        log_callback(f"Fetching remaining pages with {max_workers} concurrent workers...")
+        return (yield from _iter_pages_concurrently(config, url, params, max_workers, log_callback))
+    return (yield from _iter_pages_serially(config, base_url, next_page_path, log_callback))
+
 
-    if all_documents:
-        _save_to_cache(DOCUMENTS_CACHE_PATH, all_documents, log_callback)
+def _parse_timestamp(value: str) -> datetime:
+    """Parses an Alation ISO-8601 timestamp such as '2025-01-31T20:50:44.610823Z'."""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _latest_timestamp(documents: list) -> str:
+    """Returns the newest ts_updated/ts_deleted value across the documents, or None."""
+    timestamps = [doc.get(key) for doc in documents for key in ('ts_updated', 'ts_deleted') if doc.get(key)]
+    return max(timestamps, key=_parse_timestamp) if timestamps else None
+
+
+def _fetch_changes_since(config: dict, watermark: str, deleted: bool, max_workers: int, log_callback=print) -> list:
+    """
+    Fetches the documents (live or deleted) updated at or after the watermark.
+    Returns None if a request failed, or if the server ignored the filter and started returning
+    older documents, in which case the caller must fall back to a full crawl.
+    """
+    since = _parse_timestamp(watermark)
+    params = {'deleted': 'true' if deleted else 'false', DELTA_SYNC_FILTER: watermark}
+    pages = _iter_api_pages(config, params, max_workers, log_callback)
+    documents = []
+
+    while True:
+        try:
+            page = next(pages)
+        except StopIteration as stop:
+            return documents if stop.value else None
+
+        timestamps = [_latest_timestamp([doc]) for doc in page]
+        if any(ts is None or _parse_timestamp(ts) < since for ts in timestamps):
+            pages.close()
+            log_callback(f"⚠️ Server does not support the '{DELTA_SYNC_FILTER}' filter.")
+            return None
+        documents.extend(page)
+
+
+def _sync_cached_documents(config: dict, max_workers: int, log_callback=print) -> bool:
+    """
+    Brings the document store up to date by fetching only documents changed or deleted since the
+    last sync watermark and merging them in. Returns False if a full crawl is needed instead.
+    """
+    watermark = document_store.get_meta('sync_watermark')
+    if not watermark:
+        return False
+
+    log_callback(f"Syncing documents changed since {watermark}...")
+    changed = _fetch_changes_since(config, watermark, deleted=False, max_workers=max_workers,
+                                   log_callback=log_callback)
+    removed = _fetch_changes_since(config, watermark, deleted=True, max_workers=max_workers,
+                                   log_callback=log_callback) if changed is not None else None
+    if changed is None or removed is None:
+        log_callback("⚠️ Incremental sync unavailable. Falling back to a full fetch.")
+        return False
+
+    document_store.upsert(changed)
+    document_store.delete([doc['id'] for doc in removed])
+    document_store.set_meta('sync_watermark', _latest_timestamp(changed + removed) or watermark)
+    document_store.mark_saved()
+    log_callback(f"✅ Incremental sync: {len(changed)} changed, {len(removed)} deleted, "
+                 f"{document_store.count()} total.")
+    return True
+
+
+def iter_document_pages(config: dict, log_callback=print, force_api_fetch: bool = False, max_workers: int = None,
+                        incremental: bool = False):
+    """
+    (Generator) Yields all documents page by page, so callers can use each page as soon as it lands.
+    Identical requests made while one is running, or shortly after it finished, share its pages
+    instead of starting another crawl (see single_flight); a crawl that stopped part way is not shared.
+    """
+    key = ("documents", config.get('alation_url'), force_api_fetch, incremental)
+    return single_flight.stream(
+        key, lambda: _iter_document_pages(config, log_callback, force_api_fetch, max_workers, incremental),
+        log_callback=log_callback)
+
+
+def _iter_document_pages(config: dict, log_callback=print, force_api_fetch: bool = False, max_workers: int = None,
+                         incremental: bool = False):
+    """
+    (Generator) Yields all documents page by page. With `incremental`, a refresh fetches only the
+    documents changed or deleted since the last sync and merges them into the store, falling back to
+    a full crawl when there is nothing to sync from.
+    Full crawls use up to `max_workers` concurrent requests (default: config "max_workers") and are
+    written to the store page by page.
+    Returns True if every document was read, False if a crawl stopped part way.
+    """
+    if not force_api_fetch and _document_cache_is_fresh():
+        log_callback(f"✅ Loaded data from cache: {DOCUMENTS_CACHE_PATH}")
+        yield from document_store.iter_pages(DOCUMENTS_PAGE_SIZE)
+        return True
+
+    if max_workers is None:
+        max_workers = config.get('max_workers', DEFAULT_MAX_WORKERS)
+
+    # Two crawls at once would each prune the other's generation; the second waits, then usually
+    # only needs a delta sync from the watermark the first one left.
+    with _store_refresh_lock:
+        synced = incremental and _sync_cached_documents(config, max_workers, log_callback)
+        if not synced:
+            log_callback("Fetching all documents from API...")
+            generation = document_store.begin_generation()
+            watermark = None
+            pages = _iter_api_pages(config, {'deleted': 'false'}, max_workers, log_callback)
+            while True:
+                try:
+                    page = next(pages)
+                except StopIteration as stop:
+                    completed = stop.value
+                    break
+                document_store.upsert(page, generation)
+                watermark = max(filter(None, [watermark, _latest_timestamp(page)]), key=_parse_timestamp,
+                                default=None)
+                yield page
+
+            if completed:
+                removed = document_store.prune_generation(generation)
+                document_store.mark_saved()
+                log_callback(f"✅ Data saved to cache: {DOCUMENTS_CACHE_PATH} ({removed} stale documents removed)")
+            # Only a complete crawl is a safe starting point for the next incremental sync.
+            document_store.set_meta('sync_watermark', watermark if completed else None)
+            return completed
+
+    yield from document_store.iter_pages(DOCUMENTS_PAGE_SIZE)
+    return True
+
+
+def get_all_documents(config: dict, log_callback=print, force_api_fetch: bool = False, max_workers: int = None,
+                      incremental: bool = False) -> list:
+    """Fetches all documents from the Alation API, with pagination and caching. See iter_document_pages."""
+    all_documents = []
+    for page in iter_document_pages(config, log_callback, force_api_fetch=force_api_fetch, max_workers=max_workers,
+                                    incremental=incremental):
+        all_documents.extend(page)
     return all_documents
 
+def refresh_document_store(config: dict, log_callback=print, force_api_fetch: bool = False,
+                           max_workers: int = None) -> bool:
+    """
+    Brings the document cache up to date without holding the documents in memory: a fresh cache is
+    left alone, a stale one gets a delta sync, and a missing one a full concurrent crawl.
+    Read the result with document_store.iter_pages / iter_documents.
+    Returns True if the cache now holds every document, False if the crawl stopped part way.
+    """
+    if not force_api_fetch and _document_cache_is_fresh():
+        return True
+    pages = _iter_document_pages(config, log_callback, force_api_fetch=True, max_workers=max_workers,
+                                 incremental=True)
+    while True:
+        try:
+            next(pages)
+        except StopIteration as stop:
+            return stop.value
+
+def get_folder_documents(config: dict, folder_id: int, log_callback=print) -> list:
+    """
+    Returns the documents whose parent is `folder_id` or that are filed in it. A stale cache is
+    brought up to date with a delta sync first, so documents created since the last load are included.
+    """
+    refresh_document_store(config, log_callback)
+    documents = {doc['id']: doc for doc in document_store.iter_documents(parent_folder_id=folder_id)}
+    documents.update((doc['id'], doc) for doc in document_store.iter_documents(folder_id=folder_id))
+    return list(documents.values())
+
 def get_all_templates(config: dict, log_callback=print, force_api_fetch: bool = False) -> list:
-    """Fetches all templates from the Alation API, with caching."""
+    """Fetches all templates from the Alation API, with caching. Identical concurrent requests share one fetch."""
+    key = ("templates", config.get('alation_url'), force_api_fetch)
+    return single_flight.do(key, lambda: _get_all_templates(config, log_callback, force_api_fetch),
+                            log_callback=log_callback)
+
+
+def _get_all_templates(config: dict, log_callback=print, force_api_fetch: bool = False) -> list:
     if not force_api_fetch:
         cached_data, from_cache = _load_from_cache(TEMPLATES_CACHE_PATH, log_callback)
         if from_cache:
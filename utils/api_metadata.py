@@ -1,11 +1,11 @@
 # utils/api_metadata.py
 
-import requests
+from utils.token_checker import _make_api_request_with_retry, refresh_access_token
 
 def get_custom_fields(config: dict) -> dict: # Pass config dict
     """
     Retrieves custom field definitions from the Alation API.
-    Uses the TOKEN header for consistency with other API calls.
+    Goes through the shared API request helper, so it gets token refresh and retries.
     """
     alation_url = config.get("alation_url")
     access_token = config.get("access_token")
@@ -15,20 +15,14 @@ def get_custom_fields(config: dict) -> dict: # Pass config dict
         return None
 
     url = f"{alation_url.rstrip('/')}/openapi/custom_fields/v1"
-    headers = {
-        "TOKEN": access_token, # Changed from "Authorization: Bearer" to "TOKEN"
-        "accept": "application/json"
-    }
-
-    print(f"🔍 Fetching custom fields from {url} using TOKEN header...")
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            print("✅ Retrieved custom fields.")
-            return response.json()
-        else:
-            print(f"❌ Failed to get custom fields: {response.status_code} {response.text}")
-            return None
-    except requests.RequestException as e:
-        print(f"❌ Error fetching custom fields: {e}")
+    print(f"🔍 Fetching custom fields from {url}...")
+    response = _make_api_request_with_retry("GET", url, config, token_refresher=refresh_access_token, timeout=10)
+    if response is None:
+        print("❌ Error fetching custom fields: no response after retries.")
+        return None
+    if response.status_code == 200:
+        print("✅ Retrieved custom fields.")
+        return response.json()
+    else:
+        print(f"❌ Failed to get custom fields: {response.status_code} {response.text}")
         return None
\ No newline at end of file
@@ -0,0 +1,62 @@
+# utils/document_diff.py
+
+import re
+
+import pandas as pd
+
+from utils.document_exporter import format_cell_value
+
+# Fields whose values are unordered collections: "a, b" and "b, a" are the same value.
+SET_VALUED_FIELD_TYPES = ("MULTI_PICKER", "OBJECT_SET")
+# A whole number written as a float ("1.0"), as pandas reads a numeric column with blank cells.
+INTEGRAL_FLOAT_PATTERN = re.compile(r"^(-?\d+)\.0*$")
+
+
+def _comparable(value, field_type: str):
+    """Normalizes a stored or sheet value so that equal values compare equal. Empty values become None."""
+    text = format_cell_value(value)
+    if text is None or not text.strip():
+        return None
+    if field_type in SET_VALUED_FIELD_TYPES:
+        return frozenset(part.strip() for part in text.split(",") if part.strip())
+    if field_type == "DATE":
+        try:
+            return pd.Timestamp(text).date()
+        except (ValueError, TypeError):
+            pass
+    text = text.strip()
+    integral = INTEGRAL_FLOAT_PATTERN.match(text)
+    return integral.group(1) if integral else text
+
+
+def get_field_types(template_details: dict) -> dict:
+    return {field['id']: field.get('field_type') for field in template_details.get('fields') or []}
+
+
+def diff_document(existing: dict, payload: dict, field_types: dict, compare_title: bool = True) -> dict:
+    """
+    Compares a document built from a sheet row (see payload_builder) with the stored document.
+
+    Returns an update payload holding the document id and only the fields that changed, or None if
+    nothing did. Empty sheet cells are not sent by the payload builder, so they leave the stored
+    value as it is rather than clearing it. Set `compare_title` to False when the row was matched by
+    its title, which then cannot differ.
+    """
+    update = {}
+    if compare_title and payload.get('title') and payload['title'] != existing.get('title'):
+        update['title'] = payload['title']
+    description = payload.get('description')
+    if description and _comparable(description, None) != _comparable(existing.get('description'), None):
+        update['description'] = description
+
+    current = {entry.get('field_id'): entry.get('value') for entry in existing.get('custom_fields') or []}
+    changed_fields = [entry for entry in payload.get('custom_fields') or []
+                      if _comparable(entry['value'], field_types.get(entry['field_id']))
+                      != _comparable(current.get(entry['field_id']), field_types.get(entry['field_id']))]
+    if changed_fields:
+        update['custom_fields'] = changed_fields
+    return {"id": existing['id'], **update} if update else None
+
+
+def count_changed_fields(update: dict) -> int:
+    return len(update.get('custom_fields') or []) + sum(1 for key in ('title', 'description') if key in update)
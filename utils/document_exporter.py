@@ -0,0 +1,178 @@
+# utils/document_exporter.py
+
+import json
+import time
+from pathlib import Path
+
+import openpyxl
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+from utils import api_client, payload_builder, sheet_reader
+
+ID_COLUMN = "ID"
+EXPORT_SUFFIXES = (".xlsx", ".parquet")
+# Rows buffered per write; bounds memory and sets the Parquet row group size.
+EXPORT_BATCH_ROWS = 10000
+EXCEL_MAX_CELL_CHARS = 32767
+
+
+def get_export_columns(template_details: dict) -> list:
+    """The export's columns: the document ID, then the template's upload columns in template order."""
+    return [ID_COLUMN, *payload_builder.get_template_columns(template_details)]
+
+
+def format_cell_value(value) -> str:
+    """Renders a custom field value the way an upload sheet writes it. OBJECT_SET values become "otype:oid"."""
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return ", ".join(text for text in map(format_cell_value, value) if text is not None)
+    if isinstance(value, dict):
+        if 'otype' in value and 'oid' in value:
+            return f"{value['otype']}:{value['oid']}"
+        return str(value.get('title') or value.get('value') or json.dumps(value))
+    return str(value)
+
+
+def flatten_document(doc: dict, columns: list, field_columns: dict) -> list:
+    """Returns one row of `columns` for a document; `field_columns` maps custom field ids to column headers."""
+    row = dict.fromkeys(columns)
+    row[ID_COLUMN] = doc.get('id')
+    row["Title"] = doc.get('title')
+    row["Description"] = doc.get('description')
+    for entry in doc.get('custom_fields') or []:
+        column = field_columns.get(entry.get('field_id'))
+        if column is not None:
+            row[column] = format_cell_value(entry.get('value'))
+    return [row[column] for column in columns]
+
+
+def _excel_value(value):
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub("", value)[:EXCEL_MAX_CELL_CHARS]
+    return value
+
+
+class _ExcelSink:
+    """Streams rows into a write-only workbook laid out like write_template_workbook's upload sheets."""
+
+    def __init__(self, output_path: Path, columns: list, metadata: dict):
+        self.output_path = output_path
+        self.metadata = metadata
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet("Alation Upload")
+        self.sheet.append(columns)
+
+    def write(self, rows: list) -> None:
+        for row in rows:
+            self.sheet.append([_excel_value(value) for value in row])
+
+    def close(self, documents: int) -> None:
+        metadata_sheet = self.workbook.create_sheet("_apt_metadata")
+        metadata_sheet.sheet_state = 'hidden'
+        for label, value in {**self.metadata, "Documents": documents}.items():
+            metadata_sheet.append([label, value])
+        self.workbook.save(self.output_path)
+
+
+class _ParquetSink:
+    """Streams rows into a Parquet file, one row group per batch. The metadata goes in the schema."""
+
+    def __init__(self, output_path: Path, columns: list, metadata: dict):
+        import pyarrow
+        self.pyarrow = pyarrow
+        self.columns = columns
+        self.schema = pyarrow.schema(
+            [(column, pyarrow.int64() if column == ID_COLUMN else pyarrow.string()) for column in columns],
+            metadata={"_apt_metadata": json.dumps(metadata, default=str)})
+        self.writer = sheet_reader._import_parquet().ParquetWriter(output_path, self.schema)
+
+    def write(self, rows: list) -> None:
+        self.writer.write_table(self.pyarrow.Table.from_arrays(
+            [self.pyarrow.array(values, type=field.type) for values, field in zip(zip(*rows), self.schema)],
+            schema=self.schema))
+
+    def close(self, documents: int) -> None:
+        self.writer.close()
+
+
+def _open_sink(output_path: Path, columns: list, metadata: dict):
+    if output_path.suffix.lower() == ".parquet":
+        return _ParquetSink(output_path, columns, metadata)
+    return _ExcelSink(output_path, columns, metadata)
+
+
+def _export_template(output_path: Path, template_details: dict, filters: dict, metadata: dict,
+                     log_callback=print) -> int:
+    """Writes the cached documents matching `filters` that use one template. Returns the number written."""
+    columns = get_export_columns(template_details)
+    field_columns = {field['id']: column
+                     for column, field in payload_builder.get_field_name_to_details_map(template_details).items()}
+    sink = _open_sink(output_path, columns, metadata)
+    written, rows = 0, []
+    try:
+        for page in api_client.document_store.iter_pages(template_id=template_details['id'], **filters):
+            rows.extend(flatten_document(doc, columns, field_columns) for doc in page)
+            if len(rows) >= EXPORT_BATCH_ROWS:
+                sink.write(rows)
+                written += len(rows)
+                log_callback(f"📄 Exported {written} documents to {output_path.name}...")
+                rows = []
+        if rows:
+            sink.write(rows)
+            written += len(rows)
+    finally:
+        sink.close(written)
+    return written
+
+
+def export_documents(config: dict, output_path, hub_id: int = None, folder_id: int = None, template_id: int = None,
+                     log_callback=print, force_api_fetch: bool = False, max_workers: int = None) -> dict:
+    """
+    Exports documents to an .xlsx workbook or a .parquet file that upload_documents_from_file can read back.
+
+    The document cache is brought up to date first (a delta sync, or a full concurrent crawl if
+    there is no cache; see api_client.refresh_document_store), then the documents matching the
+    hub, folder (documents filed in it) and template filters are streamed out of it a page at a
+    time, so memory stays bounded however many documents match. Custom fields are flattened into
+    the template's columns, after an ID column.
+
+    A sheet can only hold one template's columns, so when the matching documents use several
+    templates each template gets its own file, named "<output>-template-<id>". Documents without a
+    template are left out. Returns {"files": [{"path", "template_id", "documents"}], "documents"}.
+    """
+    output_path = Path(output_path)
+    if output_path.suffix.lower() not in EXPORT_SUFFIXES:
+        raise ValueError(f"Unsupported export format '{output_path.suffix}'. Use one of: {', '.join(EXPORT_SUFFIXES)}")
+    if output_path.suffix.lower() == ".parquet":
+        sheet_reader._import_parquet()
+
+    api_client.refresh_document_store(config, log_callback, force_api_fetch=force_api_fetch, max_workers=max_workers)
+    filters = {"hub_id": hub_id, "folder_id": folder_id}
+    store = api_client.document_store
+    template_ids = [template_id] if template_id is not None else store.template_ids(**filters)
+    if not template_ids:
+        log_callback("⚠️ No documents with a template match the export filters.")
+        return {"files": [], "documents": 0}
+
+    untemplated = store.count(**filters) - sum(store.count(template_id=tid, **filters) for tid in template_ids)
+    if template_id is None and untemplated:
+        log_callback(f"ℹ️ Leaving out {untemplated} document(s) without a template.")
+
+    templates = {template['id']: template for template in api_client.get_all_templates(config, log_callback)}
+    exported_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+    files = []
+    for tid in template_ids:
+        template_details = templates.get(tid)
+        if template_details is None:
+            log_callback(f"⚠️ Template ID {tid} not found; exporting its documents with Title and Description only.")
+            template_details = {"id": tid, "fields": []}
+        path = output_path if len(template_ids) == 1 else output_path.with_name(
+            f"{output_path.stem}-template-{tid}{output_path.suffix}")
+        metadata = {"Source Hub ID": hub_id, "Source Folder ID": folder_id, "Source Template ID": tid,
+                    "Exported At": exported_at}
+        count = _export_template(path, template_details, filters, metadata, log_callback)
+        log_callback(f"✅ Exported {count} '{template_details.get('title', tid)}' documents to {path}")
+        files.append({"path": str(path), "template_id": tid, "documents": count})
+
+    return {"files": files, "documents": sum(entry["documents"] for entry in files)}
@@ -0,0 +1,245 @@
+# utils/document_store.py
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    document_hub_id INTEGER,
+    parent_folder_id INTEGER,
+    template_id INTEGER,
+    ts_updated TEXT,
+    generation INTEGER NOT NULL DEFAULT 0,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_hub ON documents (document_hub_id);
+CREATE INDEX IF NOT EXISTS idx_documents_parent_folder ON documents (parent_folder_id);
+CREATE INDEX IF NOT EXISTS idx_documents_template ON documents (template_id);
+CREATE INDEX IF NOT EXISTS idx_documents_parent_document ON documents (json_extract(body, '$.parent_document_id'));
+CREATE TABLE IF NOT EXISTS document_folders (
+    folder_id INTEGER NOT NULL,
+    document_id INTEGER NOT NULL,
+    PRIMARY KEY (folder_id, document_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_document_folders_document ON document_folders (document_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+MMAP_SIZE_BYTES = 256 * 1024 * 1024
+# The fields iter_outline reads out of each body, enough to place a document in a hierarchy.
+OUTLINE_FIELDS = ("title", "parent_folder_id", "folder_ids", "parent_document_id", "child_documents_count")
+
+
+class DocumentStore:
+    """
+    A compact on-disk document cache backed by SQLite.
+
+    Documents are stored as compact JSON keyed by id, with indexed columns for hub, parent folder and
+    template, and a membership table for `folder_ids`. Reads are lazy: `iter_documents` pages rows
+    out of the database on demand, so callers can read one hub or folder without loading the rest.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._write_lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self):
+        """Opens a short-lived connection. SQLite connections are cheap and this keeps the store thread-safe."""
+        if not self._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn:
+            conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE_BYTES}")
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(_SCHEMA)
+                self._initialized = True
+            yield conn
+
+    def exists(self) -> bool:
+        return self.db_path.exists()
+
+    # --- Metadata ---
+
+    def get_meta(self, key: str, default=None):
+        if not self.exists():
+            return default
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key: str, value) -> None:
+        with self._write_lock, self._connect() as conn, conn:
+            if value is None:
+                conn.execute("DELETE FROM meta WHERE key = ?", (key,))
+            else:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def age_seconds(self) -> float:
+        """Seconds since the store was last fully refreshed, or None if it never was."""
+        saved_at = self.get_meta('saved_at')
+        return time.time() - saved_at if saved_at is not None else None
+
+    def mark_saved(self) -> None:
+        self.set_meta('saved_at', time.time())
+
+    def expire(self) -> None:
+        """Marks the store as stale without discarding its contents."""
+        if self.exists():
+            self.set_meta('saved_at', 0)
+
+    # --- Writes ---
+
+    def begin_generation(self) -> int:
+        """
+        Starts a full refresh. Documents written with the returned generation survive `prune_generation`.
+        Refreshes must not overlap, or each prunes the other's documents (see api_client._store_refresh_lock).
+        """
+        generation = (self.get_meta('generation') or 0) + 1
+        self.set_meta('generation', generation)
+        return generation
+
+    def upsert(self, documents: list, generation: int = None) -> None:
+        """Inserts or replaces documents by id."""
+        if not documents:
+            return
+        if generation is None:
+            generation = self.get_meta('generation') or 0
+        rows = [(doc['id'], doc.get('document_hub_id'), doc.get('parent_folder_id'), doc.get('template_id'),
+                 doc.get('ts_updated'), generation, json.dumps(doc, separators=(',', ':')))
+                for doc in documents]
+        ids = [(doc['id'],) for doc in documents]
+        folder_rows = [(folder_id, doc['id']) for doc in documents for folder_id in doc.get('folder_ids') or ()]
+
+        with self._write_lock, self._connect() as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO documents "
+                             "(id, document_hub_id, parent_folder_id, template_id, ts_updated, generation, body) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany("DELETE FROM document_folders WHERE document_id = ?", ids)
+            conn.executemany("INSERT OR IGNORE INTO document_folders (folder_id, document_id) VALUES (?, ?)",
+                             folder_rows)
+
+    def delete(self, document_ids: list) -> None:
+        ids = [(doc_id,) for doc_id in document_ids]
+        if not ids:
+            return
+        with self._write_lock, self._connect() as conn, conn:
+            conn.executemany("DELETE FROM documents WHERE id = ?", ids)
+            conn.executemany("DELETE FROM document_folders WHERE document_id = ?", ids)
+
+    def prune_generation(self, generation: int) -> int:
+        """Deletes every document not written by the given full refresh. Returns the number removed."""
+        with self._write_lock, self._connect() as conn, conn:
+            removed = conn.execute("DELETE FROM documents WHERE generation != ?", (generation,)).rowcount
+            conn.execute("DELETE FROM document_folders WHERE document_id NOT IN (SELECT id FROM documents)")
+        return removed
+
+    # --- Reads ---
+
+    @staticmethod
+    def _where(hub_id=None, folder_id=None, template_id=None, parent_folder_id=None, parent_document_id=None,
+               top_level_only=False) -> tuple[str, list]:
+        clauses, params = [], []
+        if hub_id is not None:
+            clauses.append("document_hub_id = ?")
+            params.append(hub_id)
+        if folder_id is not None:
+            clauses.append("id IN (SELECT document_id FROM document_folders WHERE folder_id = ?)")
+            params.append(folder_id)
+        if template_id is not None:
+            clauses.append("template_id = ?")
+            params.append(template_id)
+        if parent_folder_id is not None:
+            clauses.append("parent_folder_id = ?")
+            params.append(parent_folder_id)
+        # Matches idx_documents_parent_document, so listing a document's children does not scan the table.
+        if parent_document_id is not None:
+            clauses.append("json_extract(body, '$.parent_document_id') = ?")
+            params.append(parent_document_id)
+        if top_level_only:
+            clauses.append("json_extract(body, '$.parent_document_id') IS NULL")
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def get(self, document_id: int) -> dict:
+        if not self.exists():
+            return None
+        with self._connect() as conn:
+            row = conn.execute("SELECT body FROM documents WHERE id = ?", (document_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self, **filters) -> int:
+        if not self.exists():
+            return 0
+        where, params = self._where(**filters)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM documents{where}", params).fetchone()[0]
+
+    def iter_pages(self, page_size: int = 1000, **filters):
+        """
+        (Generator) Lazily yields matching documents in pages of `page_size`, ordered by id.
+        Filters: hub_id, folder_id (membership in folder_ids), template_id, parent_folder_id,
+        parent_document_id, and top_level_only (documents that are not a child of another document).
+        """
+        if not self.exists():
+            return
+        where, params = self._where(**filters)
+        keyset = " AND id > ?" if where else " WHERE id > ?"
+        last_id = -1
+        while True:
+            with self._connect() as conn:
+                rows = conn.execute(f"SELECT id, body FROM documents{where}{keyset} ORDER BY id LIMIT ?",
+                                    params + [last_id, page_size]).fetchall()
+            if not rows:
+                return
+            yield [json.loads(body) for _, body in rows]
+            last_id = rows[-1][0]
+
+    def iter_documents(self, **filters):
+        """(Generator) Lazily yields matching documents one at a time. See iter_pages."""
+        for page in self.iter_pages(**filters):
+            yield from page
+
+    def iter_outline(self, **filters):
+        """
+        (Generator) Yields {"id", "template_id", *OUTLINE_FIELDS} for each matching document, ordered by
+        id. The fields are extracted by SQLite, so no document body is decoded. Filters as in iter_pages.
+        """
+        if not self.exists():
+            return
+        where, params = self._where(**filters)
+        columns = ", ".join(f"json_extract(body, '$.{field}')" for field in OUTLINE_FIELDS)
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT id, template_id, {columns} FROM documents{where} ORDER BY id", params)
+            for doc_id, template_id, *values in rows:
+                outline = dict(zip(OUTLINE_FIELDS, values), id=doc_id, template_id=template_id)
+                # json_extract returns arrays as JSON text
+                outline['folder_ids'] = json.loads(outline['folder_ids']) if outline['folder_ids'] else []
+                yield outline
+
+    def template_ids(self, **filters) -> list:
+        """The distinct template ids of the matching documents, ordered; documents without a template are left out."""
+        if not self.exists():
+            return []
+        where, params = self._where(**filters)
+        where = f"{where} AND template_id IS NOT NULL" if where else " WHERE template_id IS NOT NULL"
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT DISTINCT template_id FROM documents{where} ORDER BY template_id",
+                                params).fetchall()
+        return [row[0] for row in rows]
+
+    def hub_ids(self) -> list:
+        if not self.exists():
+            return []
+        with self._connect() as conn:
+            rows = conn.execute("SELECT DISTINCT document_hub_id FROM documents "
+                                "WHERE document_hub_id IS NOT NULL ORDER BY document_hub_id").fetchall()
+        return [row[0] for row in rows]
@@ -0,0 +1,59 @@
+# utils/http_session.py
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core.constants import DEFAULT_MAX_WORKERS
+
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 30.0
+
+_session = None
+_session_pool_size = 0
+_session_lock = threading.Lock()
+
+
+def get_session(config: dict) -> requests.Session:
+    """
+    Returns the shared keep-alive session used for every Alation API call.
+    The connection pool is sized to the configured concurrency ("max_workers"), so parallel workers
+    reuse connections instead of paying a new TCP/TLS handshake per request.
+    """
+    global _session, _session_pool_size
+    pool_size = max(int(config.get('max_workers', DEFAULT_MAX_WORKERS)), 1)
+
+    with _session_lock:
+        if _session is None or pool_size > _session_pool_size:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            if _session is not None:
+                _session.close()
+            _session, _session_pool_size = session, pool_size
+        return _session
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: a random delay up to BACKOFF_BASE_SECONDS * 2**attempt, capped."""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+def retry_after_delay(response: requests.Response, attempt: int) -> float:
+    """Returns the server's Retry-After delay (seconds or HTTP date), or a backoff delay if it has none."""
+    retry_after = response.headers.get('Retry-After')
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), BACKOFF_MAX_SECONDS)
+        except ValueError:
+            try:
+                return min(max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0),
+                           BACKOFF_MAX_SECONDS)
+            except (TypeError, ValueError):
+                pass
+    return backoff_delay(attempt)
@@ -0,0 +1,177 @@
+# utils/job_tracker.py
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.constants import DEFAULT_MAX_WORKERS
+from utils.token_checker import _make_api_request_with_retry, refresh_access_token
+
+JOB_POLL_INITIAL_SECONDS = 1.0
+JOB_POLL_MAX_SECONDS = 15.0
+JOB_POLL_BACKOFF = 1.5
+JOB_TIMEOUT_SECONDS = 30 * 60
+
+JOB_SUCCEEDED = "successful"
+JOB_FAILED = "failed"
+JOB_TIMED_OUT = "timed_out"
+# The server does not know the job (a 404 for an expired or mistyped id, or another 4xx): stop polling.
+JOB_UNKNOWN = "unknown"
+
+
+def _fetch_job_status(config: dict, job_id, log_callback=print) -> dict:
+    """
+    Fetches one job's status. Returns the job JSON; {"status": JOB_UNKNOWN, "msg"} if the server
+    rejects the request (4xx), which polling again will not change; or None if the request failed
+    in a way worth retrying (5xx or no response).
+    """
+    url = f"{config['alation_url'].rstrip('/')}/integration/v1/job/"
+    response = _make_api_request_with_retry("GET", url, config, token_refresher=refresh_access_token,
+                                            params={'id': job_id}, log_callback=log_callback)
+    if response is None:
+        return None
+    if response.status_code == 200:
+        return response.json()
+    if 400 <= response.status_code < 500:
+        return {"status": JOB_UNKNOWN, "msg": f"Job not available ({response.status_code} - {response.text[:200]})"}
+    return None
+
+
+def _parse_job_result(job: dict) -> tuple[list, list]:
+    """
+    Extracts per-document outcomes from a finished job.
+    Returns (created, errors): created is a list of {"id", "title"}; errors a list of {"title", "error"}.
+    """
+    result = job.get('result')
+    if isinstance(result, str):
+        try:
+            result = json.loads(result)
+        except json.JSONDecodeError:
+            return [], []
+
+    if isinstance(result, dict):
+        entries = []
+        for key in ('created_documents', 'created_objects', 'updated_documents', 'documents', 'results'):
+            entries.extend(result.get(key) or [])
+        for key in ('errors', 'failed', 'failures'):
+            entries.extend({'error': e} if isinstance(e, str) else e for e in (result.get(key) or []))
+    elif isinstance(result, list):
+        entries = result
+    else:
+        return [], []
+
+    created, errors = [], []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        if entry.get('error') or entry.get('errors'):
+            errors.append({"title": entry.get('title'), "error": str(entry.get('error') or entry.get('errors'))})
+        elif entry.get('id') is not None:
+            created.append({"id": entry.get('id'), "title": entry.get('title')})
+    return created, errors
+
+
+def track_jobs(config: dict, job_ids: list, log_callback=print, max_workers: int = None,
+               timeout: float = JOB_TIMEOUT_SECONDS) -> dict:
+    """
+    Polls many asynchronous jobs concurrently until each one finishes or `timeout` elapses.
+
+    Each job has its own polling interval, starting at JOB_POLL_INITIAL_SECONDS and growing by
+    JOB_POLL_BACKOFF (up to JOB_POLL_MAX_SECONDS) while its status stays the same, so short jobs
+    are picked up quickly and long ones are not hammered. A job the server does not know (4xx) is
+    given up on at once with status JOB_UNKNOWN; 5xx and connection failures are polled again.
+    Returns {job_id: {"status", "msg", "created": [...], "errors": [...]}}.
+    """
+    if max_workers is None:
+        max_workers = config.get('max_workers', DEFAULT_MAX_WORKERS)
+
+    outcomes = {}
+    pending = {job_id: {"next_poll": time.monotonic(), "interval": JOB_POLL_INITIAL_SECONDS, "status": None}
+               for job_id in dict.fromkeys(job_ids)}
+    deadline = time.monotonic() + timeout
+    if pending:
+        log_callback(f"⏳ Tracking {len(pending)} upload job(s)...")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                for job_id in pending:
+                    log_callback(f"⚠️ Job {job_id} did not finish within {timeout:.0f}s.")
+                    outcomes[job_id] = {"status": JOB_TIMED_OUT, "msg": "Timed out waiting for job.",
+                                        "created": [], "errors": []}
+                break
+
+            due = [job_id for job_id, state in pending.items() if state["next_poll"] <= now]
+            if not due:
+                next_poll = min(state["next_poll"] for state in pending.values())
+                time.sleep(max(0.0, min(next_poll, deadline) - now))
+                continue
+
+            for job_id, job in zip(due, executor.map(lambda j: _fetch_job_status(config, j, log_callback), due)):
+                state = pending[job_id]
+                status = (job or {}).get('status')
+                if status == JOB_UNKNOWN:
+                    outcomes[job_id] = {"status": status, "msg": job['msg'], "created": [], "errors": []}
+                    log_callback(f"❌ Job {job_id} cannot be tracked: {job['msg']}")
+                    del pending[job_id]
+                    continue
+                if status in (JOB_SUCCEEDED, JOB_FAILED):
+                    created, errors = _parse_job_result(job)
+                    outcomes[job_id] = {"status": status, "msg": job.get('msg'), "created": created,
+                                        "errors": errors}
+                    icon = "✅" if status == JOB_SUCCEEDED else "❌"
+                    log_callback(f"{icon} Job {job_id} {status}: {len(created)} created, {len(errors)} errors.")
+                    del pending[job_id]
+                    continue
+
+                if status is not None and status != state["status"]:
+                    state["interval"] = JOB_POLL_INITIAL_SECONDS
+                else:
+                    state["interval"] = min(state["interval"] * JOB_POLL_BACKOFF, JOB_POLL_MAX_SECONDS)
+                state["status"] = status
+                state["next_poll"] = time.monotonic() + state["interval"]
+
+    return outcomes
+
+
+def apply_job_outcomes(results: list, outcomes: dict) -> None:
+    """
+    Resolves per-document results that were accepted into a job (status "accepted") using the
+    jobs' outcomes. Documents that already carry an id (updates) are matched to the job's reported
+    ids; others are matched to created ids and errors by title, in order.
+    Documents of a job that reports no per-document detail take the job's own status.
+    """
+    by_job = {}
+    for result in results:
+        if result["status"] == "accepted":
+            by_job.setdefault(result["job_id"], []).append(result)
+
+    for job_id, job_results in by_job.items():
+        outcome = outcomes.get(job_id)
+        if outcome is None or outcome["status"] == JOB_TIMED_OUT:
+            for result in job_results:
+                result["status"] = "pending"
+                result["error"] = "Job did not finish."
+            continue
+
+        created_by_title, errors_by_title = {}, {}
+        reported_ids = {created["id"] for created in outcome["created"]}
+        for created in outcome["created"]:
+            created_by_title.setdefault(created["title"], []).append(created["id"])
+        for error in outcome["errors"]:
+            errors_by_title.setdefault(error["title"], []).append(error["error"])
+        has_detail = bool(outcome["created"] or outcome["errors"])
+
+        for result in job_results:
+            if result["id"] is not None and result["id"] in reported_ids:
+                result["status"] = "success"
+            elif created_by_title.get(result["title"]):
+                result["status"], result["id"] = "success", created_by_title[result["title"]].pop(0)
+            elif errors_by_title.get(result["title"]):
+                result["status"], result["error"] = "failed", errors_by_title[result["title"]].pop(0)
+            elif not has_detail and outcome["status"] == JOB_SUCCEEDED:
+                result["status"] = "success"
+            else:
+                result["status"] = "failed"
+                result["error"] = outcome.get("msg") or "Not reported as created by the job."
@@ -0,0 +1,155 @@
+# utils/metrics.py
+
+import json
+import re
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from urllib.parse import urlparse
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is +Inf.
+LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_NUMERIC_PATH_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_name(url: str) -> str:
+    """Reduces a request URL to its endpoint, e.g. '/integration/v2/document/' (numeric ids become '{id}')."""
+    return _NUMERIC_PATH_SEGMENT.sub("/{id}", urlparse(url).path or "/")
+
+
+class _EndpointStats:
+    """Counters and a latency histogram for one (method, endpoint) pair."""
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses = {}
+        self.errors = 0
+        self.retries = 0
+        self.token_refreshes = 0
+        self.response_bytes = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_SECONDS) + 1)
+
+    def quantile(self, q: float) -> float:
+        """Estimates a latency quantile as the upper bound of the bucket that contains it."""
+        if not self.requests:
+            return 0.0
+        rank, cumulative = q * self.requests, 0
+        for upper_bound, count in zip(LATENCY_BUCKETS_SECONDS, self.buckets):
+            cumulative += count
+            if cumulative >= rank:
+                return min(upper_bound, self.latency_max)
+        return self.latency_max
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "statuses": dict(sorted(self.statuses.items())),
+            "errors": self.errors,
+            "retries": self.retries,
+            "token_refreshes": self.token_refreshes,
+            "response_bytes": self.response_bytes,
+            "latency_seconds": {
+                "sum": round(self.latency_sum, 6),
+                "mean": round(self.latency_sum / self.requests, 6) if self.requests else 0.0,
+                "p50": self.quantile(0.5),
+                "p95": self.quantile(0.95),
+                "p99": self.quantile(0.99),
+                "max": round(self.latency_max, 6),
+                "buckets": dict(zip([*map(str, LATENCY_BUCKETS_SECONDS), "+Inf"], self.buckets)),
+            },
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe per-endpoint API metrics: request, status, error, retry and token refresh counters,
+    response bytes, and a latency histogram. Exported as JSON or Prometheus text.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints = {}
+            self.started_at = time.time()
+
+    def record_request(self, method: str, url: str, status, latency: float, response_bytes: int = 0,
+                       retries: int = 0, token_refreshes: int = 0) -> None:
+        """Records one API call (including its retries). `status` is the final HTTP status, or None on failure."""
+        key = (method, endpoint_name(url))
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = _EndpointStats()
+            stats.requests += 1
+            status_label = str(status) if status is not None else "error"
+            stats.statuses[status_label] = stats.statuses.get(status_label, 0) + 1
+            if status is None or status >= 400:
+                stats.errors += 1
+            stats.retries += retries
+            stats.token_refreshes += token_refreshes
+            stats.response_bytes += response_bytes
+            stats.latency_sum += latency
+            stats.latency_max = max(stats.latency_max, latency)
+            stats.buckets[bisect_left(LATENCY_BUCKETS_SECONDS, latency)] += 1
+
+    def snapshot(self) -> dict:
+        """Returns every endpoint's metrics as plain data, sorted by endpoint then method."""
+        with self._lock:
+            endpoints = [{"method": method, "endpoint": endpoint, **stats.as_dict()}
+                         for (method, endpoint), stats in sorted(self._endpoints.items(), key=lambda i: i[0][::-1])]
+        return {"started_at": self.started_at, "collected_at": time.time(), "endpoints": endpoints}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Renders the metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name: str, metric_type: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+        def labels(entry: dict, **extra) -> str:
+            pairs = {"method": entry["method"], "endpoint": entry["endpoint"], **extra}
+            return "{" + ",".join(f'{key}="{value}"' for key, value in pairs.items()) + "}"
+
+        family("apt_api_requests_total", "counter", "API calls by final status (error: no response).")
+        for entry in snapshot["endpoints"]:
+            for status, count in entry["statuses"].items():
+                lines.append(f"apt_api_requests_total{labels(entry, status=status)} {count}")
+        for name, key, help_text in (
+                ("apt_api_retries_total", "retries", "Retried attempts."),
+                ("apt_api_token_refreshes_total", "token_refreshes", "Access token refreshes triggered."),
+                ("apt_api_response_bytes_total", "response_bytes", "Response body bytes received.")):
+            family(name, "counter", help_text)
+            lines.extend(f"{name}{labels(entry)} {entry[key]}" for entry in snapshot["endpoints"])
+
+        family("apt_api_request_duration_seconds", "histogram", "API call latency, including retries.")
+        for entry in snapshot["endpoints"]:
+            cumulative = 0
+            for bound, count in entry["latency_seconds"]["buckets"].items():
+                cumulative += count
+                lines.append(f"apt_api_request_duration_seconds_bucket{labels(entry, le=bound)} {cumulative}")
+            lines.append(f"apt_api_request_duration_seconds_sum{labels(entry)} {entry['latency_seconds']['sum']}")
+            lines.append(f"apt_api_request_duration_seconds_count{labels(entry)} {entry['requests']}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path) -> Path:
+        """Writes the metrics to `path`: Prometheus text for .prom/.txt files, JSON otherwise."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        text = self.to_prometheus() if path.suffix in (".prom", ".txt") else self.to_json()
+        path.write_text(text, encoding="utf-8")
+        return path
+
+
+# The process-wide registry every API call reports to.
+registry = MetricsRegistry()
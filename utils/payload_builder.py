@@ -0,0 +1,184 @@
+# utils/payload_builder.py
+
+import pandas as pd
+
+from utils import alation_lookup
+
+BUILTIN_TOP_LEVEL_FIELDS = ("description", "title")
+
+
+def get_field_name_to_details_map(template_details: dict) -> dict:
+    """Maps each template field's column header (its singular or plural name) to the field definition."""
+    field_name_to_details_map = {}
+    for field in template_details.get('fields') or []:
+        field_name_key = field.get('name_singular') or field.get('name_plural') or f"Field ID: {field.get('id')}"
+        field_name_to_details_map[field_name_key] = field
+    return field_name_to_details_map
+
+
+def get_template_columns(template_details: dict) -> list:
+    """Returns the sheet columns an upload reads: Title, Description and each template field's header."""
+    return list(dict.fromkeys(["Title", "Description", *get_field_name_to_details_map(template_details)]))
+
+
+def get_picker_columns(template_details: dict) -> list:
+    """Returns the headers of the template's PICKER / MULTI_PICKER fields, whose values repeat heavily."""
+    return [col_header for col_header, field in get_field_name_to_details_map(template_details).items()
+            if field.get('field_type') in ("PICKER", "MULTI_PICKER")]
+
+
+def get_otype_hint(field_details: dict) -> str:
+    """Returns the lookup hint ('user' or 'group') for an OBJECT_SET field restricted to one otype, else None."""
+    allowed_otypes = field_details.get('allowed_otypes')
+    if allowed_otypes and len(allowed_otypes) == 1:
+        if allowed_otypes[0] == 'user':
+            return 'user'
+        elif allowed_otypes[0] == 'groupprofile':
+            return 'group'
+    return None
+
+
+def split_object_set_cell(value: str, allow_multiple: bool) -> list:
+    """Splits an OBJECT_SET cell into the object names it references."""
+    if allow_multiple:
+        return [name.strip() for name in value.split(',') if name.strip()]
+    return [value.strip()] if value.strip() else []
+
+
+def _scalar_column_entries(series: pd.Series, field_id: int) -> list:
+    """Converts a non-OBJECT_SET column to a per-row list of custom field entries (None for empty cells)."""
+    mask = series.notna().tolist()
+    if pd.api.types.is_float_dtype(series):
+        # A whole-number column with blank cells is read as float64; send 1, not 1.0.
+        values = [str(int(value)) if present and value.is_integer() else str(value)
+                  for value, present in zip(series.tolist(), mask)]
+    else:
+        values = series.astype(str).tolist()
+    return [{"field_id": field_id, "value": value} if present else None for value, present in zip(values, mask)]
+
+
+def _object_set_column_names(series: pd.Series, field_details: dict) -> list:
+    """Splits an OBJECT_SET column into a per-row list of referenced names (None for empty cells)."""
+    allow_multiple = field_details.get('allow_multiple', False)
+    return [split_object_set_cell(value, allow_multiple) if present else None
+            for present, value in zip(series.notna().tolist(), series.astype(str).tolist())]
+
+
+def _object_set_column_entries(names_per_row: list, raw_values: list, col_header: str, field_details: dict,
+                               resolved: dict, titles: list, log_callback=print,
+                               upload_log_entries: list = None) -> list:
+    """Converts an OBJECT_SET column to a per-row list of custom field entries using pre-resolved names."""
+    field_id = field_details['id']
+    otype_hint = get_otype_hint(field_details)
+
+    entries = []
+    omitted = 0
+    for title, names, raw_value in zip(titles, names_per_row, raw_values):
+        if names is None:
+            entries.append(None)
+            continue
+
+        object_set_values = []
+        for name in names:
+            looked_up_object = resolved.get((name, otype_hint))
+            if looked_up_object:
+                object_set_values.append(looked_up_object)
+            elif upload_log_entries is not None:
+                upload_log_entries.append(
+                    f"FAILED OBJECT SET: Doc '{title}' - Could not find Alation object for '{name}' for field '{col_header}' (Original Value: '{raw_value}').")
+
+        if object_set_values:
+            entries.append({"field_id": field_id, "value": object_set_values})
+        else:
+            omitted += 1
+            entries.append(None)
+
+    if omitted:
+        log_callback(
+            f"⚠️ Warning: No valid Alation objects found for '{col_header}' in {omitted} row(s). Omitting this field from those documents.")
+    return entries
+
+
+def build_document_payloads(config: dict, df: pd.DataFrame, document_hub_id: int, parent_folder_id: int,
+                            template_details: dict, log_callback=print, upload_log_entries: list = None,
+                            verbose: bool = False, row_numbers: list = None) -> list:
+    """
+    Builds the document payloads for every row of the DataFrame, one template column at a time.
+
+    Each column is converted once (notna mask, string conversion, OBJECT_SET splitting) instead of
+    re-walking the template for every row, and each distinct OBJECT_SET name in the sheet is
+    resolved once. Rows without a title are skipped. Per-row logging is only done when `verbose` is set.
+    If `row_numbers` is given, the spreadsheet row number of each returned payload is appended to it.
+    """
+    if "Title" not in df.columns:
+        log_callback("❌ 'Title' column is missing. Each document must have a title.")
+        return []
+
+    title_series = df["Title"]
+    has_title = (title_series.notna() & (title_series.astype(str).str.strip() != "")).tolist()
+    skipped_rows = [index + 2 for index, keep in zip(df.index, has_title) if not keep]
+    if skipped_rows:
+        shown = ", ".join(map(str, skipped_rows[:20])) + (", ..." if len(skipped_rows) > 20 else "")
+        log_callback(f"⚠️ Skipping {len(skipped_rows)} row(s) with a missing or empty 'Title' (rows {shown}). "
+                     f"Each document must have a title.")
+    if not any(has_title):
+        return []
+
+    df = df[has_title]
+    if row_numbers is not None:
+        row_numbers.extend(index + 2 for index in df.index)
+    titles = df["Title"].tolist()
+    if "Description" in df.columns:
+        descriptions = df["Description"].where(df["Description"].notna(), "").astype(str).tolist()
+    else:
+        descriptions = [""] * len(df)
+
+    fields_to_convert = []
+    for col_header, field_details in get_field_name_to_details_map(template_details).items():
+        builtin_name = field_details.get('builtin_name')
+        if builtin_name in BUILTIN_TOP_LEVEL_FIELDS:
+            log_callback(
+                f"DEBUG: Skipping built-in field '{builtin_name}' (ID: {field_details['id']}) from custom_fields payload, as it's handled at top level.")
+            continue
+        if col_header in df.columns:
+            fields_to_convert.append((col_header, field_details))
+
+    # Collect every distinct OBJECT_SET name in the sheet first, so each is resolved exactly once.
+    object_set_names = {}
+    for col_header, field_details in fields_to_convert:
+        if field_details['field_type'] == "OBJECT_SET":
+            object_set_names[col_header] = _object_set_column_names(df[col_header], field_details)
+    resolved = {}
+    if object_set_names:
+        pairs = ((name, get_otype_hint(field_details))
+                 for col_header, field_details in fields_to_convert if col_header in object_set_names
+                 for names in object_set_names[col_header] if names for name in names)
+        resolved = alation_lookup.resolve_object_names(config, pairs, log_callback=log_callback)
+        for (name, _), looked_up_object in resolved.items():
+            if looked_up_object is None:
+                log_callback(f"❌ FAILED OBJECT SET LOOKUP: Could not find Alation object for '{name}'. "
+                             f"Skipping it wherever it appears.")
+
+    column_entries = []
+    for col_header, field_details in fields_to_convert:
+        if col_header in object_set_names:
+            column_entries.append(_object_set_column_entries(
+                object_set_names[col_header], df[col_header].astype(str).tolist(), col_header, field_details,
+                resolved, titles, log_callback, upload_log_entries))
+        else:
+            column_entries.append(_scalar_column_entries(df[col_header], field_details['id']))
+
+    template_id = template_details.get('id')
+    documents_to_upload_payloads = []
+    for row_position, (document_title, document_description) in enumerate(zip(titles, descriptions)):
+        if verbose:
+            log_callback(f"Processing document: '{document_title}'")
+        documents_to_upload_payloads.append({
+            "title": document_title,
+            "document_hub_id": document_hub_id,
+            "parent_folder_id": parent_folder_id,
+            "template_id": template_id,
+            "description": document_description,
+            "custom_fields": [entries[row_position] for entries in column_entries if entries[row_position]]
+        })
+    return documents_to_upload_payloads
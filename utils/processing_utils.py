@@ -1,13 +1,273 @@
 # utils/processing_utils.py
 
+import json
 import os
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from utils import alation_lookup
+
+from core.constants import DEFAULT_MAX_WORKERS
+from utils import alation_lookup, api_client
+from utils.document_exporter import format_cell_value
+
+MANIFEST_NAME = ".apt_manifest.json"
+MANIFEST_VERSION = 1
+MIRROR_FORMATS = ("md", "json")
+
+
+def _safe_name(title: str, fallback: str) -> str:
+    """Keeps letters, digits, spaces and underscores, so the title is a valid file or directory name."""
+    safe = "".join(c for c in (title or "") if c.isalnum() or c in (' ', '_')).rstrip()
+    return safe or fallback
+
+
+def _document_stem(doc_id: int, title: str) -> str:
+    # The id keeps documents with the same title apart and survives renames of other documents.
+    return f"{_safe_name(title, 'Untitled')} [{doc_id}]"
+
+
+def _folder_paths(folders: list) -> dict:
+    """
+    Maps each folder id to its directory, relative to the hub directory. Folders with a
+    parent_folder_id inside the hub are nested under it; sibling folders with the same name get
+    their id appended.
+    """
+    by_id = {folder['id']: folder for folder in folders}
+    paths, used = {}, set()
+
+    def path_of(folder_id, seen):
+        if folder_id in paths:
+            return paths[folder_id]
+        folder = by_id[folder_id]
+        parent_id = folder.get('parent_folder_id')
+        base = path_of(parent_id, seen | {folder_id}) if parent_id in by_id and parent_id not in seen else Path()
+        name = _safe_name(folder.get('title'), f"Untitled_Folder_{folder_id}")
+        if base / name in used:
+            name = f"{name} [{folder_id}]"
+        paths[folder_id] = base / name
+        used.add(base / name)
+        return paths[folder_id]
+
+    for folder_id in sorted(by_id):
+        path_of(folder_id, frozenset())
+    return paths
+
+
+def _document_files(documents: dict, folder_paths: dict, formats: tuple) -> dict:
+    """
+    Maps each document id to the files it is written to, relative to the hub directory.
+    `documents` is {id: {"title", "parent_folder_id", "folder_ids", "parent_document_id"}}. A child
+    document goes in a directory named after its parent document, next to the parent's files;
+    others go in their folder's directory, or the hub root.
+    """
+    directories = {}
+
+    def directory_of(doc_id, seen):
+        if doc_id in directories:
+            return directories[doc_id]
+        doc = documents[doc_id]
+        parent_document_id = doc.get('parent_document_id')
+        if parent_document_id in documents and parent_document_id not in seen:
+            parent = documents[parent_document_id]
+            directory = (directory_of(parent_document_id, seen | {doc_id})
+                         / _document_stem(parent_document_id, parent.get('title')))
+        else:
+            folder_id = doc.get('parent_folder_id')
+            if folder_id not in folder_paths:
+                folder_id = next((fid for fid in doc.get('folder_ids') or () if fid in folder_paths), None)
+            directory = folder_paths.get(folder_id, Path())
+        directories[doc_id] = directory
+        return directory
+
+    return {doc_id: [(directory_of(doc_id, frozenset()) / f"{_document_stem(doc_id, doc.get('title'))}.{fmt}")
+                     .as_posix() for fmt in formats]
+            for doc_id, doc in documents.items()}
+
+
+def _table_cell(text: str) -> str:
+    return (text or "").replace("|", "\\|").replace("\n", " ")
+
+
+def _render_markdown(doc: dict, field_names: dict) -> str:
+    lines = [f"# {doc.get('title') or 'Untitled'}", "",
+             f"- **ID:** {doc.get('id')}",
+             f"- **Template ID:** {doc.get('template_id')}",
+             f"- **Updated:** {doc.get('ts_updated')}", ""]
+    fields = [(field_names.get(entry.get('field_id'), f"Field ID: {entry.get('field_id')}"),
+               format_cell_value(entry.get('value'))) for entry in doc.get('custom_fields') or []]
+    if fields:
+        lines += ["| Field | Value |", "| --- | --- |"]
+        lines += [f"| {_table_cell(name)} | {_table_cell(value)} |" for name, value in fields]
+        lines.append("")
+    if doc.get('description'):
+        lines += [doc['description'], ""]
+    return "\n".join(lines)
+
+
+def _write_document(hub_path: Path, doc: dict, files: list, field_names: dict) -> None:
+    for relative in files:
+        path = hub_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if relative.endswith(".md"):
+            path.write_text(_render_markdown(doc, field_names), encoding="utf-8")
+        else:
+            path.write_text(json.dumps(doc, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def _load_manifest(hub_path: Path, formats: tuple) -> dict:
+    """Returns the previous run's manifest, or an empty one if it is missing, unreadable or for other formats."""
+    try:
+        manifest = json.loads((hub_path / MANIFEST_NAME).read_text(encoding="utf-8"))
+        if manifest.get("version") == MANIFEST_VERSION and tuple(manifest.get("formats", ())) == formats:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"documents": {}, "folders": {}}
+
+
+def _save_manifest(hub_path: Path, manifest: dict) -> None:
+    """Writes the manifest atomically, so an interrupted run never leaves a truncated one."""
+    fd, tmp_path = tempfile.mkstemp(dir=hub_path, prefix=".apt_manifest.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, hub_path / MANIFEST_NAME)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _remove_empty_directories(hub_path: Path, directories) -> None:
+    """Removes each directory, and then its parents up to the hub directory, while they are empty."""
+    for directory in sorted({hub_path / d for d in directories}, key=lambda p: len(p.parts), reverse=True):
+        while directory != hub_path and hub_path in directory.parents:
+            try:
+                directory.rmdir()
+            except OSError:
+                break  # Not empty, or already gone
+            directory = directory.parent
+
+
+def mirror_hub(config: dict, hub_id: int, hub_title: str, base_dir: str, log_callback=print,
+               formats: tuple = MIRROR_FORMATS, max_workers: int = None) -> dict:
+    """
+    Mirrors a Document Hub to disk: one directory per folder (nested as in Alation) and, for each
+    document, a Markdown and/or JSON file named "<title> [<id>]".
+
+    Documents come from the document cache, which is always brought up to date first with a delta
+    sync (or a full concurrent crawl if there is no cache; see api_client.refresh_document_store).
+    A manifest in the hub directory records each document's ts_updated and files, so later runs
+    only rewrite documents that changed or moved, and delete the files of documents and folders
+    that no longer exist. Nothing is deleted on the strength of a failed fetch: if the folders
+    cannot be read the mirror stops, and if the crawl is incomplete no document's files are removed
+    for being absent. Files are written by up to `max_workers` threads. Returns counts of what was done.
+    """
+    formats = tuple(formats)
+    if max_workers is None:
+        max_workers = config.get('max_workers', DEFAULT_MAX_WORKERS)
+    hub_path = Path(base_dir) / _safe_name(hub_title, f"Hub_{hub_id}")
+    hub_path.mkdir(parents=True, exist_ok=True)
+    manifest = _load_manifest(hub_path, formats)
+
+    # Not get_folders_for_hub: it returns [] on failure, which would look like every folder was deleted.
+    folders = alation_lookup._fetch_folders(config, hub_id, log_callback)
+    if folders is None:
+        raise RuntimeError(f"Could not fetch the folders of Document Hub ID {hub_id}; nothing was changed.")
+    log_callback(f"✅ Found {len(folders)} folders for Document Hub ID {hub_id}.")
+    folder_paths = _folder_paths(folders)
+    for folder_path in folder_paths.values():
+        (hub_path / folder_path).mkdir(parents=True, exist_ok=True)
+
+    complete = api_client.refresh_document_store(config, log_callback, force_api_fetch=True,
+                                                 max_workers=max_workers)
+    if not complete:
+        log_callback("⚠️ The document cache could not be fully refreshed; documents missing from it are "
+                     "kept on disk this time.")
+    field_names = {field['id']: field.get('name_singular') or field.get('name_plural') or f"Field ID: {field['id']}"
+                   for template in api_client.get_all_templates(config, log_callback)
+                   for field in template.get('fields') or []}
+
+    # First pass: only what is needed to place each document.
+    documents, ts_updated = {}, {}
+    for doc in api_client.document_store.iter_documents(hub_id=hub_id):
+        if doc['id'] == hub_id:
+            continue  # The hub's own document
+        documents[doc['id']] = {key: doc.get(key) for key in
+                                ('title', 'parent_folder_id', 'folder_ids', 'parent_document_id')}
+        ts_updated[doc['id']] = doc.get('ts_updated')
+    files = _document_files(documents, folder_paths, formats)
+
+    previous = {int(doc_id): entry for doc_id, entry in manifest["documents"].items()}
+    new_manifest = {"version": MANIFEST_VERSION, "formats": list(formats), "hub_id": hub_id,
+                    "folders": {str(folder_id): path.as_posix() for folder_id, path in folder_paths.items()},
+                    "documents": {}}
+    changed = set()
+    for doc_id, doc_files in files.items():
+        entry = previous.get(doc_id)
+        if (entry and entry.get("ts_updated") == ts_updated[doc_id] and entry.get("files") == doc_files
+                and all((hub_path / f).exists() for f in doc_files)):
+            new_manifest["documents"][str(doc_id)] = entry
+        else:
+            changed.add(doc_id)
+
+    if not complete:
+        # A document missing from a partial crawl may still exist: keep its files and manifest entry.
+        for doc_id, entry in previous.items():
+            if doc_id not in files:
+                new_manifest["documents"][str(doc_id)] = entry
+        previous = {doc_id: entry for doc_id, entry in previous.items() if doc_id in files}
+
+    # Files of deleted documents, and the old files of documents that were renamed or moved.
+    stale_files = {f for doc_id, entry in previous.items() for f in entry.get("files", ())
+                   if f not in set(files.get(doc_id, ()))}
+    for relative in stale_files:
+        (hub_path / relative).unlink(missing_ok=True)
+
+    log_callback(f"🔄 Mirroring '{hub_title}': {len(changed)} of {len(files)} documents to write, "
+                 f"{sum(1 for doc_id in previous if doc_id not in files)} deleted.")
+    written, failed = 0, 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+
+        def collect(done):
+            nonlocal written, failed
+            for future in done:
+                doc_id = in_flight.pop(future)
+                try:
+                    future.result()
+                except OSError as e:
+                    failed += 1
+                    log_callback(f"❌ Could not write document {doc_id}: {e}")
+                    continue
+                written += 1
+                new_manifest["documents"][str(doc_id)] = {"ts_updated": ts_updated[doc_id], "files": files[doc_id]}
+
+        if changed:
+            for page in api_client.document_store.iter_pages(hub_id=hub_id):
+                for doc in page:
+                    if doc['id'] in changed:
+                        future = executor.submit(_write_document, hub_path, doc, files[doc['id']], field_names)
+                        in_flight[future] = doc['id']
+                while len(in_flight) >= max_workers * 4:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+        collect(wait(in_flight)[0])
+
+    old_folders = set(manifest["folders"].values()) - set(new_manifest["folders"].values())
+    _remove_empty_directories(hub_path, old_folders | {str(Path(f).parent) for f in stale_files})
+    _save_manifest(hub_path, new_manifest)
+
+    summary = {"path": str(hub_path), "folders": len(folder_paths), "documents": len(files), "written": written,
+               "unchanged": len(files) - len(changed), "deleted_files": len(stale_files), "failed": failed}
+    status = "✅" if not failed else "⚠️"
+    log_callback(f"{status} Mirrored '{hub_title}' to {hub_path}: {written} written, {summary['unchanged']} unchanged, "
+                 f"{len(stale_files)} stale files removed, {failed} failed.")
+    return summary
 
 
 def process_hub_and_folders(config: dict, hub_id: int, hub_title: str, base_dir: str, log_callback=print):
     """
-    Fetches folders for a hub and creates a corresponding directory structure.
+    Creates a directory structure for a hub's folders and fills it with its documents (see mirror_hub).
 
     Args:
         config (dict): The application configuration.
@@ -17,30 +277,8 @@ def process_hub_and_folders(config: dict, hub_id: int, hub_title: str, base_dir:
         log_callback (callable): A function to handle logging.
     """
     log_callback(f"Processing Hub: '{hub_title}' (ID: {hub_id})")
-
-    # Sanitize the hub title to make it a valid directory name
-    safe_hub_title = "".join(c for c in hub_title if c.isalnum() or c in (' ', '_')).rstrip()
-    hub_path = Path(base_dir) / safe_hub_title
-
     try:
-        hub_path.mkdir(parents=True, exist_ok=True)
-        log_callback(f"✅ Created root directory: {hub_path}")
-
-        # Fetch the folders within the hub
-        folders = alation_lookup.get_folders_for_hub(config, hub_id, log_callback=log_callback)
-
-        if not folders:
-            log_callback("ℹ️ No sub-folders found within this hub.")
-            return
-
-        for folder in folders:
-            folder_title = folder.get('title', f"Untitled_Folder_{folder.get('id')}")
-            safe_folder_title = "".join(c for c in folder_title if c.isalnum() or c in (' ', '_')).rstrip()
-            folder_path = hub_path / safe_folder_title
-
-            folder_path.mkdir(exist_ok=True)
-            log_callback(f"  ✅ Created sub-directory: {folder_path}")
-
+        return mirror_hub(config, hub_id, hub_title, base_dir, log_callback=log_callback)
     except Exception as e:
         log_callback(f"❌ An error occurred while creating directory structure: {e}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,111 @@
+# utils/sheet_reader.py
+
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+
+SHEET_CHUNK_ROWS = 5000
+OPENPYXL_SUFFIXES = (".xlsx", ".xlsm")
+PARQUET_SUFFIXES = (".parquet",)
+
+
+def _import_parquet():
+    """pyarrow is only needed for .parquet files, so it is imported on first use."""
+    try:
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Reading or writing .parquet files requires pyarrow (pip install pyarrow).") from None
+    return pyarrow.parquet
+
+
+def read_sheet_header(file_path) -> list:
+    """Returns the column headers of the first sheet (or the CSV), without reading any data rows."""
+    suffix = Path(file_path).suffix.lower()
+    if suffix == ".csv":
+        return pd.read_csv(file_path, nrows=0).columns.tolist()
+    if suffix in PARQUET_SUFFIXES:
+        return list(_import_parquet().read_schema(file_path).names)
+    if suffix in OPENPYXL_SUFFIXES:
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            header = next(workbook.worksheets[0].iter_rows(max_row=1, values_only=True), ())
+        finally:
+            workbook.close()
+        return [str(value) for value in header if value is not None]
+    return pd.read_excel(file_path, nrows=0).columns.tolist()
+
+
+def _finish_chunk(chunk: pd.DataFrame, categorical_columns) -> pd.DataFrame:
+    for column in categorical_columns:
+        if column in chunk.columns:
+            chunk[column] = chunk[column].astype("category")
+    return chunk
+
+
+def _iter_xlsx_chunks(file_path, columns, chunk_rows: int, categorical_columns):
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, ())
+        wanted = {str(name): position for position, name in enumerate(header)
+                  if name is not None and (columns is None or str(name) in columns)}
+        names, positions = list(wanted), list(wanted.values())
+
+        records, index = [], []
+        for row_index, row in enumerate(rows):
+            record = tuple(row[position] if position < len(row) else None for position in positions)
+            if all(value is None for value in record):
+                continue  # openpyxl reports formatted but empty rows
+            records.append(record)
+            index.append(row_index)
+            if len(records) >= chunk_rows:
+                yield _finish_chunk(pd.DataFrame.from_records(records, columns=names, index=index),
+                                    categorical_columns)
+                records, index = [], []
+        if records:
+            yield _finish_chunk(pd.DataFrame.from_records(records, columns=names, index=index), categorical_columns)
+    finally:
+        workbook.close()
+
+
+def _iter_parquet_chunks(file_path, columns, chunk_rows: int, categorical_columns):
+    parquet_file = _import_parquet().ParquetFile(file_path)
+    names = [name for name in parquet_file.schema_arrow.names if columns is None or name in columns]
+    start = 0
+    for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=names):
+        chunk = batch.to_pandas()
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield _finish_chunk(chunk, categorical_columns)
+
+
+def iter_sheet_chunks(file_path, columns: list = None, chunk_rows: int = SHEET_CHUNK_ROWS,
+                      categorical_columns: list = ()):
+    """
+    (Generator) Reads the first sheet of a workbook (or a CSV or Parquet file) as DataFrames of up
+    to `chunk_rows` rows.
+
+    Only the named `columns` are read (all of them if None), and `categorical_columns` (e.g. picker
+    fields) are stored as categoricals. .xlsx files are streamed with openpyxl in read-only mode,
+    CSVs with pandas' chunked reader and .parquet files one record batch at a time, so memory stays
+    flat however long the sheet is. Each chunk's index is the 0-based data row number, so
+    `index + 2` is the spreadsheet row.
+    """
+    suffix = Path(file_path).suffix.lower()
+    wanted = set(columns) if columns is not None else None
+
+    if suffix in OPENPYXL_SUFFIXES:
+        yield from _iter_xlsx_chunks(file_path, wanted, chunk_rows, categorical_columns)
+    elif suffix == ".csv":
+        usecols = (lambda name: name in wanted) if wanted is not None else None
+        dtype = {column: "category" for column in categorical_columns}
+        yield from pd.read_csv(file_path, usecols=usecols, dtype=dtype, chunksize=chunk_rows)
+    elif suffix in PARQUET_SUFFIXES:
+        yield from _iter_parquet_chunks(file_path, wanted, chunk_rows, categorical_columns)
+    else:
+        # Legacy formats (.xls) cannot be streamed; read the wanted columns once and chunk them.
+        usecols = (lambda name: name in wanted) if wanted is not None else None
+        df = pd.read_excel(file_path, usecols=usecols)
+        for start in range(0, len(df), chunk_rows):
+            yield _finish_chunk(df.iloc[start:start + chunk_rows].copy(), categorical_columns)
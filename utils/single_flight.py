@@ -0,0 +1,140 @@
+# utils/single_flight.py
+
+import threading
+import time
+
+# How long a finished fetch keeps answering identical requests.
+COALESCE_WINDOW_SECONDS = 30.0
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+class _Flight:
+    """One shared fetch: its result (or streamed pages), any error, and when it finished."""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.pages = []
+        self.result = None
+        self.error = None
+        self.done = False
+        self.finished_at = None
+        # Cleared by forget() while the flight runs: it still serves its callers but is dropped when done.
+        self.reusable = True
+
+
+def _join(key, window: float) -> tuple[_Flight, bool]:
+    """Returns the flight to use for `key` and whether the caller must run it (True) or just wait (False)."""
+    now = time.monotonic()
+    with _flights_lock:
+        for stale_key in [k for k, f in _flights.items() if f.done and now - f.finished_at >= window]:
+            del _flights[stale_key]
+        flight = _flights.get(key)
+        if flight is None:
+            flight = _flights[key] = _Flight()
+            return flight, True
+        return flight, False
+
+
+def _finish(key, flight: _Flight, window: float) -> None:
+    with flight.condition:
+        flight.done = True
+        flight.finished_at = time.monotonic()
+        flight.condition.notify_all()
+    if flight.error is not None or window <= 0 or not flight.reusable:
+        with _flights_lock:
+            if _flights.get(key) is flight:
+                del _flights[key]
+
+
+def do(key, fn, window: float = COALESCE_WINDOW_SECONDS, log_callback=None):
+    """
+    Runs `fn()` once for every caller asking for the same `key` at the same time, or within
+    `window` seconds after it finished, and gives them all its result. A failed call is not
+    reused. Callers share the returned object and must not modify it.
+    """
+    flight, leader = _join(key, window)
+    if leader:
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            _finish(key, flight, window)
+        return flight.result
+
+    if log_callback:
+        log_callback("ℹ️ Reusing an identical request that is already in progress or just finished.")
+    with flight.condition:
+        flight.condition.wait_for(lambda: flight.done)
+    if flight.error is not None:
+        raise flight.error
+    return flight.result
+
+
+def _produce(key, flight: _Flight, gen_fn, window: float) -> None:
+    """(Worker Thread) Drains the generator into the flight's page buffer and keeps its return value."""
+    try:
+        pages = gen_fn()
+        while True:
+            try:
+                page = next(pages)
+            except StopIteration as stop:
+                flight.result = stop.value
+                if stop.value is False:
+                    flight.reusable = False  # An incomplete fetch is not handed to later callers
+                break
+            with flight.condition:
+                flight.pages.append(page)
+                flight.condition.notify_all()
+    except BaseException as e:
+        flight.error = e
+    finally:
+        _finish(key, flight, window)
+
+
+def stream(key, gen_fn, window: float = COALESCE_WINDOW_SECONDS, log_callback=None):
+    """
+    (Generator) Like `do`, for paged fetches: the generator returned by `gen_fn()` runs once, on a
+    background thread, and every caller sharing `key` receives all of its pages in order, replayed
+    from the start for late joiners. A consumer that stops early does not cut the fetch short for
+    the others. Returns the generator's return value; a generator that returns False (it finished
+    without fetching everything) is, like a failed one, not reused.
+    """
+    flight, leader = _join(key, window)
+    if leader:
+        threading.Thread(target=_produce, args=(key, flight, gen_fn, window), daemon=True).start()
+    elif log_callback:
+        log_callback("ℹ️ Reusing an identical request that is already in progress or just finished.")
+
+    position = 0
+    while True:
+        with flight.condition:
+            flight.condition.wait_for(lambda: position < len(flight.pages) or flight.done)
+            pages = flight.pages[position:]
+            done = flight.done
+        yield from pages
+        position += len(pages)
+        if done:
+            break
+    if flight.error is not None:
+        raise flight.error
+    return flight.result
+
+
+def forget(namespace) -> None:
+    """
+    Stops reusing any fetch whose key starts with `namespace`, e.g. after the underlying data changed.
+    A fetch still running keeps serving its callers, and anyone joining it meanwhile, so that no
+    second identical fetch runs alongside it; it is dropped as soon as it finishes.
+    """
+    with _flights_lock:
+        for key in [k for k in _flights if isinstance(k, tuple) and k and k[0] == namespace]:
+            flight = _flights[key]
+            with flight.condition:
+                if flight.done:
+                    del _flights[key]
+                else:
+                    flight.reusable = False
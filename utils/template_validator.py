@@ -1,10 +1,17 @@
 import pandas as pd
 
+from utils import alation_lookup, payload_builder, sheet_reader
+from utils.sheet_reader import read_sheet_header
+
+REPORT_COLUMNS = ["row", "column", "value", "error"]
+MULTI_VALUE_SEPARATOR = ","
+
+
 def validate_template(file_path, expected_fields):
-    df = pd.read_excel(file_path)
+    # Only the header row is needed, so the data rows are never read.
+    template_fields = read_sheet_header(file_path)
 
     # Example check: field names match
-    template_fields = df.columns.tolist()
     missing_fields = [field for field in expected_fields if field not in template_fields]
 
     if missing_fields:
@@ -13,3 +20,183 @@ def validate_template(file_path, expected_fields):
     else:
         print("✅ Template fields validated.")
         return True, []
+
+
+# --- Whole-sheet validation ---
+
+def _present(series: pd.Series) -> pd.Series:
+    """Mask of cells that hold a value: not empty and not only whitespace."""
+    return series.notna() & (series.astype(str).str.strip() != "")
+
+
+def _cell_errors(series: pd.Series, mask: pd.Series, column: str, error) -> pd.DataFrame:
+    """One report row per cell selected by `mask`. `error` is a message, or a Series of messages."""
+    mask = pd.Series(mask, index=series.index).to_numpy(dtype=bool)
+    failing = series[mask]
+    if isinstance(error, pd.Series):
+        error = error[mask].to_numpy()
+    return pd.DataFrame({"row": failing.index.to_numpy() + 2, "column": column,
+                         "value": failing.astype(str).to_numpy(), "error": error}, columns=REPORT_COLUMNS)
+
+
+def _option_titles(field_details: dict) -> list:
+    """A PICKER / MULTI_PICKER field's allowed values; options may be plain strings or {"title"/"value"} dicts."""
+    options = []
+    for option in field_details.get('options') or []:
+        if isinstance(option, dict):
+            option = option.get('title') or option.get('value') or option.get('name')
+        if option is not None:
+            options.append(str(option).strip())
+    return options
+
+
+def _split_values(series: pd.Series) -> pd.Series:
+    """Splits each cell on MULTI_VALUE_SEPARATOR into one stripped value per entry, keeping the row index."""
+    return series.astype(str).str.split(MULTI_VALUE_SEPARATOR).explode().str.strip()
+
+
+def _check_picker(series: pd.Series, column: str, field_details: dict, multiple: bool) -> list:
+    options = _option_titles(field_details)
+    if not options:
+        return []
+    allowed = ", ".join(options)
+    if multiple:
+        values = _split_values(series)
+        values = values[values != ""]
+    else:
+        values = series.astype(str).str.strip()
+    bad = ~values.isin(options)
+    if not bad.any():
+        return []
+    return [_cell_errors(values, bad, column, "'" + values + f"' is not one of: {allowed}")]
+
+
+def _check_date(series: pd.Series, column: str) -> list:
+    parsed = pd.to_datetime(series, errors="coerce", format="mixed")
+    bad = parsed.isna()
+    return [_cell_errors(series, bad, column, "Not a valid date")] if bad.any() else []
+
+
+def _check_object_set(series: pd.Series, column: str, field_details: dict, resolved: dict = None) -> list:
+    errors = []
+    if field_details.get('allow_multiple', False):
+        names = _split_values(series)
+        has_names = (names != "").groupby(level=0).any()
+        if not has_names.all():
+            errors.append(_cell_errors(series, ~has_names.reindex(series.index).to_numpy(), column,
+                                       "No object names after splitting on ','"))
+        names = names[names != ""]
+    else:
+        names = series.astype(str).str.strip()
+
+    if resolved is not None:
+        otype_hint = payload_builder.get_otype_hint(field_details)
+        unresolved = {name for (name, hint), found in resolved.items() if hint == otype_hint and found is None}
+        bad = names.isin(unresolved)
+        if bad.any():
+            errors.append(_cell_errors(names, bad, column, "'" + names + "' was not found in Alation"))
+    return errors
+
+
+def _object_set_names(df: pd.DataFrame, fields: dict) -> set:
+    """Every distinct (name, otype_hint) pair referenced by the sheet's OBJECT_SET columns."""
+    pairs = set()
+    for column, field_details in fields.items():
+        if field_details.get('field_type') != "OBJECT_SET":
+            continue
+        series = df[column][_present(df[column])]
+        names = _split_values(series) if field_details.get('allow_multiple', False) else series.astype(str).str.strip()
+        otype_hint = payload_builder.get_otype_hint(field_details)
+        pairs.update((name, otype_hint) for name in names.unique() if name)
+    return pairs
+
+
+def validate_sheet(df: pd.DataFrame, template_details: dict, config: dict = None, log_callback=print,
+                   seen_titles: dict = None) -> pd.DataFrame:
+    """
+    Checks every cell of an upload sheet against the template's fields, one column at a time.
+
+    Covers required and duplicate titles, PICKER / MULTI_PICKER options (multi-value cells are split
+    on ','), DATE values, and OBJECT_SET cells that split into no names. With `config`, every distinct
+    OBJECT_SET name is also resolved (see alation_lookup.resolve_object_names) and names that do not
+    exist are reported; the lookups are cached, so a following upload does not repeat them.
+
+    `seen_titles` ({title: row}) carries titles across calls when a sheet is validated in chunks.
+    Returns a report with one row per bad cell (REPORT_COLUMNS), sorted by sheet row; empty if valid.
+    """
+    if seen_titles is None:
+        seen_titles = {}
+    errors = []
+
+    if "Title" not in df.columns:
+        return pd.DataFrame([{"row": 1, "column": "Title", "value": "", "error": "'Title' column is missing"}],
+                            columns=REPORT_COLUMNS)
+
+    titles = df["Title"]
+    has_title = _present(titles)
+    if not has_title.all():
+        errors.append(_cell_errors(titles.fillna(""), ~has_title, "Title", "Title is required"))
+    stripped = titles[has_title].astype(str).str.strip()
+    first_rows = stripped.index.to_series().groupby(stripped.values).transform("min") + 2
+    earlier = stripped.map(seen_titles)
+    first_rows = earlier.fillna(first_rows).astype(int)
+    duplicate = first_rows != stripped.index + 2
+    if duplicate.any():
+        errors.append(_cell_errors(stripped, duplicate, "Title",
+                                   "Duplicate title (first used in row " + first_rows.astype(str) + ")"))
+    for title, row in zip(stripped[~duplicate].tolist(), (stripped[~duplicate].index + 2).tolist()):
+        seen_titles.setdefault(title, row)
+
+    fields = {column: field_details
+              for column, field_details in payload_builder.get_field_name_to_details_map(template_details).items()
+              if column in df.columns and column not in ("Title", "Description")}
+
+    resolved = None
+    if config is not None:
+        pairs = _object_set_names(df, fields)
+        resolved = alation_lookup.resolve_object_names(config, pairs, log_callback=log_callback) if pairs else {}
+
+    for column, field_details in fields.items():
+        series = df[column][_present(df[column])]
+        if series.empty:
+            continue
+        field_type = field_details.get('field_type')
+        if field_type == "PICKER":
+            errors.extend(_check_picker(series, column, field_details, multiple=False))
+        elif field_type == "MULTI_PICKER":
+            errors.extend(_check_picker(series, column, field_details, multiple=True))
+        elif field_type == "DATE":
+            errors.extend(_check_date(series, column))
+        elif field_type == "OBJECT_SET":
+            errors.extend(_check_object_set(series, column, field_details, resolved))
+
+    if not errors:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    report = pd.concat(errors, ignore_index=True)
+    return report.sort_values(["row", "column"], kind="stable", ignore_index=True)
+
+
+def validate_sheet_file(file_path, template_details: dict, config: dict = None, log_callback=print,
+                        chunk_rows: int = sheet_reader.SHEET_CHUNK_ROWS) -> pd.DataFrame:
+    """Validates an .xlsx/.csv sheet chunk by chunk (see sheet_reader), so memory stays flat. See validate_sheet."""
+    seen_titles = {}
+    reports = [validate_sheet(chunk, template_details, config, log_callback, seen_titles)
+               for chunk in sheet_reader.iter_sheet_chunks(
+                   file_path, columns=payload_builder.get_template_columns(template_details), chunk_rows=chunk_rows,
+                   categorical_columns=payload_builder.get_picker_columns(template_details))]
+    reports = [report for report in reports if not report.empty]
+    return pd.concat(reports, ignore_index=True) if reports else pd.DataFrame(columns=REPORT_COLUMNS)
+
+
+def log_report(report: pd.DataFrame, log_callback=print, limit: int = 20) -> None:
+    """Logs a summary of a validation report: error counts per column, then the first `limit` bad cells."""
+    if report.empty:
+        log_callback("✅ Sheet validated: no problems found.")
+        return
+    per_column = report.groupby("column", sort=False).size()
+    log_callback(f"❌ Sheet validation found {len(report)} problem(s) in {report['row'].nunique()} row(s): "
+                 + ", ".join(f"{column}: {count}" for column, count in per_column.items()))
+    for entry in report.head(limit).itertuples(index=False):
+        log_callback(f"   Row {entry.row}, '{entry.column}': {entry.error}")
+    if len(report) > limit:
+        log_callback(f"   ... and {len(report) - limit} more.")
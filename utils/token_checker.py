@@ -1,9 +1,91 @@
 import requests
 import json
+from urllib3.exceptions import NewConnectionError
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from config import config_handler
+from utils import metrics
+from utils.http_session import backoff_delay, get_session, retry_after_delay
 
 CONFIG_PATH = Path("config.json")
+DEFAULT_MAX_RETRIES = 3
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+NON_IDEMPOTENT_RETRY_STATUS_CODES = {429, 503}
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+FAILED_REFRESH_COOLDOWN_SECONDS = 30
+
+
+@lru_cache(maxsize=8)
+def _parse_expiry(token_expires_at: str) -> float:
+    """Parses Alation's token_expires_at (ISO 8601) to a Unix timestamp, or None if it cannot be parsed."""
+    try:
+        return datetime.fromisoformat(token_expires_at.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+class TokenManager:
+    """
+    Serializes access token refreshes across worker threads.
+
+    When several requests get a 401 for the same token, the first one refreshes under the lock and
+    the others wait, then retry with the new token instead of refreshing again. If the token's expiry
+    is known ("token_expires_at"), it is refreshed TOKEN_REFRESH_MARGIN_SECONDS before it runs out.
+    New tokens are saved to the config file atomically on a background thread.
+    """
+
+    def __init__(self, config_path: Path = CONFIG_PATH):
+        self.config_path = config_path
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._failed_token = None
+        self._failed_at = 0.0
+
+    def ensure_fresh(self, config: dict, token_refresher: callable, log_callback=print) -> None:
+        """Refreshes the access token ahead of time if it expires within the margin."""
+        if getattr(self._local, 'refreshing', False):
+            return  # This is the refresh request itself
+        expires_at = _parse_expiry(config.get("token_expires_at"))
+        if expires_at is None or expires_at - time.time() > TOKEN_REFRESH_MARGIN_SECONDS:
+            return
+        token = config.get("access_token")
+        with self._lock:
+            if config.get("access_token") != token:
+                return
+            log_callback("🔄 Access token expires soon. Refreshing it ahead of time...")
+            self.refresh(config, token, token_refresher, log_callback)
+
+    def refresh(self, config: dict, failed_token: str, token_refresher: callable, log_callback=print) -> bool:
+        """
+        Replaces `failed_token` with a new access token, unless another thread already did.
+        Returns True if the config now holds a token other than `failed_token`.
+        """
+        with self._lock:
+            if config.get("access_token") != failed_token:
+                return True  # Refreshed by another thread while this one waited
+            if failed_token == self._failed_token and time.monotonic() - self._failed_at < FAILED_REFRESH_COOLDOWN_SECONDS:
+                return False  # Refreshing this token just failed; don't hammer the endpoint
+
+            self._local.refreshing = True
+            try:
+                success, msg, new_tokens = token_refresher(config, log_callback=log_callback)
+            finally:
+                self._local.refreshing = False
+
+            if not success:
+                log_callback(f"❌ Failed to refresh token during API call: {msg}.")
+                self._failed_token, self._failed_at = failed_token, time.monotonic()
+                return False
+
+            config.update(new_tokens)
+            config_handler.save_config_in_background(self.config_path, config)
+            return True
+
+
+token_manager = TokenManager()
 
 # =====================================================================================
 # The generic API request helper now lives here to resolve circular dependencies.
@@ -13,41 +95,92 @@ def _make_api_request_with_retry(method: str, url: str, config: dict, token_refr
     """
     Helper function to make an API request with token refresh retry logic.
     Receives the token_refresher function as an argument.
+
+    Requests go through the shared pooled session. 429 responses are retried after the server's
+    Retry-After delay; 5xx responses and connection errors are retried with jittered exponential
+    backoff, up to config "max_retries" times. POST is not idempotent, so it is only retried when
+    the server cannot have processed it: 429, 503, or a connection that was never established (see
+    _failed_before_sending).
+
+    Every call is recorded in the metrics registry (see utils.metrics).
     """
-    retries = 1
+    stats = {"retries": 0, "token_refreshes": 0}
+    started = time.perf_counter()
+    response = _request_with_retry(method, url, config, token_refresher, json_data, params, timeout, log_callback,
+                                   stats)
+    metrics.registry.record_request(
+        method, url, response.status_code if response is not None else None, time.perf_counter() - started,
+        response_bytes=len(response.content) if response is not None else 0, **stats)
+    return response
+
 
-    while retries >= 0:
-        headers = {"TOKEN": config["access_token"], "accept": "application/json"}
+def _failed_before_sending(error: requests.RequestException) -> bool:
+    """
+    True if the request cannot have reached the server: connecting timed out, was refused or the
+    host name did not resolve. A connection dropped after sending (RemoteDisconnected,
+    ProtocolError) is also a ConnectionError, but the server may have processed the request.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError) and error.args:
+        # requests wraps urllib3's MaxRetryError, whose `reason` is the underlying failure
+        return isinstance(getattr(error.args[0], "reason", error.args[0]), NewConnectionError)
+    return False
+
+
+def _request_with_retry(method: str, url: str, config: dict, token_refresher: callable, json_data: dict,
+                        params: dict, timeout: int, log_callback, stats: dict):
+    """The retry loop behind _make_api_request_with_retry; counts retries and token refreshes into `stats`."""
+    auth_retries = 1
+    attempt = 0
+    max_retries = config.get("max_retries", DEFAULT_MAX_RETRIES)
+    retry_statuses = RETRY_STATUS_CODES if method != "POST" else NON_IDEMPOTENT_RETRY_STATUS_CODES
+    session = get_session(config)
+
+    while True:
+        token_manager.ensure_fresh(config, token_refresher, log_callback)
+        access_token = config["access_token"]
+        headers = {"TOKEN": access_token, "accept": "application/json"}
         if method == "POST":
             headers["Content-Type"] = "application/json"
 
         try:
-            response = requests.request(method, url, headers=headers, json=json_data, params=params, timeout=timeout)
-
-            if response.status_code in (401, 403) and retries > 0:
-                log_callback("⚠️ Access token unauthorized. Attempting to refresh...")
-                success, msg, new_tokens = token_refresher(config, log_callback=log_callback)
-                if success:
-                    config.update(new_tokens)
-                    config_handler.save_config(CONFIG_PATH, config)
-                    log_callback("✅ Token refreshed. Retrying API request...")
-                    retries -= 1
-                    continue
-                else:
-                    log_callback(f"❌ Failed to refresh token during API call: {msg}.")
-                    return None  # Refresh failed, stop trying
-            else:
-                return response
-
+            response = session.request(method, url, headers=headers, json=json_data, params=params, timeout=timeout)
         except requests.RequestException as e:
             log_callback(f"❌ Request failed: {e}")
-            if retries > 0:
-                log_callback("Retrying API call...")
-                retries -= 1
+            retryable = method != "POST" or _failed_before_sending(e)
+            if retryable and attempt < max_retries:
+                delay = backoff_delay(attempt)
+                attempt += 1
+                stats["retries"] += 1
+                log_callback(f"Retrying API call in {delay:.1f}s (attempt {attempt}/{max_retries})...")
+                time.sleep(delay)
                 continue
             return None # Retries exhausted
 
-    return None # Should not be reached, but included for safety
+        if response.status_code in (401, 403) and auth_retries > 0:
+            log_callback("⚠️ Access token unauthorized. Attempting to refresh...")
+            if token_manager.refresh(config, access_token, token_refresher, log_callback):
+                log_callback("✅ Token refreshed. Retrying API request...")
+                auth_retries -= 1
+                stats["token_refreshes"] += 1
+                continue
+            else:
+                return None  # Refresh failed, stop trying
+
+        if response.status_code in retry_statuses and attempt < max_retries:
+            if response.status_code == 429:
+                delay = retry_after_delay(response, attempt)
+                log_callback(f"⚠️ Rate limited (429). Retrying in {delay:.1f}s...")
+            else:
+                delay = backoff_delay(attempt)
+                log_callback(f"⚠️ Server error ({response.status_code}). Retrying in {delay:.1f}s...")
+            attempt += 1
+            stats["retries"] += 1
+            time.sleep(delay)
+            continue
+
+        return response
 
 
 def refresh_access_token(config: dict, log_callback=print) -> tuple[bool, str, dict]:
@@ -78,7 +211,8 @@ def refresh_access_token(config: dict, log_callback=print) -> tuple[bool, str, d
         if new_access_token:
             log_callback("✅ Access token refreshed successfully.")
             new_refresh_token = new_tokens.get("refresh_token", refresh_token)
-            return True, "Access token refreshed.", {"access_token": new_access_token, "refresh_token": new_refresh_token, "user_id": user_id}
+            return True, "Access token refreshed.", {"access_token": new_access_token, "refresh_token": new_refresh_token, "user_id": user_id,
+                                                     "token_expires_at": new_tokens.get("token_expires_at")}
         else:
             return False, "Refresh successful but no new token found.", {}
     elif response:
@@ -0,0 +1,116 @@
+# utils/upload_journal.py
+
+import hashlib
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+JOURNAL_DIR = Path("cache/upload_journals")
+
+# Row statuses. Rows in COMPLETED_STATUSES are skipped when the same sheet is uploaded again.
+ROW_SUCCESS = "success"
+ROW_EXISTING = "existing"
+ROW_ACCEPTED = "accepted"
+ROW_PENDING = "pending"
+ROW_FAILED = "failed"
+COMPLETED_STATUSES = (ROW_SUCCESS, ROW_EXISTING)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rows (
+    row INTEGER PRIMARY KEY,
+    title TEXT,
+    status TEXT NOT NULL,
+    document_id INTEGER,
+    job_id TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def file_fingerprint(file_path) -> str:
+    """SHA-256 of a file's bytes, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """SHA-256 of a DataFrame's column names and cell values, including the row index."""
+    digest = hashlib.sha256("\x1f".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+class UploadJournal:
+    """
+    A checkpoint journal for one sheet uploaded to one target (hub, folder, template).
+
+    Each sheet row's latest outcome is stored in SQLite as it happens: status, created document id,
+    job id and error. Re-running the same upload skips rows that already succeeded and resends only
+    those that failed or never finished. The journal is keyed by the sheet's content hash, so an
+    edited sheet starts a fresh journal.
+    """
+
+    def __init__(self, sheet_fingerprint: str, document_hub_id: int, parent_folder_id: int, template_id: int,
+                 journal_dir: Path = JOURNAL_DIR):
+        key = hashlib.sha256(
+            f"{sheet_fingerprint}:{document_hub_id}:{parent_folder_id}:{template_id}".encode()).hexdigest()[:32]
+        self.path = Path(journal_dir) / f"{key}.sqlite3"
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn, conn:
+            conn.executescript(_SCHEMA)
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('created_at', ?)", (str(time.time()),))
+
+    @contextmanager
+    def _connect(self):
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            yield conn
+
+    def record(self, rows: list) -> None:
+        """Stores outcomes for (row, title, status, document_id, job_id, error) tuples, replacing older ones."""
+        if not rows:
+            return
+        now = time.time()
+        with self._lock, self._connect() as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO rows (row, title, status, document_id, job_id, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(row, title, status, document_id, None if job_id is None else str(job_id), error, now)
+                 for row, title, status, document_id, job_id, error in rows])
+
+    def record_results(self, row_numbers: list, results: list) -> None:
+        """Stores upload results (see upload_manager._document_result); row_numbers maps result index to row."""
+        self.record([(row_numbers[result["index"]], result["title"], result["status"], result.get("id"),
+                      result.get("job_id"), result.get("error")) for result in results])
+
+    def completed_rows(self) -> set:
+        with self._connect() as conn:
+            return {row for (row,) in conn.execute(
+                f"SELECT row FROM rows WHERE status IN ({','.join('?' * len(COMPLETED_STATUSES))})",
+                COMPLETED_STATUSES)}
+
+    def unresolved_jobs(self) -> dict:
+        """Returns {job_id: [(row, title), ...]} for rows accepted into a job whose outcome was never recorded."""
+        jobs = {}
+        with self._connect() as conn:
+            for row, title, job_id in conn.execute(
+                    "SELECT row, title, job_id FROM rows WHERE status IN (?, ?) AND job_id IS NOT NULL ORDER BY row",
+                    (ROW_ACCEPTED, ROW_PENDING)):
+                jobs.setdefault(job_id, []).append((row, title))
+        return jobs
+
+    def counts(self) -> dict:
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM rows GROUP BY status").fetchall())
@@ -0,0 +1,180 @@
+# utils/upload_log.py
+
+import atexit
+import json
+import queue
+import threading
+import time
+import uuid
+from pathlib import Path
+
+UPLOAD_LOG_DIR = Path("logs")
+UPLOAD_LOG_NAME = "upload_log.jsonl"
+ROTATE_MAX_BYTES = 10 * 1024 * 1024
+ROTATE_MAX_AGE_SECONDS = 24 * 3600
+RETENTION_MAX_FILES = 30
+RETENTION_MAX_AGE_DAYS = 90
+FLUSH_INTERVAL_SECONDS = 1.0
+
+
+def new_run_id() -> str:
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+class UploadLogSink:
+    """
+    Structured upload log: one JSON record per line, written by a background thread.
+
+    Callers only enqueue records, so logging never blocks an upload on disk I/O. The writer batches
+    whatever is queued, flushes at least every FLUSH_INTERVAL_SECONDS, and rotates the active file
+    once it exceeds ROTATE_MAX_BYTES or ROTATE_MAX_AGE_SECONDS. Rotated files beyond
+    RETENTION_MAX_FILES, or older than RETENTION_MAX_AGE_DAYS, are deleted.
+    """
+
+    def __init__(self, log_dir: Path = UPLOAD_LOG_DIR):
+        self.log_dir = Path(log_dir)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._file = None
+        self._opened_at = None
+
+    @property
+    def path(self) -> Path:
+        return self.log_dir / UPLOAD_LOG_NAME
+
+    def write(self, record: dict) -> None:
+        """Queues one record. A "ts" timestamp is added if missing."""
+        self._ensure_started()
+        self._queue.put({"ts": time.time(), **record})
+
+    def flush(self, timeout: float = 10.0) -> None:
+        """Blocks until every record queued so far is on disk (or `timeout` passes)."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="upload-log-writer", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.flush)
+
+    # --- Writer thread ---
+
+    def _run(self) -> None:
+        while True:
+            try:
+                items = [self._queue.get(timeout=FLUSH_INTERVAL_SECONDS)]
+            except queue.Empty:
+                continue
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = [item for item in items if isinstance(item, dict)]
+            if records:
+                try:
+                    self._write_records(records)
+                except OSError as e:
+                    print(f"❌ Could not write upload log: {e}")
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def _write_records(self, records: list) -> None:
+        if self._file is None:
+            self._open()
+        elif self._file.tell() >= ROTATE_MAX_BYTES or time.time() - self._opened_at >= ROTATE_MAX_AGE_SECONDS:
+            self._rotate()
+        self._file.write("".join(json.dumps(record, default=str) + "\n" for record in records))
+        self._file.flush()
+
+    def _open(self) -> None:
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8", buffering=1024 * 1024)
+        self._opened_at = time.time()
+        first_line = None
+        if self._file.tell():
+            with open(self.path, encoding="utf-8") as existing:
+                first_line = existing.readline()
+        if first_line:
+            try:
+                self._opened_at = json.loads(first_line).get("ts", self._opened_at)
+            except json.JSONDecodeError:
+                pass
+
+    def _rotate(self) -> None:
+        self._file.close()
+        rotated = self.log_dir / f"upload_log-{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+        counter = 1
+        while rotated.exists():
+            rotated = self.log_dir / f"upload_log-{time.strftime('%Y%m%d-%H%M%S')}-{counter}.jsonl"
+            counter += 1
+        self.path.rename(rotated)
+        self._apply_retention()
+        self._open()
+
+    def _apply_retention(self) -> None:
+        rotated = sorted(self.log_dir.glob("upload_log-*.jsonl"), key=lambda p: p.stat().st_mtime, reverse=True)
+        cutoff = time.time() - RETENTION_MAX_AGE_DAYS * 86400
+        for position, path in enumerate(rotated):
+            if position >= RETENTION_MAX_FILES or path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+
+
+# The sink every upload writes to.
+upload_log = UploadLogSink()
+
+
+# --- Querying ---
+
+def _log_files(log_dir: Path) -> list:
+    """Rotated files oldest first, then the active file."""
+    log_dir = Path(log_dir)
+    files = sorted(log_dir.glob("upload_log-*.jsonl"), key=lambda p: p.stat().st_mtime)
+    active = log_dir / UPLOAD_LOG_NAME
+    return files + ([active] if active.exists() else [])
+
+
+def iter_records(log_dir: Path = UPLOAD_LOG_DIR, run_id: str = None, record_type: str = None, since: float = None):
+    """
+    (Generator) Yields records from the active and rotated logs, oldest first, filtered by run id,
+    record type and timestamp. Lines that cannot match are skipped before being parsed.
+    """
+    needles = [f'"{value}"' for value in (run_id, record_type) if value]
+    for path in _log_files(log_dir):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if any(needle not in line for needle in needles):
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if run_id and record.get("run_id") != run_id:
+                    continue
+                if record_type and record.get("type") != record_type:
+                    continue
+                if since is not None and record.get("ts", 0) < since:
+                    continue
+                yield record
+
+
+def summarize_runs(log_dir: Path = UPLOAD_LOG_DIR, since: float = None, limit: int = None) -> list:
+    """Returns the run_end summaries of past uploads, newest first, reading only run_end records."""
+    runs = list(iter_records(log_dir, record_type="run_end", since=since))
+    runs.reverse()
+    return runs[:limit] if limit else runs
+
+
+def failed_documents(run_id: str, log_dir: Path = UPLOAD_LOG_DIR) -> list:
+    """Returns the document records of a run that did not succeed."""
+    return [record for record in iter_records(log_dir, run_id=run_id, record_type="document")
+            if record.get("status") != "success"]
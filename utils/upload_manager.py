@@ -1,252 +1,586 @@
 import time
-from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import pandas as pd
-import requests
 import json
 from urllib.parse import urljoin
-from utils import alation_lookup
-from utils.api_client import DOCUMENTS_CACHE_PATH, TEMPLATES_CACHE_PATH
+from core.constants import DEFAULT_MAX_WORKERS
+from utils import (alation_lookup, api_client, document_diff, document_exporter, job_tracker, payload_builder,
+                   sheet_reader, template_validator, upload_journal)
+from utils.upload_log import UPLOAD_LOG_DIR, new_run_id, upload_log
+from utils.http_session import backoff_delay
+from utils.token_checker import _make_api_request_with_retry, refresh_access_token
 
-LOG_PATH = Path("logs")
+UPLOAD_BATCH_MAX_DOCS = 500
+UPLOAD_BATCH_MAX_BYTES = 4 * 1024 * 1024
+UPLOAD_BATCH_RETRIES = 2
+# Rejections caused by what is in the batch (bad rows, too large); splitting isolates them.
+SPLITTABLE_STATUS_CODES = (400, 413, 422)
 
 
 # This function is now the primary entry point for Excel uploads.
 def upload_documents_from_excel(config: dict, df_to_upload: pd.DataFrame, document_hub_id: int, parent_folder_id: int,
-                                template_details: dict, log_callback=print, on_success_callback: callable = None):
+                                template_details: dict, log_callback=print, on_success_callback: callable = None,
+                                verbose: bool = False, resume: bool = True, skip_existing: bool = True,
+                                validate: bool = True):
     """
     Reads document data from a DataFrame (typically from Excel) and uploads each document to Alation.
     Handles different custom field types, including OBJECT_SET lookup.
+    Payloads are built column by column (see payload_builder); set `verbose` for per-row logging.
+
+    Each row's outcome is kept in a checkpoint journal keyed by the sheet's contents and the target
+    (see upload_journal). With `resume`, rows an earlier run already uploaded are skipped and only
+    failed or unfinished ones are sent again. With `skip_existing`, rows whose title already exists
+    in the target folder are not created again.
+
+    With `validate`, the whole sheet is checked against the template first (see
+    template_validator.validate_sheet), and nothing is uploaded if any cell is invalid.
     """
+    context_name = f"Excel upload from '{getattr(df_to_upload, '_file_path', 'unknown_file')}'"
     # This try-except block is for errors specific to reading/processing the Excel DataFrame
     try:
         if df_to_upload.empty:
             log_callback("❌ DataFrame is empty. No documents to upload.")
-            timestamp = time.strftime("%Y%m%d-%H%M%S")
-            log_file_name = LOG_PATH / f"upload_log_excel_{timestamp}.txt"
-            with open(log_file_name, "w") as f:
-                f.write(f"--- Excel upload from '{getattr(df_to_upload, '_file_path', 'unknown_file')}' Log ---\n")
-                f.write(f"Timestamp: {timestamp}\n")
-                f.write("No documents to upload (empty DataFrame).\n")
+            return
+        if validate and not _sheet_is_valid(
+                template_validator.validate_sheet(df_to_upload, template_details, config, log_callback),
+                context_name, log_callback):
             return
 
-        field_name_to_details_map = {}
-        if 'fields' in template_details and template_details['fields']:
-            for field in template_details['fields']:
-                field_name_key = field.get('name_singular') or field.get(
-                    'name_plural') or f"Field ID: {field.get('id')}"
-                field_name_to_details_map[field_name_key] = field
-
-        documents_to_upload_payloads = []
+        upload_log_entries = []
+        row_numbers = []
+        documents_to_upload_payloads = payload_builder.build_document_payloads(
+            config, df_to_upload, document_hub_id, parent_folder_id, template_details,
+            log_callback=log_callback, upload_log_entries=upload_log_entries, verbose=verbose,
+            row_numbers=row_numbers)
+        journal = upload_journal.UploadJournal(upload_journal.dataframe_fingerprint(df_to_upload), document_hub_id,
+                                               parent_folder_id, template_details.get('id'))
+
+        return _perform_journaled_upload(
+            config, documents_to_upload_payloads, row_numbers, journal, parent_folder_id,
+            log_callback=log_callback,
+            on_success_callback=on_success_callback,
+            upload_log_entries=upload_log_entries,
+            context_name=context_name,
+            resume=resume,
+            skip_existing=skip_existing
+        )
+    except Exception as e:
+        log_callback(f"❌ Error reading or processing Excel file: {e}")
+        _log_run_error(context_name, e)
 
-        for index, row in df_to_upload.iterrows():
-            document_title = row.get("Title")
-            document_description = row.get("Description", "")
 
-            if not document_title:
-                log_callback(
-                    f"⚠️ Skipping row {index + 2}: 'Title' column is missing or empty. Each document must have a title.")
-                continue
+# This function is now the primary entry point for Excel uploads.
+upload_documents = upload_documents_from_excel
 
-            log_callback(f"Processing document: '{document_title}'")
 
-            custom_fields_payload = []
-            for col_header, field_details in field_name_to_details_map.items():
-                alation_field_id = field_details['id']
-                field_type = field_details['field_type']
-                builtin_name = field_details.get('builtin_name')
+def upload_documents_from_file(config: dict, file_path, document_hub_id: int, parent_folder_id: int,
+                               template_details: dict, log_callback=print, on_success_callback: callable = None,
+                               verbose: bool = False, chunk_rows: int = sheet_reader.SHEET_CHUNK_ROWS,
+                               resume: bool = True, skip_existing: bool = True, validate: bool = True):
+    """
+    Uploads the documents in an .xlsx/.csv sheet without loading the whole sheet into memory.
 
-                if builtin_name in ["description", "title"]:
-                    log_callback(
-                        f"DEBUG: Skipping built-in field '{builtin_name}' (ID: {alation_field_id}) from custom_fields payload, as it's handled at top level.")
-                    continue
-
-                if col_header in row:
-                    field_value = row[col_header]
-
-                    if field_type == "RICH_TEXT":
-                        if pd.notna(field_value):
-                            custom_fields_payload.append({
-                                "field_id": alation_field_id,
-                                "value": str(field_value)
-                            })
-                    elif field_type == "PICKER":
-                        if pd.notna(field_value):
-                            custom_fields_payload.append({
-                                "field_id": alation_field_id,
-                                "value": str(field_value)
-                            })
-                    elif field_type == "OBJECT_SET":
-                        if pd.notna(field_value):
-                            object_set_values = []
-                            names_from_excel = []
-                            if field_details.get('allow_multiple', False):
-                                names_from_excel = [name.strip() for name in str(field_value).split(',') if
-                                                    name.strip()]
-                            else:
-                                names_from_excel = [str(field_value).strip()]
-
-                            otype_hint_for_lookup = None
-                            allowed_otypes_from_template = field_details.get('allowed_otypes')
-                            if allowed_otypes_from_template and len(allowed_otypes_from_template) == 1:
-                                if allowed_otypes_from_template[0] == 'user':
-                                    otype_hint_for_lookup = 'user'
-                                elif allowed_otypes_from_template[0] == 'groupprofile':
-                                    otype_hint_for_lookup = 'group'
-
-                            for name in names_from_excel:
-                                looked_up_object = alation_lookup.lookup_alation_object(config, name,
-                                                                                        otype_hint=otype_hint_for_lookup,
-                                                                                        log_callback=log_callback)
-                                if looked_up_object:
-                                    object_set_values.append(looked_up_object)
-                                else:
-                                    fail_msg = f"❌ FAILED OBJECT SET LOOKUP: Could not find Alation object for '{name}' for field '{col_header}' (Original Value: '{field_value}'). Skipping this specific entry for this document."
-                                    log_callback(fail_msg)
-                                    upload_log_entries.append(f"FAILED OBJECT SET: Doc '{document_title}' - {fail_msg}")
-
-                            if object_set_values:
-                                custom_fields_payload.append({
-                                    "field_id": alation_field_id,
-                                    "value": object_set_values
-                                })
-                            else:
-                                log_callback(
-                                    f"⚠️ Warning: No valid Alation objects found for '{col_header}' (Value: '{field_value}'). Omitting this field from payload for this document.")
-                        pass
-                    else:
-                        if pd.notna(field_value):
-                            custom_fields_payload.append({
-                                "field_id": alation_field_id,
-                                "value": str(field_value)
-                            })
-
-            document_payload = {
-                "title": document_title,
-                "document_hub_id": document_hub_id,
-                "parent_folder_id": parent_folder_id,
-                "template_id": template_details.get('id'),
-                "description": document_description,
-                "custom_fields": custom_fields_payload
-            }
-            documents_to_upload_payloads.append(document_payload)
-
-        _perform_bulk_upload(
-            config=config,
-            documents_to_upload=documents_to_upload_payloads,
+    Only the Title, Description and template field columns are read, in chunks of `chunk_rows` rows
+    (see sheet_reader). Each chunk's payloads are built and fed straight into the batched upload, so
+    memory use stays flat however many rows the sheet has.
+    Re-runs of the same file resume from its checkpoint journal, and the sheet is validated in a
+    first streaming pass before anything is sent; see upload_documents_from_excel.
+    """
+    context_name = f"Excel upload from '{file_path}'"
+    upload_log_entries = []
+    try:
+        header = sheet_reader.read_sheet_header(file_path)
+        if "Title" not in header:
+            log_callback("❌ 'Title' column is missing. Each document must have a title.")
+            return None
+        template_columns = payload_builder.get_template_columns(template_details)
+        ignored = [column for column in header if column not in template_columns]
+        if ignored:
+            log_callback(f"ℹ️ Ignoring {len(ignored)} column(s) that are not template fields: {', '.join(ignored)}")
+        if validate and not _sheet_is_valid(
+                template_validator.validate_sheet_file(file_path, template_details, config, log_callback, chunk_rows),
+                context_name, log_callback):
+            return None
+
+        row_numbers = []
+
+        def iter_payloads():
+            for chunk in sheet_reader.iter_sheet_chunks(
+                    file_path, columns=template_columns, chunk_rows=chunk_rows,
+                    categorical_columns=payload_builder.get_picker_columns(template_details)):
+                yield from payload_builder.build_document_payloads(
+                    config, chunk, document_hub_id, parent_folder_id, template_details,
+                    log_callback=log_callback, upload_log_entries=upload_log_entries, verbose=verbose,
+                    row_numbers=row_numbers)
+
+        journal = upload_journal.UploadJournal(upload_journal.file_fingerprint(file_path), document_hub_id,
+                                               parent_folder_id, template_details.get('id'))
+        return _perform_journaled_upload(
+            config, iter_payloads(), row_numbers, journal, parent_folder_id,
             log_callback=log_callback,
             on_success_callback=on_success_callback,
             upload_log_entries=upload_log_entries,
-            context_name=f"Excel upload from '{getattr(df_to_upload, '_file_path', 'unknown_file')}'"
+            context_name=context_name,
+            resume=resume,
+            skip_existing=skip_existing
         )
     except Exception as e:
         log_callback(f"❌ Error reading or processing Excel file: {e}")
-        import traceback
-        traceback.print_exc()
-        timestamp = time.strftime("%Y%m%d-%H%M%S")
-        log_file_name = LOG_PATH / f"upload_log_excel_error_{timestamp}.txt"
-        with open(log_file_name, "w") as f:
-            f.write(
-                f"--- Excel upload from '{getattr(df_to_upload, '_file_path', 'unknown_file')}' (Failed due to processing error) ---\n")
-            f.write(f"Timestamp: {timestamp}\n")
-            f.write(f"Error: {e}\n")
-            f.write(traceback.format_exc())
+        _log_run_error(context_name, e)
+        return None
 
 
-# This function is now the primary entry point for Excel uploads.
-upload_documents = upload_documents_from_excel
+def _resolve_unfinished_jobs(config: dict, journal: upload_journal.UploadJournal, log_callback=print) -> None:
+    """Finds out what happened to jobs an earlier, interrupted run was still waiting on, and journals it."""
+    unfinished = journal.unresolved_jobs()
+    if not unfinished:
+        return
+    log_callback(f"⏳ Checking {len(unfinished)} upload job(s) left unfinished by an earlier run...")
+    rows, results = [], []
+    for job_id, job_rows in unfinished.items():
+        for row, title in job_rows:
+            results.append({"index": len(rows), "title": title, "status": "accepted", "id": None,
+                            "job_id": job_id, "error": None})
+            rows.append(row)
+    outcomes = job_tracker.track_jobs(config, list(unfinished), log_callback=log_callback)
+    job_tracker.apply_job_outcomes(results, outcomes)
+    journal.record_results(rows, results)
+
+
+def _title_key(title) -> str:
+    """Normalizes a title for the existing-title check; a sheet cell may be a number or carry stray spaces."""
+    return str(title).strip()
+
+
+def _perform_journaled_upload(config: dict, payloads, row_numbers: list, journal: upload_journal.UploadJournal,
+                              parent_folder_id: int, log_callback=print, on_success_callback: callable = None,
+                              upload_log_entries: list = None, context_name: str = "Bulk upload",
+                              resume: bool = True, skip_existing: bool = True) -> dict:
+    """
+    Runs _perform_bulk_upload on the payloads the journal does not already mark as done.
+    `row_numbers[i]` is the sheet row of the i-th payload; it may grow while `payloads` is consumed.
+    """
+    completed = set()
+    if resume:
+        _resolve_unfinished_jobs(config, journal, log_callback)
+        completed = journal.completed_rows()
+    existing_titles = {}
+    if skip_existing:
+        existing_titles = {_title_key(doc.get('title')): doc.get('id')
+                           for doc in api_client.get_folder_documents(config, parent_folder_id, log_callback)
+                           if doc.get('title') is not None}
+
+    sent_rows = []
+    skipped = {"completed": 0, "existing": 0}
+
+    def pending_payloads():
+        existing_rows = []
+        for position, payload in enumerate(payloads):
+            row = row_numbers[position]
+            if row in completed:
+                skipped["completed"] += 1
+            elif _title_key(payload['title']) in existing_titles:
+                skipped["existing"] += 1
+                existing_rows.append((row, payload['title'], upload_journal.ROW_EXISTING,
+                                      existing_titles[_title_key(payload['title'])], None, None))
+            else:
+                sent_rows.append(row)
+                yield payload
+        journal.record(existing_rows)
+        if skipped["completed"] or skipped["existing"]:
+            log_callback(f"⏭️ Skipped {skipped['completed']} row(s) already uploaded by an earlier run and "
+                         f"{skipped['existing']} whose title already exists in folder {parent_folder_id}. "
+                         f"Checkpoint journal: {journal.path}")
+
+    summary = _perform_bulk_upload(
+        config=config,
+        documents_to_upload=pending_payloads(),
+        log_callback=log_callback,
+        on_success_callback=on_success_callback,
+        upload_log_entries=upload_log_entries,
+        context_name=context_name,
+        journal=journal,
+        row_numbers=sent_rows
+    )
+    summary["skipped"] = skipped
+    return summary
+
+
+def update_documents_from_excel(config: dict, df_to_update: pd.DataFrame, document_hub_id: int, parent_folder_id: int,
+                                template_details: dict, log_callback=print, on_success_callback: callable = None,
+                                validate: bool = True):
+    """
+    Applies an edited sheet to the documents it describes instead of creating new ones.
+
+    Rows are matched to existing documents by their ID column when it is filled in (as in an
+    export, see document_exporter), otherwise by title among the documents in the target folder.
+    Each matched row is compared with the cached document (see document_diff), and only documents
+    that changed are sent, in PUT batches holding just their changed fields. Rows that match no
+    document, or several, are reported and not created.
+    """
+    context_name = f"Update from '{getattr(df_to_update, '_file_path', 'unknown_file')}'"
+    try:
+        if df_to_update.empty:
+            log_callback("❌ DataFrame is empty. No documents to update.")
+            return None
+        if validate and not _sheet_is_valid(
+                template_validator.validate_sheet(df_to_update, template_details, config, log_callback),
+                context_name, log_callback):
+            return None
+        sheet_rows = _iter_sheet_documents(config, [df_to_update], document_hub_id, parent_folder_id,
+                                           template_details, log_callback)
+        return _perform_diff_update(config, sheet_rows, parent_folder_id, template_details, log_callback,
+                                    on_success_callback, context_name)
+    except Exception as e:
+        log_callback(f"❌ Error reading or processing Excel file: {e}")
+        _log_run_error(context_name, e)
+        return None
+
+
+def update_documents_from_file(config: dict, file_path, document_hub_id: int, parent_folder_id: int,
+                               template_details: dict, log_callback=print, on_success_callback: callable = None,
+                               chunk_rows: int = sheet_reader.SHEET_CHUNK_ROWS, validate: bool = True):
+    """Like update_documents_from_excel, streaming the sheet in chunks as upload_documents_from_file does."""
+    context_name = f"Update from '{file_path}'"
+    try:
+        if "Title" not in sheet_reader.read_sheet_header(file_path):
+            log_callback("❌ 'Title' column is missing. Each document must have a title.")
+            return None
+        if validate and not _sheet_is_valid(
+                template_validator.validate_sheet_file(file_path, template_details, config, log_callback, chunk_rows),
+                context_name, log_callback):
+            return None
+        chunks = sheet_reader.iter_sheet_chunks(
+            file_path, columns=document_exporter.get_export_columns(template_details), chunk_rows=chunk_rows,
+            categorical_columns=payload_builder.get_picker_columns(template_details))
+        sheet_rows = _iter_sheet_documents(config, chunks, document_hub_id, parent_folder_id, template_details,
+                                           log_callback)
+        return _perform_diff_update(config, sheet_rows, parent_folder_id, template_details, log_callback,
+                                    on_success_callback, context_name)
+    except Exception as e:
+        log_callback(f"❌ Error reading or processing Excel file: {e}")
+        _log_run_error(context_name, e)
+        return None
+
+
+def _iter_sheet_documents(config: dict, chunks, document_hub_id: int, parent_folder_id: int,
+                          template_details: dict, log_callback=print):
+    """(Generator) Yields (row, document id from the ID column or None, payload) for each titled sheet row."""
+    id_column = document_exporter.ID_COLUMN
+    for chunk in chunks:
+        rows = []
+        payloads = payload_builder.build_document_payloads(config, chunk, document_hub_id, parent_folder_id,
+                                                           template_details, log_callback=log_callback,
+                                                           row_numbers=rows)
+        ids = pd.to_numeric(chunk[id_column], errors="coerce") if id_column in chunk.columns else None
+        for row, payload in zip(rows, payloads):
+            document_id = ids.loc[row - 2] if ids is not None else None
+            yield row, None if document_id is None or pd.isna(document_id) else int(document_id), payload
+
+
+def _perform_diff_update(config: dict, sheet_rows, parent_folder_id: int, template_details: dict,
+                         log_callback=print, on_success_callback: callable = None,
+                         context_name: str = "Update") -> dict:
+    """Matches sheet rows to cached documents and PUTs the changed fields of those that differ."""
+    folder_documents = api_client.get_folder_documents(config, parent_folder_id, log_callback)
+    by_id = {doc['id']: doc for doc in folder_documents}
+    by_title = {}
+    for doc in folder_documents:
+        by_title.setdefault(doc.get('title'), []).append(doc)
+    field_types = document_diff.get_field_types(template_details)
+    template_id = template_details.get('id')
+
+    stats = {"matched": 0, "unchanged": 0, "changed_fields": 0, "unmatched": []}
+    titles = []
+
+    def changed_documents():
+        for row, document_id, payload in sheet_rows:
+            if document_id is not None:
+                existing = by_id.get(document_id) or api_client.document_store.get(document_id)
+                reason = f"No document with ID {document_id}."
+            else:
+                candidates = by_title.get(payload['title'], [])
+                existing = candidates[0] if len(candidates) == 1 else None
+                reason = (f"{len(candidates)} documents in folder {parent_folder_id} have this title."
+                          if candidates else f"No document with this title in folder {parent_folder_id}.")
+            if existing is not None and existing.get('template_id') != template_id:
+                existing, reason = None, f"Document {existing['id']} uses template {existing.get('template_id')}."
+            if existing is None:
+                stats["unmatched"].append({"row": row, "title": payload['title'], "reason": reason})
+                continue
+
+            stats["matched"] += 1
+            update = document_diff.diff_document(existing, payload, field_types,
+                                                 compare_title=document_id is not None)
+            if update is None:
+                stats["unchanged"] += 1
+                continue
+            stats["changed_fields"] += document_diff.count_changed_fields(update)
+            titles.append(payload['title'])
+            yield update
+
+        log_callback(f"🔍 Matched {stats['matched']} row(s): {stats['matched'] - stats['unchanged']} changed "
+                     f"({stats['changed_fields']} field(s)), {stats['unchanged']} unchanged.")
+        if stats["unmatched"]:
+            log_callback(f"⚠️ {len(stats['unmatched'])} row(s) match no single existing document and were skipped:")
+            for entry in stats["unmatched"][:20]:
+                log_callback(f"   Row {entry['row']} '{entry['title']}': {entry['reason']}")
+
+    summary = _perform_bulk_upload(
+        config=config,
+        documents_to_upload=changed_documents(),
+        log_callback=log_callback,
+        on_success_callback=on_success_callback,
+        context_name=context_name,
+        method="PUT",
+        titles=titles
+    )
+    summary.update(stats)
+    return summary
+
+
+def _sheet_is_valid(report, context_name: str, log_callback=print) -> bool:
+    """Logs a validation report. An invalid sheet's full report is saved as CSV next to the upload log."""
+    template_validator.log_report(report, log_callback)
+    if report.empty:
+        return True
+    run_id = new_run_id()
+    report_path = UPLOAD_LOG_DIR / f"validation_report-{run_id}.csv"
+    UPLOAD_LOG_DIR.mkdir(parents=True, exist_ok=True)
+    report.to_csv(report_path, index=False)
+    upload_log.write({"type": "validation_failed", "run_id": run_id, "context": context_name,
+                      "problems": len(report), "rows": int(report["row"].nunique()), "report": str(report_path)})
+    log_callback(f"❌ {context_name} cancelled: fix the sheet and upload again. Full report: {report_path}")
+    return False
+
+
+def _log_run_error(context_name: str, error: Exception) -> None:
+    """Records an upload that failed before or while preparing its documents."""
+    import traceback
+    traceback.print_exc()
+    upload_log.write({"type": "run_error", "run_id": new_run_id(), "context": context_name, "error": str(error),
+                      "traceback": traceback.format_exc()})
+
+
+def _iter_batches(documents, max_docs: int = None, max_bytes: int = None):
+    """
+    (Generator) Groups payloads into batches bounded by document count and serialized size.
+    Yields lists of (index, payload) pairs, where index is the payload's position in the input.
+    """
+    max_docs = max_docs or UPLOAD_BATCH_MAX_DOCS
+    max_bytes = max_bytes or UPLOAD_BATCH_MAX_BYTES
+    batch, batch_bytes = [], 2  # The enclosing "[]"
+    for index, payload in enumerate(documents):
+        payload_bytes = len(json.dumps(payload)) + 1  # Plus the separating comma
+        if batch and (len(batch) >= max_docs or batch_bytes + payload_bytes > max_bytes):
+            yield batch
+            batch, batch_bytes = [], 2
+        batch.append((index, payload))
+        batch_bytes += payload_bytes
+    if batch:
+        yield batch
+
+
+def _post_batch(config: dict, api_url: str, batch: list, log_callback=print, method: str = "POST") -> dict:
+    """
+    POSTs (or, for updates, PUTs) one batch. A batch the server rejects for its content (see
+    SPLITTABLE_STATUS_CODES) is split in half and each half sent separately, so one bad row only
+    fails itself. Any other 4xx (auth, permissions, a missing endpoint, rate limiting) would fail
+    every half the same way, so the whole batch fails at once. Returns {"results": [...],
+    "job_ids": [...]} with one result per document.
+
+    PUT batches are idempotent and are resent with backoff after server and connection failures.
+    POST batches are not: the request helper already retries them when the server cannot have
+    received them, and any other failure (a read timeout, a 500) may have created the documents, so
+    the batch is reported failed instead. The upload journal and the existing-title check then
+    decide what a re-run sends.
+    """
+    payloads = [payload for _, payload in batch]
+    batch_retries = UPLOAD_BATCH_RETRIES if method == "PUT" else 0
+    for attempt in range(batch_retries + 1):
+        response = _make_api_request_with_retry(method, api_url, config, token_refresher=refresh_access_token,
+                                                json_data=payloads, timeout=120, log_callback=log_callback)
+        if response is not None and response.status_code < 500:
+            break
+        if attempt < batch_retries:
+            delay = backoff_delay(attempt + 1)
+            log_callback(f"⚠️ Batch of {len(batch)} failed. Retrying in {delay:.1f}s "
+                         f"(attempt {attempt + 1}/{batch_retries})...")
+            time.sleep(delay)
+
+    if response is None:
+        error = "Connection error" if method == "PUT" else \
+            "Connection error; the documents may have been created, check before re-sending"
+        return {"results": [_document_result(index, payload, "failed", error=error)
+                            for index, payload in batch], "job_ids": []}
+
+    if response.status_code in (200, 201, 202):
+        response_data = response.json()
+        if response.status_code == 202 and isinstance(response_data, dict) and response_data.get('job_id'):
+            job_id = response_data['job_id']
+            return {"results": [_document_result(index, payload, "accepted", job_id=job_id)
+                                for index, payload in batch], "job_ids": [job_id]}
+        if isinstance(response_data, list) and len(response_data) == len(batch):
+            return {"results": [_document_result(index, payload, "success", doc_id=doc_response.get('id'))
+                                for (index, payload), doc_response in zip(batch, response_data)], "job_ids": []}
+        return {"results": [_document_result(index, payload, "success") for index, payload in batch],
+                "job_ids": []}
+
+    if response.status_code in SPLITTABLE_STATUS_CODES and len(batch) > 1:
+        middle = len(batch) // 2
+        log_callback(f"⚠️ Batch of {len(batch)} rejected ({response.status_code}). Splitting to isolate bad rows...")
+        first = _post_batch(config, api_url, batch[:middle], log_callback, method)
+        second = _post_batch(config, api_url, batch[middle:], log_callback, method)
+        return {"results": first["results"] + second["results"], "job_ids": first["job_ids"] + second["job_ids"]}
+
+    error = f"{response.status_code} - {response.text}"
+    return {"results": [_document_result(index, payload, "failed", error=error) for index, payload in batch],
+            "job_ids": []}
+
+
+def _tally_results(summary: dict) -> None:
+    """Recomputes the summary's overall and per-batch counts from its per-document results."""
+    batches = {batch["batch"]: batch for batch in summary["batches"]}
+    for batch in batches.values():
+        batch.update(uploaded=0, failed=0, pending=0)
+    summary.update(uploaded=0, failed=0, pending=0)
+    for result in summary["results"]:
+        key = {"success": "uploaded", "pending": "pending"}.get(result["status"], "failed")
+        summary[key] += 1
+        batches[result["batch"]][key] += 1
+
+
+def _format_job_ids(job_ids: list) -> str:
+    return f" Job ID(s): {', '.join(map(str, job_ids))}." if job_ids else ""
+
+
+def _document_result(index: int, payload: dict, status: str, doc_id: int = None, job_id=None,
+                     error: str = None) -> dict:
+    return {"index": index, "title": payload.get('title'), "status": status,
+            "id": doc_id if doc_id is not None else payload.get('id'), "job_id": job_id, "error": error}
 
 
 # This is the actual bulk upload helper. It is at the top level of the module.
-def _perform_bulk_upload(config: dict, documents_to_upload: list, log_callback=print,
+def _perform_bulk_upload(config: dict, documents_to_upload, log_callback=print,
                          on_success_callback: callable = None, upload_log_entries: list = None,
-                         context_name: str = "Bulk upload", log_file_name: Path = None):
+                         context_name: str = "Bulk upload", run_id: str = None, max_workers: int = None,
+                         journal: upload_journal.UploadJournal = None, row_numbers: list = None,
+                         method: str = "POST", titles: list = None) -> dict:
     """
-    Internal helper to perform the actual bulk API call and handle responses/logging.
+    Internal helper to perform the actual bulk API calls and handle responses/logging.
     This is extracted to avoid code duplication between Excel upload and empty document creation.
-    """
-    LOG_PATH.mkdir(exist_ok=True)
-    timestamp = time.strftime("%Y%m%d-%H%M%S")
 
-    if log_file_name is None:
-        log_file_name = LOG_PATH / f"upload_log_{context_name.replace(' ', '_').replace(':', '')}_{timestamp}.txt"
+    `documents_to_upload` may be any iterable of payloads; it is consumed lazily and split into
+    batches bounded by UPLOAD_BATCH_MAX_DOCS and UPLOAD_BATCH_MAX_BYTES. Up to `max_workers` batches
+    (default: config "max_workers") are in flight at once, and each is retried independently.
+    Returns a summary with per-document results.
+
+    Batch, document and run records are written to the structured upload log (see utils.upload_log)
+    under `run_id`; runs with nothing to upload write nothing. If a `journal` is given, each result
+    is also checkpointed there as soon as it is known, under the sheet row `row_numbers[index]`.
+
+    With `method="PUT"` the payloads update existing documents (each carries its "id"); `titles[index]`
+    then names documents whose update payload does not include a title.
+    """
+    started = time.time()
+    if run_id is None:
+        run_id = new_run_id()
 
     if upload_log_entries is None:
         upload_log_entries = []
 
+    if max_workers is None:
+        max_workers = config.get('max_workers', DEFAULT_MAX_WORKERS)
+
     api_url = f"{config['alation_url'].rstrip('/')}/integration/v2/document/"
-    headers = {
-        "TOKEN": config["access_token"],
-        "accept": "application/json",
-        "Content-Type": "application/json"
-    }
+    summary = {"run_id": run_id, "context": context_name, "prepared": 0, "uploaded": 0, "failed": 0, "pending": 0, "batches": [],
+               "results": [], "job_ids": []}
+
+    def record_batch(batch_no: int, batch: list, outcome: dict):
+        for result in outcome["results"]:
+            result["batch"] = batch_no
+            if titles is not None and result["title"] is None:
+                result["title"] = titles[result["index"]]
+        summary["results"].extend(outcome["results"])
+        summary["job_ids"].extend(outcome["job_ids"])
+        summary["batches"].append({"batch": batch_no, "documents": len(batch), "job_ids": outcome["job_ids"]})
+        if journal is not None:
+            journal.record_results(row_numbers, outcome["results"])
+
+        created = sum(1 for r in outcome["results"] if r["status"] == "success")
+        accepted = sum(1 for r in outcome["results"] if r["status"] == "accepted")
+        failed = len(outcome["results"]) - created - accepted
+        upload_log.write({"type": "batch", "run_id": run_id, "context": context_name, "batch": batch_no,
+                          "documents": len(batch), "created": created, "accepted": accepted, "failed": failed,
+                          "job_ids": outcome["job_ids"]})
+        status = "✅" if not failed else ("⚠️" if created or accepted else "❌")
+        accepted_msg = f" {accepted} accepted into a job," if accepted else ""
+        log_callback(f"{status} {context_name} batch {batch_no}: {created} uploaded,{accepted_msg} {failed} failed."
+                     f"{_format_job_ids(outcome['job_ids'])}")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+        batches = enumerate(_iter_batches(documents_to_upload), start=1)
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < max_workers * 2:
+                next_batch = next(batches, None)
+                if next_batch is None:
+                    exhausted = True
+                    break
+                batch_no, batch = next_batch
+                summary["prepared"] += len(batch)
+                if batch_no == 1:
+                    log_callback(
+                        f"DEBUG: Sending bulk payload for '{context_name}': {json.dumps([p for _, p in batch[:5]], indent=2)}...")
+                future = executor.submit(_post_batch, config, api_url, batch, log_callback, method)
+                in_flight[future] = (batch_no, batch)
 
-    uploaded_count = 0
-    failed_count = 0
+            if not in_flight:
+                break
 
-    if not documents_to_upload:
-        log_callback(f"No documents found for {context_name}. Skipping API call.")
-        with open(log_file_name, "w") as f:
-            f.write(f"--- {context_name} Log ---\n")
-            f.write(f"Timestamp: {timestamp}\n")
-            f.write("No documents to upload.\n")
-        return
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch_no, batch = in_flight.pop(future)
+                record_batch(batch_no, batch, future.result())
 
-    try:
-        log_callback(
-            f"DEBUG: Sending bulk payload for '{context_name}': {json.dumps(documents_to_upload[:min(5, len(documents_to_upload))], indent=2)}...")
-        response = requests.post(api_url, headers=headers, json=documents_to_upload, timeout=120)
-
-        if response.status_code in (200, 201, 202):
-            response_data = response.json()
-
-            if response.status_code == 202 and response_data.get('job_id'):
-                job_id = response_data.get('job_id')
-                uploaded_count = len(documents_to_upload)
-                log_callback(f"✅ {context_name} initiated successfully. Job ID: {job_id}. Check Alation for status.")
-                upload_log_entries.append(f"SUCCESS: {context_name} initiated. Job ID: {job_id}")
-            elif isinstance(response_data, list):
-                for doc_response in response_data:
-                    uploaded_count += 1
-                    new_doc_id = doc_response.get('id', 'N/A')
-                    doc_title = doc_response.get('title', 'N/A')
-                    log_callback(f"✅ Uploaded '{doc_title}' (ID: {new_doc_id})")
-                    upload_log_entries.append(f"SUCCESS: '{doc_title}' (ID: {new_doc_id})")
-            else:
-                uploaded_count = len(documents_to_upload)
-                log_callback(
-                    f"✅ {context_name} successful, but unexpected response format. Status: {response.status_code}, Response: {response.text}")
-                upload_log_entries.append(
-                    f"SUCCESS: {context_name}, unexpected response. Status: {response.status_code}, Response: {response.text}")
-
-            log_callback("Invalidating document cache as upload was successful...")
-            DOCUMENTS_CACHE_PATH.unlink(missing_ok=True)
-            if on_success_callback:
-                log_callback("Triggering UI refresh callback.")
-                on_success_callback()
-
-        else:
-            failed_count = len(documents_to_upload)
-            error_msg = f"Failed to perform {context_name}: {response.status_code} - {response.text}"
-            log_callback(f"❌ {error_msg}")
-            upload_log_entries.append(f"FAILED: {context_name} - {response.status_code} - {response.text}")
-
-    except requests.RequestException as e:
-        failed_count = len(documents_to_upload)
-        error_msg = f"Connection error during {context_name}: {e}"
-        log_callback(f"❌ {error_msg}")
-        upload_log_entries.append(f"FAILED: {context_name} - Connection Error: {e}")
-
-    with open(log_file_name, "w") as f:
-        f.write(f"--- {context_name} Log ---\n")
-        f.write(f"Timestamp: {timestamp}\n")
-        f.write(f"Total documents prepared: {len(documents_to_upload)}\n")
-        f.write(f"Successfully uploaded: {uploaded_count}\n")
-        f.write(f"Failed uploads: {failed_count}\n\n")
-        f.write("--- Individual Upload Results / Details ---\n")
-        for entry in upload_log_entries:
-            f.write(f"{entry}\n")
-
-    log_callback(f"✅ {context_name} complete. See log file: {log_file_name}")
+    if not summary["prepared"]:
+        log_callback(f"No documents found for {context_name}. Skipping API call.")
+        return summary
+
+    summary["results"].sort(key=lambda r: r["index"])
+    summary["batches"].sort(key=lambda b: b["batch"])
+
+    if summary["job_ids"]:
+        # 202 responses only mean the documents were queued; find out what actually happened.
+        outcomes = job_tracker.track_jobs(config, summary["job_ids"], log_callback=log_callback,
+                                          max_workers=max_workers)
+        job_tracker.apply_job_outcomes(summary["results"], outcomes)
+        if journal is not None:
+            journal.record_results(row_numbers, [r for r in summary["results"] if r["job_id"] is not None])
+    _tally_results(summary)
+
+    if summary["uploaded"]:
+        log_callback(f"Invalidating document cache as {'update' if method == 'PUT' else 'upload'} was successful...")
+        api_client.invalidate_document_cache(log_callback)
+        alation_lookup.invalidate_folder_cache()
+        if on_success_callback:
+            log_callback("Triggering UI refresh callback.")
+            on_success_callback()
+
+    for entry in upload_log_entries:
+        upload_log.write({"type": "note", "run_id": run_id, "context": context_name, "message": entry})
+    for result in summary["results"]:
+        upload_log.write({"type": "document", "run_id": run_id, "context": context_name, **result})
+    upload_log.write({"type": "run_end", "run_id": run_id, "context": context_name,
+                      "duration_s": round(time.time() - started, 3), "batches": len(summary["batches"]),
+                      **{key: summary[key] for key in ("prepared", "uploaded", "failed", "pending", "job_ids")}})
+    upload_log.flush()
+
+    pending_msg = f", {summary['pending']} still pending" if summary["pending"] else ""
+    log_callback(f"✅ {context_name} complete: {summary['uploaded']} uploaded, {summary['failed']} failed{pending_msg} "
+                 f"in {len(summary['batches'])} batches. See {upload_log.path} (run {run_id}).")
+    return summary
 
 
 def create_empty_documents(config: dict, document_payloads: list, log_callback=print,
@@ -255,7 +589,7 @@ def create_empty_documents(config: dict, document_payloads: list, log_callback=p
     Uploads a list of pre-constructed document payloads (e.g., empty documents) to Alation.
     This is a wrapper around _perform_bulk_upload for specific use cases.
     """
-    _perform_bulk_upload(
+    return _perform_bulk_upload(
         config=config,
         documents_to_upload=document_payloads,
         log_callback=log_callback,